@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Benchmark the JMeter results pipeline on synthetic JTL files.
+
+Every analysis path runs in its own subprocess so its peak RSS is measured
+in isolation. Results are written as JSON; ``--save-baseline`` stores them
+as the local baseline and ``--compare`` fails when throughput or memory has
+regressed against it by more than ``--tolerance`` percent.
+
+Example:
+    python3 benchmarks/bench-results-pipeline.py --rows 1M 10M --compare
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(os.path.dirname(BENCH_DIR), "scripts")
+GENERATOR = os.path.join(BENCH_DIR, "generate-jtl.py")
+PARSER = os.path.join(SCRIPTS_DIR, "parse-jmeter-results.py")
+
+# case -> (description, needs NumPy)
+CASES = {
+    "csv-python": ("CSV, pure Python, one process", False),
+    "csv-parallel": ("CSV, pure Python, --workers processes", False),
+    "csv-numpy": ("CSV, NumPy columnar backend", True),
+    "sidecar-build": ("CSV parse that also writes the binary sidecar", False),
+    "sidecar-python": ("Warm sidecar, pure Python", False),
+    "sidecar-numpy": ("Warm sidecar, NumPy", True),
+    "cli": ("parse-jmeter-results.py end to end (summary.json + summary.md)", False),
+}
+WINDOW_SECONDS = 10
+
+
+def parse_count(value):
+    multipliers = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+    suffix = value[-1].lower()
+    if suffix in multipliers:
+        return int(float(value[:-1]) * multipliers[suffix])
+    return int(value)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the JTL results pipeline")
+    parser.add_argument("--rows", type=parse_count, nargs="+", default=[parse_count("1M")],
+                        help="Dataset sizes to benchmark, e.g. 1M 10M 100M")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES),
+                        help="Analysis paths to run (default: all available)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processes for csv-parallel (0 = one per CPU core)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs per case; the fastest is reported")
+    parser.add_argument("--labels", type=int, default=8)
+    parser.add_argument("--error-ratio", type=float, default=0.02)
+    parser.add_argument("--latency", choices=["lognormal", "uniform", "bimodal"],
+                        default="lognormal")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join(BENCH_DIR, "data"),
+                        help="Where generated JTL files are kept between runs")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Also write the results to the baseline file")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare against the baseline and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=15.0,
+                        help="Allowed slowdown or memory growth in percent")
+    parser.add_argument("--run-case", choices=list(CASES), help=argparse.SUPPRESS)
+    parser.add_argument("--jtl", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def run_case(case, jtl_path, workers):
+    """Run one library-level case in this process (the ``--run-case`` mode)."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    from jtl_cache import aggregate_cached
+    from jtl_stats import aggregate_jtl
+
+    options = {"window_seconds": WINDOW_SECONDS}
+    if case == "csv-python":
+        aggregator = aggregate_jtl(jtl_path, 1, "python", **options)
+    elif case == "csv-parallel":
+        aggregator = aggregate_jtl(jtl_path, workers, "python", **options)
+    elif case == "csv-numpy":
+        aggregator = aggregate_jtl(jtl_path, 1, "numpy", **options)
+    else:
+        backend = "numpy" if case == "sidecar-numpy" else "python"
+        aggregator, source = aggregate_cached(jtl_path, 1, backend, **options)
+        expected = "csv" if case == "sidecar-build" else "sidecar"
+        if source != expected:
+            print(f"ERROR: {case} read from {source}, expected {expected}", file=sys.stderr)
+            sys.exit(1)
+    aggregator.summary()
+
+
+def numpy_available():
+    result = subprocess.run([sys.executable, "-c", "import numpy"], capture_output=True)
+    return result.returncode == 0
+
+
+def dataset_path(args, rows):
+    name = f"bench-{rows}-{args.labels}l-{args.error_ratio}e-{args.latency}-s{args.seed}.jtl"
+    return os.path.join(args.data_dir, name)
+
+
+def ensure_dataset(args, rows):
+    path = dataset_path(args, rows)
+    if os.path.exists(path):
+        return path
+    os.makedirs(args.data_dir, exist_ok=True)
+    print(f"Generating {rows} rows -> {path}")
+    tmp = path + ".tmp"
+    subprocess.run([
+        sys.executable, GENERATOR, "--output", tmp, "--rows", str(rows),
+        "--labels", str(args.labels), "--error-ratio", str(args.error_ratio),
+        "--latency", args.latency, "--seed", str(args.seed),
+    ], check=True)
+    os.replace(tmp, path)
+    return path
+
+
+def measure_case(case, jtl_path, args, workers):
+    if case == "sidecar-build":
+        shutil.rmtree(jtl_path + ".cache", ignore_errors=True)
+    if case == "cli":
+        with tempfile.TemporaryDirectory() as results_dir:
+            os.symlink(jtl_path, os.path.join(results_dir, "results.jtl"))
+            command = [sys.executable, PARSER, "--app", "bench", "--env", "bench",
+                       "--results-dir", results_dir, "--no-cache", "--backend", "python",
+                       "--max-error-rate", "100", "--max-response-time", str(2**31)]
+            return run_measured(command)
+    command = [sys.executable, __file__, "--run-case", case, "--jtl", jtl_path,
+               "--workers", str(workers)]
+    return run_measured(command)
+
+
+def run_measured(command):
+    """Run ``command``; return wall seconds, CPU seconds and peak RSS in MB."""
+    started = time.perf_counter()
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=stderr)
+        # wait4 reports this child's usage (and that of workers it waited for)
+        # rather than the running total over every child, unlike RUSAGE_CHILDREN.
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - started
+        stderr.seek(0)
+        errors = stderr.read().decode(errors="replace")
+    code = os.waitstatus_to_exitcode(status)
+    if code:
+        print(errors, file=sys.stderr)
+        print(f"ERROR: {' '.join(command)} exited with {code}")
+        sys.exit(1)
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss_bytes = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return seconds, usage.ru_utime + usage.ru_stime, rss_bytes / (1024 * 1024)
+
+
+def run_benchmarks(args):
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    has_numpy = numpy_available()
+    cases = [c for c in args.cases if has_numpy or not CASES[c][1]]
+    skipped = [c for c in args.cases if c not in cases]
+    if skipped:
+        print(f"Skipping (NumPy not installed): {', '.join(skipped)}")
+    if "sidecar-python" in cases or "sidecar-numpy" in cases:
+        # Warm sidecar cases read what sidecar-build wrote, so build it first
+        cases = [c for c in cases if c != "sidecar-build"]
+        cases.insert(0, "sidecar-build")
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": workers,
+        "numpy": has_numpy,
+        "generator": {"labels": args.labels, "error_ratio": args.error_ratio,
+                      "latency": args.latency, "seed": args.seed},
+        "results": [],
+    }
+    for rows in args.rows:
+        jtl_path = ensure_dataset(args, rows)
+        size_mb = os.path.getsize(jtl_path) / (1024 * 1024)
+        for case in cases:
+            best = None
+            for _ in range(max(args.repeat, 1)):
+                run = measure_case(case, jtl_path, args, workers)
+                if best is None or run[0] < best[0]:
+                    best = run
+            seconds, cpu_seconds, rss_mb = best
+            result = {
+                "case": case,
+                "description": CASES[case][0],
+                "rows": rows,
+                "file_mb": round(size_mb, 1),
+                "seconds": round(seconds, 3),
+                "cpu_seconds": round(cpu_seconds, 3),
+                "rows_per_second": round(rows / seconds) if seconds else 0,
+                "peak_rss_mb": round(rss_mb, 1),
+            }
+            report["results"].append(result)
+            print(f"{case:<15} {rows:>12,} rows  {seconds:9.2f}s  "
+                  f"{result['rows_per_second']:>12,} rows/s  {rss_mb:8.1f} MB")
+        shutil.rmtree(jtl_path + ".cache", ignore_errors=True)
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Return regression messages for results slower or larger than the baseline."""
+    previous = {(r["case"], r["rows"]): r for r in baseline.get("results", [])}
+    limit = tolerance / 100
+    regressions = []
+    for result in report["results"]:
+        base = previous.get((result["case"], result["rows"]))
+        if base is None:
+            continue
+        label = f"{result['case']} @ {result['rows']:,} rows"
+        if result["rows_per_second"] < base["rows_per_second"] * (1 - limit):
+            regressions.append(f"{label}: {result['rows_per_second']:,} rows/s, "
+                               f"baseline {base['rows_per_second']:,} rows/s")
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + limit):
+            regressions.append(f"{label}: peak RSS {result['peak_rss_mb']} MB, "
+                               f"baseline {base['peak_rss_mb']} MB")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    if args.run_case:
+        run_case(args.run_case, args.jtl, args.workers)
+        return
+
+    report = run_benchmarks(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    regressions = []
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"ERROR: Baseline not found: {args.baseline} (run with --save-baseline first)")
+            sys.exit(1)
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance}% against {args.baseline}")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Generate a deterministic synthetic JMeter JTL file for benchmarking.
+
+The same arguments and seed always produce byte-identical output, so
+benchmark runs on different commits analyse exactly the same data.
+"""
+
+import argparse
+import math
+import random
+import sys
+
+JTL_HEADER = (
+    "timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,"
+    "success,failureMessage,bytes,sentBytes,grpThreads,allThreads,URL,Latency,"
+    "IdleTime,Connect"
+)
+ERROR_CODES = [("500", "Internal Server Error"), ("502", "Bad Gateway"),
+               ("503", "Service Unavailable"), ("504", "Gateway Timeout")]
+WRITE_BATCH = 10000
+
+
+def parse_count(value):
+    """Parse counts such as ``1000``, ``1M`` or ``2.5k``."""
+    multipliers = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+    suffix = value[-1].lower()
+    if suffix in multipliers:
+        return int(float(value[:-1]) * multipliers[suffix])
+    return int(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic JTL file")
+    parser.add_argument("--output", required=True, help="Path of the JTL file to write")
+    parser.add_argument("--rows", type=parse_count, default=parse_count("1M"),
+                        help="Number of samples, e.g. 1M, 10M, 100M")
+    parser.add_argument("--labels", type=int, default=8, help="Number of distinct labels")
+    parser.add_argument("--error-ratio", type=float, default=0.02,
+                        help="Fraction of failed samples (0-1)")
+    parser.add_argument("--latency", choices=["lognormal", "uniform", "bimodal"],
+                        default="lognormal", help="Latency distribution")
+    parser.add_argument("--median-ms", type=float, default=120.0, help="Median latency in ms")
+    parser.add_argument("--sigma", type=float, default=0.8,
+                        help="Spread: lognormal sigma, or +/- fraction for uniform")
+    parser.add_argument("--threads", type=int, default=50, help="Simulated JMeter threads")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Samples per second")
+    parser.add_argument("--start-timestamp", type=int, default=1_700_000_000_000,
+                        help="Epoch ms of the first sample")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def latency_sampler(rng, kind, median, sigma):
+    mu = math.log(max(median, 1.0))
+    if kind == "uniform":
+        low, high = median * (1 - min(sigma, 1.0)), median * (1 + min(sigma, 1.0))
+        return lambda: int(rng.uniform(low, high))
+    if kind == "bimodal":
+        # 90% fast path around the median, 10% slow path an order of magnitude later
+        slow_mu = mu + math.log(10)
+        return lambda: int(rng.lognormvariate(mu if rng.random() < 0.9 else slow_mu, sigma))
+    return lambda: int(rng.lognormvariate(mu, sigma))
+
+
+def generate(args, out):
+    rng = random.Random(args.seed)
+    latency = latency_sampler(rng, args.latency, args.median_ms, args.sigma)
+    labels = [f"Endpoint {i:03d}: /api/v1/resource{i}" for i in range(args.labels)]
+    paths = [f"https://bench.example.com/api/v1/resource{i}" for i in range(args.labels)]
+    threads = [f"Load Threads 1-{i + 1}" for i in range(args.threads)]
+    step_ms = 1000.0 / args.rate
+
+    out.write(JTL_HEADER + "\n")
+    batch = []
+    for i in range(args.rows):
+        timestamp = args.start_timestamp + int(i * step_ms)
+        n = rng.randrange(args.labels)
+        elapsed = latency()
+        if rng.random() < args.error_ratio:
+            code, message = ERROR_CODES[rng.randrange(len(ERROR_CODES))]
+            success, failure = "false", f"Test failed: code expected 200 but was {code}"
+        else:
+            code, message, success, failure = "200", "OK", "true", ""
+        batch.append(
+            f"{timestamp},{elapsed},{labels[n]},{code},{message},"
+            f"{threads[i % args.threads]},text,{success},{failure},"
+            f"{512 + n},{128},{args.threads},{args.threads},{paths[n]},"
+            f"{elapsed // 2},0,{1 if i < args.threads else 0}\n"
+        )
+        if len(batch) >= WRITE_BATCH:
+            out.write("".join(batch))
+            batch = []
+    out.write("".join(batch))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.output, "w", newline="") as f:
+        generate(args, f)
+    print(f"Wrote {args.rows} rows to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Compile (or reuse) the JMX plan for an app, environment and test plan.
+
+    compile-jmx.py --app A --env staging --test-plan health-check \\
+        --apps-dir qa-data/apps --output test-results/jmeter/dynamic-health-check.jmx
+
+Plans are stored under --cache-dir by a hash of everything they are built
+from, so repeated local runs reuse the rendered file. CI jobs start with an
+empty runner temp directory and render the plan afresh, which takes
+milliseconds; no workflow persists the cache.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+from config_resolver import APPS_DIR, SHARED_SETTINGS_PATH, ConfigError, ConfigResolver
+from jmx_compiler import compile_cached, plan_from_config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compile a JMeter plan from jmeter.json")
+    parser.add_argument("--app", required=True)
+    parser.add_argument("--env", required=True)
+    parser.add_argument("--test-plan", default="health-check")
+    parser.add_argument("--apps-dir", default=APPS_DIR)
+    parser.add_argument("--jmeter-config", default=None,
+                        help="Use this jmeter.json instead of the app's own")
+    parser.add_argument("--shared-settings", default=SHARED_SETTINGS_PATH)
+    parser.add_argument("--threads", type=int, default=None, help="Override threads")
+    parser.add_argument("--duration", type=int, default=None, help="Override duration (s)")
+    parser.add_argument("--ramp-up", type=int, default=None, help="Override ramp-up (s)")
+    parser.add_argument("--base-url", default=None, help="Override the environment's base URL")
+    parser.add_argument("--endpoints", default="",
+                        help="Comma-separated paths, used when the app config has no endpoints")
+    parser.add_argument("--cache-dir",
+                        default=os.environ.get("QA_JMX_CACHE") or os.path.join(
+                            os.environ.get("RUNNER_TEMP", "/tmp"), "qa-jmx-cache"),
+                        help="Compiled plan cache (default: $QA_JMX_CACHE, "
+                             "else qa-jmx-cache in $RUNNER_TEMP or /tmp)")
+    parser.add_argument("--output", default=None, help="Copy the compiled plan here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    try:
+        resolver = ConfigResolver(args.apps_dir, args.shared_settings)
+        try:
+            jmeter = resolver.load_app(args.app, jmeter_path=args.jmeter_config).get("jmeter") or {}
+        except ConfigError:
+            if not args.endpoints:
+                raise
+            jmeter = {}
+    except ConfigError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if args.endpoints and not jmeter.get("health_endpoints"):
+        jmeter = dict(jmeter, health_endpoints=[e.strip() for e in args.endpoints.split(",")
+                                                if e.strip()])
+
+    plan = plan_from_config(jmeter, args.env, args.test_plan, resolver.shared.get("jmeter"),
+                            threads=args.threads, duration=args.duration,
+                            ramp_up=args.ramp_up, base_url=args.base_url)
+    if not plan["base_url"]:
+        print(f"ERROR: No base URL for environment '{args.env}'")
+        sys.exit(1)
+    if not plan["endpoints"]:
+        print(f"ERROR: No endpoints configured for '{args.app}'")
+        sys.exit(1)
+
+    path, cached = compile_cached(plan, args.cache_dir)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        shutil.copyfile(path, args.output)
+        path = args.output
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{'Reused cached' if cached else 'Compiled'} plan {path} in {elapsed:.1f}ms "
+          f"({plan['threads']} threads, {plan['ramp_up_seconds']}s ramp-up, "
+          f"{plan['duration_seconds']}s, {len(plan['endpoints'])} endpoints)")
+
+
+if __name__ == "__main__":
+    main()
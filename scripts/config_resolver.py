@@ -0,0 +1,415 @@
+"""Resolve per-app test configuration from shared settings and app config files.
+
+An app's ``testcomplete.json`` and ``jmeter.json`` (or a multi-repo
+``config.json`` holding both) are merged into the ``config.json`` layout,
+validated against ``examples/config-schema.json`` and combined with the
+defaults in ``configs/shared-settings.json``. The schema is compiled once per
+process and each validated app config is cached under the SHA-256 of its
+files, the shared settings and the schema, in memory and optionally on disk.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS_DIR = os.path.join(REPO_ROOT, "configs", "apps")
+SHARED_SETTINGS_PATH = os.path.join(REPO_ROOT, "configs", "shared-settings.json")
+SCHEMA_PATH = os.path.join(REPO_ROOT, "examples", "config-schema.json")
+CONFIG_VERSION = "1.0"
+
+
+class ConfigError(Exception):
+    """Raised when an app config is missing, invalid or lacks a requested value."""
+
+
+# --- schema compilation --------------------------------------------------------
+
+_JSON_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+
+def compile_schema(schema):
+    """Compile a JSON Schema (draft-07 subset) into ``validate(instance) -> [errors]``.
+
+    Supports ``type``, ``required``, ``properties``, ``additionalProperties``,
+    ``items``, ``enum``, ``pattern``, ``minimum``, ``maximum``, ``anyOf`` and
+    local ``$ref``s; annotation keywords such as ``format`` are ignored.
+    """
+    compiled_refs = {}
+
+    def resolve_ref(ref):
+        if ref not in compiled_refs:
+            if not ref.startswith("#/"):
+                raise ConfigError(f"Unsupported schema reference: {ref}")
+            target = schema
+            for part in ref[2:].split("/"):
+                target = target[part]
+            compiled_refs[ref] = compile_node(target)
+        return compiled_refs[ref]
+
+    def compile_node(node):
+        checks = []
+        if "$ref" in node:
+            ref = node["$ref"]
+            checks.append(lambda value, path: resolve_ref(ref)(value, path))
+        if "type" in node:
+            names = node["type"] if isinstance(node["type"], list) else [node["type"]]
+            tests = [_JSON_TYPES[name] for name in names]
+            expected = " or ".join(names)
+
+            def check_type(value, path):
+                if not any(test(value) for test in tests):
+                    return [f"{path}: expected {expected}, got {type(value).__name__}"]
+                return []
+            checks.append(check_type)
+        if "enum" in node:
+            allowed = node["enum"]
+            checks.append(lambda value, path: [] if value in allowed
+                          else [f"{path}: {value!r} is not one of {allowed}"])
+        if "pattern" in node:
+            pattern = re.compile(node["pattern"])
+            checks.append(lambda value, path: [] if not isinstance(value, str)
+                          or pattern.search(value)
+                          else [f"{path}: {value!r} does not match {pattern.pattern}"])
+        for keyword, fails, word in (("minimum", lambda v, b: v < b, "below"),
+                                     ("maximum", lambda v, b: v > b, "above")):
+            if keyword in node:
+                bound = node[keyword]
+                checks.append(lambda value, path, bound=bound, fails=fails, word=word: (
+                    [f"{path}: {value} is {word} {bound}"]
+                    if _JSON_TYPES["number"](value) and fails(value, bound) else []
+                ))
+        if "required" in node:
+            required = node["required"]
+            checks.append(lambda value, path: [
+                f"{path}: missing required property '{name}'"
+                for name in required if isinstance(value, dict) and name not in value
+            ])
+        if "properties" in node or "additionalProperties" in node:
+            properties = {name: compile_node(sub)
+                          for name, sub in node.get("properties", {}).items()}
+            extra = node.get("additionalProperties", True)
+            extra_check = compile_node(extra) if isinstance(extra, dict) else None
+
+            def check_properties(value, path):
+                if not isinstance(value, dict):
+                    return []
+                errors = []
+                for name, item in value.items():
+                    check = properties.get(name)
+                    if check is None:
+                        if extra is False:
+                            errors.append(f"{path}: unexpected property '{name}'")
+                            continue
+                        check = extra_check
+                    if check is not None:
+                        errors.extend(check(item, f"{path}.{name}"))
+                return errors
+            checks.append(check_properties)
+        if isinstance(node.get("items"), dict):
+            item_check = compile_node(node["items"])
+            checks.append(lambda value, path: [
+                error for i, item in enumerate(value) for error in item_check(item, f"{path}[{i}]")
+            ] if isinstance(value, list) else [])
+        if "anyOf" in node:
+            options = [compile_node(sub) for sub in node["anyOf"]]
+
+            def check_any(value, path):
+                failures = [option(value, path) for option in options]
+                if all(failures):
+                    return [f"{path}: matches none of the allowed forms "
+                            f"({'; '.join(f[0] for f in failures)})"]
+                return []
+            checks.append(check_any)
+
+        def validate(value, path="$"):
+            errors = []
+            for check in checks:
+                errors.extend(check(value, path))
+            return errors
+        return validate
+
+    return compile_node(schema)
+
+
+_compiled_schemas = {}
+
+
+def load_schema(path=SCHEMA_PATH):
+    """Return ``(validate, digest)`` for a schema file, compiling it only once."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest not in _compiled_schemas:
+        _compiled_schemas[digest] = compile_schema(json.loads(raw))
+    return _compiled_schemas[digest], digest
+
+
+# --- loading and merging -------------------------------------------------------
+
+def _read_json(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        return json.loads(raw), raw
+    except ValueError as e:
+        raise ConfigError(f"{path}: invalid JSON: {e}")
+
+
+def merge_app_files(app_name, testcomplete=None, jmeter=None):
+    """Combine per-tool configs into the ``config.json`` layout.
+
+    A tool whose config is present is enabled unless it says otherwise.
+    """
+    def section(config):
+        if config is None:
+            return {"enabled": False}
+        return dict({"enabled": True}, **config)
+
+    return {
+        "app_name": app_name,
+        "version": CONFIG_VERSION,
+        "testcomplete": section(testcomplete),
+        "jmeter": section(jmeter),
+    }
+
+
+def _first(*values, default=None):
+    for value in values:
+        if value is not None:
+            return value
+    return default
+
+
+def endpoint_paths(endpoints):
+    """Health endpoints may be plain paths or ``{"path": ...}`` objects."""
+    return [e["path"] if isinstance(e, dict) else e for e in endpoints or []]
+
+
+def plan_settings(jmeter, env, test_plan, defaults=None, threads=None, duration=None):
+    """Resolve threads, duration, ramp-up and JMX path for one JMeter run.
+
+    Explicit arguments win over environment overrides, which win over the
+    plan, which wins over the shared ``defaults`` (``shared-settings.json``'s
+    ``jmeter`` block). Plans given as a JMX path carry no settings of their own.
+    """
+    defaults = defaults or {}
+    environment = (jmeter.get("environments") or {}).get(env) or {}
+    plan = (jmeter.get("test_plans") or {}).get(test_plan)
+    jmx = plan if isinstance(plan, str) else (plan or {}).get("custom_jmx")
+    plan = plan if isinstance(plan, dict) else {}
+    return {
+        "threads": int(_first(threads, environment.get("threads_override"),
+                              environment.get("threads"), plan.get("threads"),
+                              defaults.get("default_threads"), default=1)),
+        "duration_seconds": int(_first(duration, environment.get("duration_override"),
+                                       environment.get("duration_seconds"),
+                                       plan.get("duration_seconds"),
+                                       defaults.get("default_duration_seconds"), default=30)),
+        "ramp_up_seconds": int(_first(environment.get("ramp_up_override"),
+                                      environment.get("ramp_up_seconds"),
+                                      plan.get("ramp_up_seconds"),
+                                      defaults.get("default_ramp_up_seconds"), default=0)),
+        "jmx": jmx or "",
+    }
+
+
+def load_shared_settings(path=SHARED_SETTINGS_PATH):
+    """Return ``shared-settings.json``, or an empty dict when it is absent."""
+    if not os.path.exists(path):
+        return {}
+    return _read_json(path)[0]
+
+
+class ConfigResolver:
+    """Loads shared settings and the schema once and resolves app configs."""
+
+    def __init__(self, apps_dir=APPS_DIR, shared_settings_path=SHARED_SETTINGS_PATH,
+                 schema_path=SCHEMA_PATH, cache_dir=None):
+        self.apps_dir = apps_dir
+        self.shared, shared_raw = _read_json(shared_settings_path)
+        self.validate, schema_digest = load_schema(schema_path)
+        self.base_digest = hashlib.sha256(
+            schema_digest.encode() + hashlib.sha256(shared_raw).digest()
+        ).hexdigest()
+        self.cache_dir = cache_dir
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def app_names(self):
+        if not os.path.isdir(self.apps_dir):
+            return []
+        return sorted(name for name in os.listdir(self.apps_dir)
+                      if os.path.isdir(os.path.join(self.apps_dir, name)))
+
+    def app_files(self, app_name, jmeter_path=None, testcomplete_path=None):
+        """Return ``{kind: path}`` for the config files that make up an app."""
+        app_dir = os.path.join(self.apps_dir, app_name)
+        combined = os.path.join(app_dir, "config.json")
+        if os.path.exists(combined) and not (jmeter_path or testcomplete_path):
+            return {"config": combined}
+        files = {
+            "testcomplete": testcomplete_path or os.path.join(app_dir, "testcomplete.json"),
+            "jmeter": jmeter_path or os.path.join(app_dir, "jmeter.json"),
+        }
+        return {kind: path for kind, path in files.items() if os.path.exists(path)}
+
+    def load_app(self, app_name, jmeter_path=None, testcomplete_path=None):
+        """Return the merged, validated config for an app (cached by content hash)."""
+        files = self.app_files(app_name, jmeter_path, testcomplete_path)
+        if not files:
+            raise ConfigError(f"No configuration found for app '{app_name}' in {self.apps_dir}")
+        loaded = {kind: _read_json(path) for kind, path in files.items()}
+        digest = hashlib.sha256(self.base_digest.encode())
+        for kind in sorted(loaded):
+            digest.update(kind.encode() + b"\0" + loaded[kind][1] + b"\0")
+        key = digest.hexdigest()
+
+        config = self._cache.get(key)
+        if config is None and self.cache_dir:
+            config = self._read_disk_cache(key)
+        if config is not None:
+            self.hits += 1
+            self._cache[key] = config
+            return config
+        self.misses += 1
+
+        if "config" in loaded:
+            config = loaded["config"][0]
+        else:
+            config = merge_app_files(app_name, loaded.get("testcomplete", (None,))[0],
+                                     loaded.get("jmeter", (None,))[0])
+        errors = self.validate(config)
+        if errors:
+            raise ConfigError(f"{app_name}: config does not match the schema:\n  "
+                              + "\n  ".join(errors))
+        self._cache[key] = config
+        if self.cache_dir:
+            self._write_disk_cache(key, config)
+        return config
+
+    def _read_disk_cache(self, key):
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk_cache(self, key, config):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(config, f)
+        os.replace(tmp, path)
+
+    def resolve_jmeter(self, app_name, env, test_plan, threads=None, duration=None,
+                       jmeter_path=None):
+        """Every value a JMeter run of ``test_plan`` against ``env`` needs."""
+        config = self.load_app(app_name, jmeter_path=jmeter_path)
+        return self._resolve_jmeter(config, app_name, env, test_plan, threads, duration)
+
+    def _resolve_jmeter(self, config, app_name, env, test_plan, threads=None, duration=None):
+        jmeter = config.get("jmeter") or {}
+        if not jmeter.get("enabled", True):
+            raise ConfigError(f"JMeter is not enabled for app '{app_name}'")
+        environment = (jmeter.get("environments") or {}).get(env)
+        if environment is None:
+            raise ConfigError(f"Environment '{env}' not found in JMeter config for '{app_name}'")
+        shared = self.shared.get("jmeter", {})
+        defaults = shared.get("default_thresholds", {})
+        thresholds = jmeter.get("thresholds") or {}
+
+        values = {"base_url": environment.get("base_url", ""),
+                  "health_endpoints": endpoint_paths(jmeter.get("health_endpoints"))}
+        values.update(plan_settings(jmeter, env, test_plan, shared, threads, duration))
+        values.update({
+            "max_response_time": _first(thresholds.get("max_response_time_ms"),
+                                        defaults.get("max_response_time_ms"), default=5000),
+            "max_error_rate": _first(thresholds.get("max_error_rate_percent"),
+                                     defaults.get("max_error_rate_percent"), default=1),
+            "p90_response_time": _first(thresholds.get("p90_response_time_ms"),
+                                        thresholds.get("percentile_90_ms"),
+                                        defaults.get("p90_response_time_ms"), default=""),
+            "p95_response_time": _first(thresholds.get("p95_response_time_ms"),
+                                        thresholds.get("percentile_95_ms"),
+                                        defaults.get("p95_response_time_ms"), default=""),
+            "abort_after_seconds": _first(thresholds.get("abort_after_breach_seconds"),
+                                          defaults.get("abort_after_breach_seconds"), default=0),
+        })
+        # Health checks without a custom JMX run on the asyncio engine, no JVM needed.
+        # A JMX named in test_plans (a path string or custom_jmx) counts as custom.
+        custom_jmx = os.path.join(self.apps_dir, app_name, "jmeter", f"{test_plan}.jmx")
+        has_jmx = bool(values["jmx"]) or os.path.exists(custom_jmx)
+        values["engine"] = "python" if test_plan == "health-check" and not has_jmx else "jmeter"
+        return values
+
+    def resolve_testcomplete(self, app_name, env, suite, testcomplete_path=None):
+        """Every value a TestComplete run of ``suite`` against ``env`` needs."""
+        config = self.load_app(app_name, testcomplete_path=testcomplete_path)
+        return self._resolve_testcomplete(config, app_name, env, suite)
+
+    def _resolve_testcomplete(self, config, app_name, env, suite):
+        testcomplete = config.get("testcomplete") or {}
+        if not testcomplete.get("enabled", True):
+            raise ConfigError(f"TestComplete is not enabled for app '{app_name}'")
+        environment = (testcomplete.get("environments") or {}).get(env)
+        if environment is None:
+            raise ConfigError(f"Environment '{env}' not found in TestComplete config "
+                              f"for '{app_name}'")
+        items = (testcomplete.get("test_items") or {}).get(suite)
+        if items is None:
+            raise ConfigError(f"Test suite '{suite}' not found in config for '{app_name}'")
+        shared = self.shared.get("testcomplete", {})
+        retry = testcomplete.get("retry_on_failure") or {}
+        return {
+            "project_suite": os.path.join(self.apps_dir, app_name, "testcomplete",
+                                          testcomplete.get("project_suite", "")),
+            "timeout": _first(testcomplete.get("timeout_minutes"),
+                              shared.get("execution_timeout_default"), default=60),
+            "base_url": environment.get("base_url", ""),
+            "credentials_secret": environment.get("credentials_secret", ""),
+            "test_items": items,
+            # Total attempts per item; retries re-run only the items that failed
+            "retry_attempts": max(int(retry.get("attempts", 2)), 1) if retry.get("enabled") else 1,
+        }
+
+    def resolve_app(self, app_name):
+        """Resolve every environment/plan and environment/suite pair of one app."""
+        config = self.load_app(app_name)
+        resolved = {"jmeter": {}, "testcomplete": {}}
+        jmeter = config.get("jmeter") or {}
+        if jmeter.get("enabled", True):
+            for env in jmeter.get("environments") or {}:
+                resolved["jmeter"][env] = {
+                    plan: self._resolve_jmeter(config, app_name, env, plan)
+                    for plan in jmeter.get("test_plans") or {"health-check": None}
+                }
+        testcomplete = config.get("testcomplete") or {}
+        if testcomplete.get("enabled", True):
+            for env in testcomplete.get("environments") or {}:
+                resolved["testcomplete"][env] = {
+                    suite: self._resolve_testcomplete(config, app_name, env, suite)
+                    for suite in testcomplete.get("test_items") or {}
+                }
+        return resolved
+
+    def resolve_all(self):
+        """Resolve every app under ``apps_dir``; returns ``(resolved, errors)``."""
+        resolved, errors = {}, {}
+        for app_name in self.app_names():
+            try:
+                resolved[app_name] = self.resolve_app(app_name)
+            except ConfigError as e:
+                errors[app_name] = str(e)
+        return resolved, errors
@@ -1,6 +1,7 @@
 #!/bin/bash
 # Fetch application configuration from separate config repository
 # Usage: ./fetch-config.sh <app-name> [config-dir]
+# Set QA_CONFIG_REMOTE_BASE to a directory of bare qa-config-<app>.git repos to bypass GitHub
 
 set -euo pipefail
 
@@ -8,6 +9,7 @@ APP_NAME=${1:?"Error: app_name is required"}
 CONFIG_DIR=${2:-"${RUNNER_TEMP:-/tmp}/qa-configs"}
 ORG_NAME=${QA_ORG_NAME:-"your-org"}  # Override with env var
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 CONFIG_REPO="qa-config-${APP_NAME}"
 APP_CONFIG_PATH="${CONFIG_DIR}/${APP_NAME}"
 
@@ -29,28 +31,21 @@ log_error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
-# Create config cache directory
-mkdir -p "${CONFIG_DIR}"
-
-# Check if config already cached (useful for scheduled runs with multiple apps)
-if [ -d "${APP_CONFIG_PATH}" ]; then
-    log_info "Using cached config for ${APP_NAME}"
-    echo "CONFIG_PATH=${APP_CONFIG_PATH}" >> "${GITHUB_OUTPUT:-/dev/stdout}"
-    echo "CONFIG_CACHED=true" >> "${GITHUB_OUTPUT:-/dev/stdout}"
-    exit 0
-fi
-
-log_info "Fetching config for ${APP_NAME} from ${ORG_NAME}/${CONFIG_REPO}"
-
-# Check if GH_TOKEN is set
-if [ -z "${GH_TOKEN:-}" ]; then
+if [ -z "${GH_TOKEN:-}" ] && [ -z "${QA_CONFIG_REMOTE_BASE:-}" ]; then
     log_error "GH_TOKEN environment variable not set"
     exit 1
 fi
 
-# Check if repo exists
-if ! gh repo view "${ORG_NAME}/${CONFIG_REPO}" &>/dev/null; then
-    log_error "Config repository not found: ${ORG_NAME}/${CONFIG_REPO}"
+# The cache is keyed on the config repo's HEAD commit: unchanged configs are
+# reused after one ls-remote, changed ones are cloned again
+log_info "Fetching config for ${APP_NAME} from ${ORG_NAME}/${CONFIG_REPO}"
+if ! python3 "${SCRIPT_DIR}/prefetch-configs.py" \
+    --apps "${APP_NAME}" \
+    --cache-dir "${CONFIG_DIR}" \
+    --org "${ORG_NAME}" \
+    ${QA_CONFIG_REMOTE_BASE:+--remote-base "${QA_CONFIG_REMOTE_BASE}"} \
+    --output "${GITHUB_OUTPUT:-/dev/stdout}"; then
+    log_error "Could not fetch ${ORG_NAME}/${CONFIG_REPO}"
     log_info "Available options:"
     log_info "  1. Create repo: gh repo create ${ORG_NAME}/${CONFIG_REPO}"
     log_info "  2. Check app name spelling"
@@ -58,33 +53,13 @@ if ! gh repo view "${ORG_NAME}/${CONFIG_REPO}" &>/dev/null; then
     exit 1
 fi
 
-# Clone config repo with minimal data transfer
-log_info "Cloning ${CONFIG_REPO}..."
-gh repo clone "${ORG_NAME}/${CONFIG_REPO}" \
-    "${APP_CONFIG_PATH}" \
-    -- --depth=1 --single-branch --no-tags
-
-# Verify config.json exists
-if [ ! -f "${APP_CONFIG_PATH}/config.json" ]; then
-    log_error "config.json not found in ${CONFIG_REPO}"
-    exit 1
-fi
-
-log_info "Successfully fetched config for ${APP_NAME}"
 log_info "Config path: ${APP_CONFIG_PATH}"
 
-# Output for GitHub Actions
-echo "CONFIG_PATH=${APP_CONFIG_PATH}" >> "${GITHUB_OUTPUT:-/dev/stdout}"
-echo "CONFIG_CACHED=false" >> "${GITHUB_OUTPUT:-/dev/stdout}"
-
-# Print config summary
-if command -v jq &> /dev/null; then
-    log_info "Configuration summary:"
-    jq -r '.app_name as $app | 
-           .testcomplete.enabled // false as $tc | 
-           .jmeter.enabled // false as $jm |
-           "  App: \($app)\n  TestComplete: \($tc)\n  JMeter: \($jm)"' \
-           "${APP_CONFIG_PATH}/config.json"
+# Validate against the schema and print config summary
+log_info "Configuration summary:"
+if ! python3 "${SCRIPT_DIR}/resolve-config.py" --apps-dir "${CONFIG_DIR}" --app "${APP_NAME}" --summary; then
+    log_error "config.json in ${CONFIG_REPO} does not match the config schema"
+    exit 1
 fi
 
 exit 0
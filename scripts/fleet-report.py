@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Merge every app's results from a run into one fleet report.
+
+    # After downloading a scheduled run's artifacts into artifacts/
+    fleet-report.py artifacts/ --exclude '*-shard-*' \\
+        --output fleet-summary.json --markdown "$GITHUB_STEP_SUMMARY"
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from fleet_report import DEFAULT_SLOWEST, build_report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Aggregate per-app results into a fleet report")
+    parser.add_argument("results_dir", help="Directory of downloaded result artifacts")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Skip directories matching this glob (repeatable)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Load results in N processes (0 = one per CPU core)")
+    parser.add_argument("--slowest", type=int, default=DEFAULT_SLOWEST,
+                        help="Number of slowest endpoints (by P95) to list")
+    parser.add_argument("--output", default="fleet-summary.json")
+    parser.add_argument("--markdown", default=None,
+                        help="Append the markdown report here (e.g. $GITHUB_STEP_SUMMARY)")
+    return parser.parse_args()
+
+
+def generate_markdown(report):
+    fleet = report["fleet"]
+    lines = [
+        "## Fleet Results",
+        "",
+        "| Metric | Value |",
+        "|--------|-------|",
+        f"| Apps | {fleet['apps']} |",
+        f"| JMeter runs | {fleet['jmeter_runs']} ({fleet['jmeter_failed']} failed) |",
+        f"| TestComplete runs | {fleet['testcomplete_runs']} ({fleet['testcomplete_failed']} failed) |",
+        f"| Total Requests | {fleet['total_requests']} |",
+        f"| Error Rate | {fleet['error_rate']}% |",
+        f"| P50 / P95 / P99 | {fleet['p50_response_time_ms']}ms / {fleet['p95_response_time_ms']}ms "
+        f"/ {fleet['p99_response_time_ms']}ms |",
+    ]
+
+    if report["jmeter"]:
+        lines += [
+            "",
+            "### JMeter",
+            "| Application | Env | Status | Requests | Error Rate | P50 | P95 | P99 |",
+            "|-------------|-----|--------|----------|------------|-----|-----|-----|",
+        ]
+        for entry in report["jmeter"]:
+            if not entry.get("total_requests"):
+                lines.append(f"| {entry['app']} | {entry['environment']} | {entry['status']} "
+                             f"| 0 | - | - | - | - |")
+                continue
+            lines.append(
+                f"| {entry['app']} | {entry['environment']} | {entry['status']} "
+                f"| {entry['total_requests']} | {entry['error_rate']}% "
+                f"| {entry['p50_response_time_ms']}ms | {entry['p95_response_time_ms']}ms "
+                f"| {entry['p99_response_time_ms']}ms |"
+            )
+        failures = [entry for entry in report["jmeter"] if entry["failures"]]
+        for entry in failures:
+            shown = "; ".join(entry["failures"][:3])
+            more = len(entry["failures"]) - 3
+            lines.append(f"- **{entry['app']}** ({entry['environment']}): {shown}"
+                         + (f" (+{more} more)" if more > 0 else ""))
+
+    if report["testcomplete"]:
+        lines += [
+            "",
+            "### TestComplete",
+            "| Application | Env | Status | Passed | Failed | Flaky | Duration |",
+            "|-------------|-----|--------|--------|--------|-------|----------|",
+        ]
+        for entry in report["testcomplete"]:
+            duration = entry["duration_seconds"]
+            lines.append(
+                f"| {entry['app']} | {entry['environment']} | {entry['status']} "
+                f"| {entry['passed']} | {entry['failed']} | {entry['flaky']} "
+                f"| {f'{duration:g}s' if duration is not None else '-'} |"
+            )
+
+    if report["slowest_endpoints"]:
+        lines += [
+            "",
+            "### Slowest Endpoints (P95)",
+            "| Application | Env | Endpoint | Requests | Error Rate | P50 | P95 | P99 |",
+            "|-------------|-----|----------|----------|------------|-----|-----|-----|",
+        ]
+        for e in report["slowest_endpoints"]:
+            lines.append(f"| {e['app']} | {e['environment']} | {e['label']} | {e['total']} "
+                         f"| {e['error_rate']}% | {e['p50_ms']}ms | {e['p95_ms']}ms "
+                         f"| {e['p99_ms']}ms |")
+
+    if report["errors"]:
+        lines += ["", "### Unreadable Results"]
+        lines += [f"- `{e['path']}`: {e['error']}" for e in report["errors"]]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    args = parse_args()
+    if not os.path.isdir(args.results_dir):
+        print(f"ERROR: Results directory not found: {args.results_dir}")
+        sys.exit(1)
+    started = time.perf_counter()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    report = build_report(args.results_dir, workers, args.exclude, args.slowest)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.markdown:
+        with open(args.markdown, "a") as f:
+            f.write(generate_markdown(report))
+
+    fleet = report["fleet"]
+    print(f"Fleet report for {fleet['apps']} apps in {time.perf_counter() - started:.2f}s: "
+          f"{fleet['jmeter_failed']}/{fleet['jmeter_runs']} JMeter and "
+          f"{fleet['testcomplete_failed']}/{fleet['testcomplete_runs']} TestComplete runs failed, "
+          f"{fleet['total_requests']} requests at {fleet['error_rate']}% errors -> {args.output}")
+    for error in report["errors"]:
+        print(f"WARNING: {error['path']}: {error['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Merge the result summaries of many apps into one fleet report.
+
+Artifacts downloaded from a run are searched for JMeter ``summary.json``
+files (or a bare ``results.jtl`` when the summary is missing) and
+TestComplete ``*-summary.json`` files. Each is loaded in a worker process and
+trimmed to its histograms and counts before it is returned, and the fleet is
+folded one summary at a time, so memory is bounded by apps x endpoints, never
+by the number of samples or time-series windows.
+
+JMeter runs of the same app and environment (several plans or injectors) are
+merged through their latency histograms, so fleet and per-app percentiles are
+exact to histogram resolution instead of averages of percentiles.
+"""
+
+import fnmatch
+import heapq
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from jtl_cache import aggregate_cached
+from jtl_stats import JtlAggregator, SampleStats
+
+DEFAULT_SLOWEST = 10
+# jmeter-results-<app>-<env>-<run> / testcomplete-results-<app>-<env>[-shard-<n>]
+ARTIFACT_NAME = re.compile(
+    r"^(?P<kind>jmeter|testcomplete)-results-(?P<app>[a-z0-9-]+?)-(?P<env>[a-z]+)"
+    r"(?:-shard)?(?:-\d+)?$"
+)
+# Kept from JMeter summaries; the time series and injector breakdown are not merged
+JMETER_KEYS = ("total_requests", "failed", "histogram", "endpoints", "start_timestamp",
+               "duration_seconds", "thresholds", "aborted", "test_plan")
+MAX_FAILED_ITEMS = 20
+
+
+def find_results(root, exclude=()):
+    """Yield result files under ``root`` in a stable order.
+
+    Directories whose name matches a glob in ``exclude`` are skipped.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if not any(fnmatch.fnmatch(d, pattern) for pattern in exclude))
+        summaries = sorted(name for name in filenames
+                           if name == "summary.json" or name.endswith("-summary.json"))
+        for name in summaries:
+            yield os.path.join(dirpath, name)
+        if "summary.json" not in filenames and "results.jtl" in filenames:
+            yield os.path.join(dirpath, "results.jtl")
+
+
+def _artifact_identity(path):
+    """``(kind, app, env)`` from the nearest artifact directory name, else Nones."""
+    for part in reversed(os.path.normpath(os.path.dirname(path)).split(os.sep)):
+        match = ARTIFACT_NAME.match(part)
+        if match:
+            return match.group("kind"), match.group("app"), match.group("env")
+    return None, None, None
+
+
+def load_result(path):
+    """Load one result file into a compact record for ``FleetReport.add``."""
+    try:
+        if path.endswith(".jtl"):
+            aggregator, _ = aggregate_cached(path, 1, "auto")
+            summary = aggregator.summary()
+        else:
+            with open(path) as f:
+                summary = json.load(f)
+    except (OSError, ValueError) as e:
+        return {"path": path, "error": str(e)}
+
+    kind, app, env = _artifact_identity(path)
+    if "items" in summary or "suite_name" in summary:
+        kind = "testcomplete"
+    elif "total_requests" in summary or "total" in summary:
+        kind = "jmeter"
+    if kind is None:
+        return {"path": path, "error": "Not a JMeter or TestComplete summary"}
+    record = {
+        "path": path,
+        "kind": kind,
+        "app": summary.get("app_name") or app or "unknown",
+        "environment": summary.get("environment") or env or "unknown",
+    }
+    if kind == "jmeter":
+        record["summary"] = {key: summary[key] for key in JMETER_KEYS if key in summary}
+        return record
+    items = summary.get("items", {})
+    record["summary"] = {
+        "suite_name": summary.get("suite_name"),
+        "status": summary.get("status"),
+        "passed": summary.get("passed", 0),
+        "failed": summary.get("failed", 0),
+        "flaky": summary.get("flaky", 0),
+        "duration_seconds": summary.get("duration_seconds"),
+        "failed_items": [name for name, item in items.items()
+                         if item.get("status") == "failed"][:MAX_FAILED_ITEMS],
+    }
+    return record
+
+
+def load_results(paths, workers=1):
+    """Yield records for ``paths``, loading them across ``workers`` processes."""
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield load_result(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(load_result, paths, chunksize=max(1, len(paths) // (workers * 4)))
+
+
+class FleetReport:
+    """Fold per-app records into fleet, app and endpoint statistics."""
+
+    def __init__(self):
+        self.jmeter = {}
+        self.testcomplete = {}
+        self.errors = []
+
+    def add(self, record):
+        if "error" in record:
+            self.errors.append({"path": record["path"], "error": record["error"]})
+            return
+        key = (record["app"], record["environment"])
+        summary = record["summary"]
+        if record["kind"] == "testcomplete":
+            run = self.testcomplete.setdefault(key, {
+                "suites": [], "passed": 0, "failed": 0, "flaky": 0,
+                "duration_seconds": None, "failed_items": [],
+            })
+            run["suites"].append(summary["suite_name"])
+            for count in ("passed", "failed", "flaky"):
+                run[count] += summary[count]
+            if summary["duration_seconds"] is not None:
+                run["duration_seconds"] = max(run["duration_seconds"] or 0,
+                                              summary["duration_seconds"])
+            run["failed_items"] += summary["failed_items"]
+            del run["failed_items"][MAX_FAILED_ITEMS:]
+            return
+
+        try:
+            partial = JtlAggregator.from_summary(summary)
+        except ValueError as e:
+            self.errors.append({"path": record["path"], "error": str(e)})
+            return
+        run = self.jmeter.get(key)
+        if run is None:
+            run = self.jmeter[key] = {"aggregator": JtlAggregator(), "plans": [],
+                                      "failures": [], "checked": False}
+        run["aggregator"].merge(partial)
+        if summary.get("test_plan"):
+            run["plans"].append(summary["test_plan"])
+        thresholds = summary.get("thresholds")
+        if thresholds:
+            run["checked"] = True
+            run["failures"] += thresholds.get("failures", [])
+        elif summary.get("aborted"):
+            run["checked"] = True
+            run["failures"].append("aborted early")
+
+    def report(self, slowest=DEFAULT_SLOWEST):
+        """Build the ``fleet-summary.json`` structure."""
+        fleet = SampleStats()
+        apps = []
+        endpoints = []
+        for (app, env), run in sorted(self.jmeter.items()):
+            aggregator = run["aggregator"]
+            fleet.merge(aggregator.overall)
+            summary = aggregator.summary()
+            status = ("failed" if run["failures"] else "passed") if run["checked"] else "unchecked"
+            entry = {
+                "app": app,
+                "environment": env,
+                "test_plans": sorted(set(run["plans"])),
+                "status": status,
+                "failures": run["failures"],
+            }
+            entry.update({k: v for k, v in summary.items()
+                          if k not in ("histogram", "endpoints", "start_timestamp")})
+            entry["endpoints"] = {}
+            for label, data in summary.get("endpoints", {}).items():
+                data = {k: v for k, v in data.items() if k not in ("histogram", "error_samples")}
+                data["error_rate"] = round(data["errors"] / data["total"] * 100, 2)
+                entry["endpoints"][label] = data
+                endpoints.append((data["p95_ms"], data["p99_ms"], app, env, label, data))
+            apps.append(entry)
+
+        suites = []
+        for (app, env), run in sorted(self.testcomplete.items()):
+            suites.append({
+                "app": app,
+                "environment": env,
+                "suites": sorted(set(filter(None, run["suites"]))),
+                "status": "failed" if run["failed"] else "passed" if run["passed"] else "no results",
+                "passed": run["passed"],
+                "failed": run["failed"],
+                "flaky": run["flaky"],
+                "duration_seconds": run["duration_seconds"],
+                "failed_items": run["failed_items"],
+            })
+
+        totals = {
+            "apps": len({app for app, _ in self.jmeter} | {app for app, _ in self.testcomplete}),
+            "jmeter_runs": len(apps),
+            "jmeter_failed": sum(1 for entry in apps if entry["status"] == "failed"),
+            "testcomplete_runs": len(suites),
+            "testcomplete_failed": sum(1 for entry in suites if entry["status"] == "failed"),
+            "total_requests": fleet.total,
+            "error_rate": round(fleet.errors / fleet.total * 100, 2) if fleet.total else 0.0,
+            "avg_response_time_ms": fleet.avg,
+            "max_response_time_ms": fleet.max,
+        }
+        totals.update(fleet.percentile_fields("_response_time_ms"))
+        return {
+            "fleet": totals,
+            "jmeter": apps,
+            "testcomplete": suites,
+            "slowest_endpoints": [
+                {"app": app, "environment": env, "label": label, "total": data["total"],
+                 "error_rate": data["error_rate"], "p50_ms": data["p50_ms"],
+                 "p95_ms": p95, "p99_ms": p99}
+                for p95, p99, app, env, label, data in heapq.nlargest(
+                    slowest, endpoints, key=lambda e: (e[0], e[1]))
+            ],
+            "errors": self.errors,
+        }
+
+
+def build_report(root, workers=1, exclude=(), slowest=DEFAULT_SLOWEST):
+    """Find, load and merge every result under ``root``."""
+    report = FleetReport()
+    for record in load_results(list(find_results(root, exclude)), workers):
+        report.add(record)
+    return report.report(slowest)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Run health-check plans without JMeter using asyncio.
+
+Reads ``health_endpoints``, ``threads`` and ``duration_seconds`` from an app's
+``jmeter.json`` and drives the endpoints with the same thread-group semantics
+as the generated JMeter plan: each virtual user requests every endpoint in
+turn until the duration elapses, over pooled keep-alive connections. Each
+endpoint's ``method``, ``timeout_ms`` and ``expected_status`` are honoured as
+in the compiled JMX. Samples are written as a JMeter-compatible CSV JTL so
+parse-jmeter-results.py works unchanged.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import ssl
+import sys
+import time
+from urllib.parse import urlsplit
+
+from config_resolver import load_shared_settings
+from jmx_compiler import plan_from_config
+
+JTL_FIELDS = [
+    "timeStamp", "elapsed", "label", "responseCode", "responseMessage",
+    "threadName", "dataType", "success", "failureMessage", "bytes",
+    "sentBytes", "grpThreads", "allThreads", "URL", "Latency", "IdleTime",
+    "Connect",
+]
+USER_AGENT = "qa-test-automation-health-check/1.0"
+MAX_HEADER_LINES = 100
+# Methods that must declare their (empty) body
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a health-check plan with asyncio")
+    parser.add_argument("--app", required=True, help="Application name")
+    parser.add_argument("--env", required=True, help="Environment name")
+    parser.add_argument("--config", required=True, help="Path to the app's jmeter.json")
+    parser.add_argument("--test-plan", default="health-check", help="Test plan name")
+    parser.add_argument("--base-url", default=None, help="Override the environment base URL")
+    parser.add_argument("--threads", type=int, default=None, help="Override virtual users")
+    parser.add_argument("--duration", type=int, default=None, help="Override duration in seconds")
+    parser.add_argument("--timeout-ms", type=int, default=5000,
+                        help="Per-request timeout in ms for endpoints without timeout_ms")
+    parser.add_argument("--output-dir", default="test-results/jmeter")
+    return parser.parse_args()
+
+
+def resolve_plan(config, env, test_plan, threads=None, duration=None):
+    """Resolve base URL, endpoints, threads, duration and ramp-up for a run.
+
+    Uses the same precedence as resolve-config.py: overrides, then the
+    environment, the plan and finally the shared-settings defaults. Endpoints
+    are resolved and normalised exactly as compile-jmx.py does.
+    """
+    defaults = load_shared_settings().get("jmeter", {})
+    plan = plan_from_config(config, env, test_plan, defaults, threads, duration)
+    return {
+        "base_url": plan["base_url"],
+        "endpoints": plan["endpoints"],
+        "threads": plan["threads"],
+        "duration": plan["duration_seconds"],
+        "ramp_up": plan["ramp_up_seconds"],
+    }
+
+
+class HttpResponseError(Exception):
+    """Raised when a response cannot be parsed."""
+
+
+class Connection:
+    """A single keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, reader, writer, connect_ms):
+        self.reader = reader
+        self.writer = writer
+        self.connect_ms = connect_ms
+        self.reusable = True
+
+    async def request(self, method, path, host):
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept: */*\r\n"
+            "Connection: keep-alive\r\n"
+            + ("Content-Length: 0\r\n" if method in BODY_METHODS else "")
+            + "\r\n"
+        ).encode("ascii")
+        self.writer.write(head)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HttpResponseError("Connection closed by server")
+        latency = time.monotonic()
+        parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise HttpResponseError(f"Malformed status line: {status_line!r}")
+        version, code = parts[0], int(parts[1])
+        message = parts[2] if len(parts) > 2 else ""
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        size = await self._read_body(method, code, headers)
+        connection = headers.get("connection", "").lower()
+        if connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive"):
+            self.reusable = False
+        return code, message, size + len(status_line), latency, len(head)
+
+    async def _read_body(self, method, code, headers):
+        if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+            return 0
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            size = 0
+            while True:
+                line = await self.reader.readline()
+                chunk = int(line.split(b";")[0].strip() or b"0", 16)
+                if chunk == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return size
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+        if "content-length" in headers:
+            length = int(headers["content-length"])
+            await self.reader.readexactly(length)
+            return length
+        # No framing: the body runs until the server closes the connection
+        self.reusable = False
+        body = await self.reader.read()
+        return len(body)
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keeps idle keep-alive connections to one origin for reuse."""
+
+    def __init__(self, base_url, max_idle):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.host_header = parts.netloc
+        self.base_path = parts.path.rstrip("/")
+        self.ssl = ssl.create_default_context() if self.scheme == "https" else None
+        self.idle = []
+        self.max_idle = max_idle
+        self.opened = 0
+
+    async def acquire(self):
+        """Return ``(connection, reused)``."""
+        if self.idle:
+            return self.idle.pop(), True
+        started = time.monotonic()
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        self.opened += 1
+        return Connection(reader, writer, round((time.monotonic() - started) * 1000)), False
+
+    def release(self, connection):
+        if connection.reusable and len(self.idle) < self.max_idle:
+            self.idle.append(connection)
+        else:
+            connection.close()
+
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+
+
+class JtlWriter:
+    """Streams samples to a JMeter-compatible CSV file."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(JTL_FIELDS)
+        self.active_threads = 0
+        self.samples = 0
+
+    def write(self, sample):
+        sample["grpThreads"] = self.active_threads
+        sample["allThreads"] = self.active_threads
+        self.writer.writerow([sample.get(field, "") for field in JTL_FIELDS])
+        self.samples += 1
+
+    def close(self):
+        self.file.close()
+
+
+def endpoint_name(endpoint):
+    """The path, prefixed by the method unless it is a GET."""
+    if endpoint["method"] != "GET":
+        return f"{endpoint['method']} {endpoint['path']}"
+    return endpoint["path"]
+
+
+def sample_label(endpoint):
+    """JTL label of an endpoint; the same as the compiled JMX sampler's name."""
+    return f"Health: {endpoint_name(endpoint)}"
+
+
+def check_status(code, expected_status):
+    """``(success, failure message)`` for a status code, as the JMX assertions judge it.
+
+    With ``expected_status`` the code must equal it; otherwise any 2xx/3xx passes.
+    """
+    if expected_status:
+        if str(code) == str(expected_status):
+            return True, ""
+        return False, f"Test failed: code expected {expected_status} but was {code}"
+    if 200 <= code < 400:
+        return True, ""
+    return False, f"Unexpected response code: {code}"
+
+
+async def sample_endpoint(pool, endpoint, thread_name, default_timeout):
+    """Request one endpoint and return a JTL sample dict.
+
+    A pooled connection the server has already closed is retried once on a
+    fresh connection, as JMeter does for stale keep-alive connections.
+    """
+    method = endpoint["method"]
+    timeout = endpoint["timeout_ms"] / 1000 if endpoint["timeout_ms"] else default_timeout
+    path = pool.base_path + endpoint["path"]
+    url = f"{pool.scheme}://{pool.host_header}{path}"
+    started_wall = int(time.time() * 1000)
+    started = time.monotonic()
+    connection = None
+    connect_ms = 0
+    try:
+        while True:
+            connection, reused = await asyncio.wait_for(pool.acquire(), timeout)
+            connect_ms = 0 if reused else connection.connect_ms
+            try:
+                code, message, size, latency_at, sent = await asyncio.wait_for(
+                    connection.request(method, path, pool.host_header), timeout
+                )
+                break
+            except (HttpResponseError, ConnectionError):
+                if not reused:
+                    raise
+                connection.close()
+        ok, failure = check_status(code, endpoint["expected_status"])
+        sample = {
+            "responseCode": code,
+            "responseMessage": message,
+            "success": "true" if ok else "false",
+            "failureMessage": failure,
+            "bytes": size,
+            "sentBytes": sent,
+            "Latency": round((latency_at - started) * 1000),
+        }
+        pool.release(connection)
+    except Exception as e:  # every failure becomes a failed sample, like JMeter
+        if connection is not None:
+            connection.close()
+        name = "TimeoutException" if isinstance(e, asyncio.TimeoutError) else type(e).__name__
+        sample = {
+            "responseCode": f"Non HTTP response code: {name}",
+            "responseMessage": f"Non HTTP response message: {e}",
+            "success": "false",
+            "failureMessage": str(e) or name,
+            "bytes": 0,
+            "sentBytes": 0,
+            "Latency": 0,
+        }
+    sample.update({
+        "timeStamp": started_wall,
+        "elapsed": round((time.monotonic() - started) * 1000),
+        "label": sample_label(endpoint),
+        "threadName": thread_name,
+        "dataType": "text",
+        "URL": url,
+        "IdleTime": 0,
+        "Connect": connect_ms,
+    })
+    return sample
+
+
+async def virtual_user(number, pool, endpoints, deadline, start_delay, timeout, jtl):
+    await asyncio.sleep(start_delay)
+    jtl.active_threads += 1
+    thread_name = f"Health Check Threads 1-{number}"
+    try:
+        while time.monotonic() < deadline:
+            for endpoint in endpoints:
+                if time.monotonic() >= deadline:
+                    break
+                jtl.write(await sample_endpoint(pool, endpoint, thread_name, timeout))
+    finally:
+        jtl.active_threads -= 1
+
+
+async def run_health_check(base_url, endpoints, threads, duration, ramp_up, jtl_path,
+                           timeout_ms=5000):
+    """Drive the endpoints for ``duration`` seconds; returns the sample count."""
+    pool = ConnectionPool(base_url, max_idle=threads)
+    jtl = JtlWriter(jtl_path)
+    deadline = time.monotonic() + duration
+    step = ramp_up / threads if threads else 0
+    try:
+        await asyncio.gather(*(
+            virtual_user(i + 1, pool, endpoints, deadline, i * step, timeout_ms / 1000, jtl)
+            for i in range(threads)
+        ))
+    finally:
+        pool.close()
+        jtl.close()
+    print(f"Connections opened: {pool.opened}")
+    return jtl.samples
+
+
+def main():
+    args = parse_args()
+    with open(args.config) as f:
+        config = json.load(f)
+    plan = resolve_plan(config, args.env, args.test_plan, args.threads, args.duration)
+    base_url = args.base_url or plan["base_url"]
+    if not base_url:
+        print(f"ERROR: No base_url for environment '{args.env}'")
+        sys.exit(1)
+    if not plan["endpoints"]:
+        print("ERROR: No health_endpoints configured")
+        sys.exit(1)
+
+    print("============================================================")
+    print("QA Test Automation - asyncio Health Check Runner")
+    print("============================================================")
+    print(f"Application: {args.app}")
+    print(f"Base URL:    {base_url}")
+    print(f"Endpoints:   {','.join(endpoint_name(e) for e in plan['endpoints'])}")
+    print(f"Test Plan:   {args.test_plan}")
+    print(f"Threads:     {plan['threads']}")
+    print(f"Duration:    {plan['duration']}s")
+    print(f"Output:      {args.output_dir}")
+    print("============================================================")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jtl_path = os.path.join(args.output_dir, "results.jtl")
+    samples = asyncio.run(run_health_check(
+        base_url,
+        plan["endpoints"],
+        plan["threads"],
+        plan["duration"],
+        plan["ramp_up"],
+        jtl_path,
+        args.timeout_ms,
+    ))
+    print(f"Samples written: {samples} -> {jtl_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Static HTML report for a JMeter run, rendered from its ``summary.json``.
+
+Replaces JMeter's ``-e -o`` dashboard, which rereads the whole JTL in the
+JVM after the run. Everything here comes from the aggregates the results
+pipeline already keeps: the overall and per-label statistics and latency
+histograms, the time-series windows, response codes and the sampled error
+rows. Rendering is proportional to labels x windows, never to the sample
+count, and a report can be regenerated from an archived summary at any time.
+
+The page is one self-contained ``index.html`` (inline CSS and SVG, no
+scripts or external assets) so it opens straight from a downloaded artifact.
+"""
+
+import html
+import math
+import os
+from datetime import datetime, timezone
+
+from jtl_stats import LatencyHistogram
+
+COLORS = ("#1f77b4", "#d62728", "#2ca02c", "#ff7f0e", "#9467bd",
+          "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf")
+# Per-label charts show the busiest labels only; the tables list them all
+MAX_CHART_LABELS = len(COLORS)
+DISTRIBUTION_POINTS = [i / 100 for i in range(100)] + [0.995, 0.999, 0.9999]
+CHART_WIDTH, CHART_HEIGHT, MARGIN = 900, 260, 56
+
+STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; margin: 24px;
+       color: #222; }
+h1 { margin-bottom: 4px; } h2 { margin-top: 32px; border-bottom: 1px solid #ddd; }
+.meta { color: #666; margin-bottom: 16px; }
+.tiles { display: flex; flex-wrap: wrap; gap: 12px; }
+.tile { border: 1px solid #ddd; border-radius: 6px; padding: 10px 16px; min-width: 120px; }
+.tile b { display: block; font-size: 1.4em; }
+.passed { color: #2ca02c; } .failed, .aborted { color: #d62728; }
+table { border-collapse: collapse; margin: 8px 0; font-size: 0.9em; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: right; }
+th { background: #f4f4f4; } td.text, th.text { text-align: left; }
+tr.errors td { background: #fdecea; }
+svg { font-size: 11px; } .legend span { margin-right: 14px; white-space: nowrap; }
+.legend i { display: inline-block; width: 12px; height: 3px; margin-right: 4px;
+            vertical-align: middle; }
+"""
+
+
+def _e(value):
+    return html.escape(str(value))
+
+
+def _nice_step(span, ticks=5):
+    """A 1/2/5 x 10^n step giving about ``ticks`` gridlines over ``span``."""
+    raw = max(span, 1e-9) / ticks
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+def _fmt(value):
+    return f"{value:,.0f}" if abs(value) >= 100 else f"{value:g}"
+
+
+def line_chart(title, x_values, series, x_label, y_unit=""):
+    """Inline SVG with one polyline per ``(name, values)`` in ``series``.
+
+    ``x_values`` are numbers shared by every series; ``x_label(x)`` formats
+    an axis tick. Values of None leave a gap.
+    """
+    series = [(name, values) for name, values in series if any(v is not None for v in values)]
+    if not x_values or not series:
+        return ""
+    width, height = CHART_WIDTH - 2 * MARGIN, CHART_HEIGHT - 2 * MARGIN
+    x_min, x_max = min(x_values), max(x_values)
+    y_max = max(v for _, values in series for v in values if v is not None) or 1
+    y_step = _nice_step(y_max)
+    y_max = y_step * -(-y_max // y_step)
+
+    def x_pos(x):
+        return MARGIN + (x - x_min) / ((x_max - x_min) or 1) * width
+
+    def y_pos(y):
+        return MARGIN + height - y / y_max * height
+
+    parts = [f'<svg width="{CHART_WIDTH}" height="{CHART_HEIGHT}" role="img" '
+             f'aria-label="{_e(title)}">',
+             f'<text x="{MARGIN}" y="{MARGIN - 20}" font-weight="bold">{_e(title)}</text>']
+    y = 0
+    while y <= y_max + y_step / 2:
+        pos = y_pos(y)
+        parts.append(f'<line x1="{MARGIN}" x2="{MARGIN + width}" y1="{pos:.1f}" y2="{pos:.1f}" '
+                     f'stroke="#eee"/><text x="{MARGIN - 6}" y="{pos + 4:.1f}" '
+                     f'text-anchor="end">{_fmt(y)}{y_unit}</text>')
+        y += y_step
+    for i in range(6):
+        x = x_min + (x_max - x_min) * i / 5
+        parts.append(f'<text x="{x_pos(x):.1f}" y="{MARGIN + height + 16}" '
+                     f'text-anchor="middle">{_e(x_label(x))}</text>')
+    parts.append(f'<rect x="{MARGIN}" y="{MARGIN}" width="{width}" height="{height}" '
+                 f'fill="none" stroke="#ccc"/>')
+    legend = []
+    for (name, values), color in zip(series, COLORS):
+        runs, run = [], []
+        for x, v in zip(x_values, values):
+            if v is None:
+                if run:
+                    runs.append(run)
+                run = []
+            else:
+                run.append(f"{x_pos(x):.1f},{y_pos(v):.1f}")
+        runs.append(run)
+        for points in filter(None, runs):
+            parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="1.5" '
+                         f'points="{" ".join(points)}"/>')
+        legend.append(f'<span><i style="background:{color}"></i>{_e(name)}</span>')
+    parts.append("</svg>")
+    return "\n".join(parts) + f'\n<div class="legend">{"".join(legend)}</div>'
+
+
+def bar_chart(title, bars, y_unit=""):
+    """Inline SVG bar chart of ``(label, value)`` pairs."""
+    if not bars:
+        return ""
+    width, height = CHART_WIDTH - 2 * MARGIN, CHART_HEIGHT - 2 * MARGIN
+    y_max = max(value for _, value in bars) or 1
+    slot = width / len(bars)
+    parts = [f'<svg width="{CHART_WIDTH}" height="{CHART_HEIGHT}" role="img" '
+             f'aria-label="{_e(title)}">',
+             f'<text x="{MARGIN}" y="{MARGIN - 20}" font-weight="bold">{_e(title)}</text>',
+             f'<line x1="{MARGIN}" x2="{MARGIN + width}" y1="{MARGIN + height}" '
+             f'y2="{MARGIN + height}" stroke="#ccc"/>']
+    for i, (label, value) in enumerate(bars):
+        bar = value / y_max * height
+        x = MARGIN + i * slot
+        parts.append(f'<rect x="{x + slot * 0.1:.1f}" y="{MARGIN + height - bar:.1f}" '
+                     f'width="{slot * 0.8:.1f}" height="{bar:.1f}" fill="{COLORS[0]}">'
+                     f'<title>{_e(label)}: {_fmt(value)}{y_unit}</title></rect>')
+        parts.append(f'<text x="{x + slot / 2:.1f}" y="{MARGIN + height + 14}" '
+                     f'text-anchor="middle" font-size="9">{_e(label)}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def latency_bands(histogram):
+    """Sample counts per power-of-two latency band, from a serialised histogram."""
+    bands = {}
+    for index, count in histogram.get("buckets", []):
+        low, _ = LatencyHistogram.bucket_bounds(int(index))
+        band = max(low, 1).bit_length() - 1
+        bands[band] = bands.get(band, 0) + count
+    if not bands:
+        return []
+    return [(f"{1 << band}-{(2 << band) - 1}" if band else "0-1", bands.get(band, 0))
+            for band in range(min(bands), max(bands) + 1)]
+
+
+def _distribution(histogram):
+    hist = LatencyHistogram.from_dict(histogram)
+    return hist.percentiles(DISTRIBUTION_POINTS) if hist.count else None
+
+
+def _table(headers, rows, text_columns=(0,), row_class=None):
+    """HTML table; columns in ``text_columns`` are left-aligned, the rest are numbers."""
+    head = "".join(f'<th class="text">{_e(h)}</th>' if i in text_columns else f"<th>{_e(h)}</th>"
+                   for i, h in enumerate(headers))
+    body = []
+    for row in rows:
+        cls = f' class="{row_class(row)}"' if row_class and row_class(row) else ""
+        cells = "".join(f'<td class="text">{_e(v)}</td>' if i in text_columns else f"<td>{_e(v)}</td>"
+                        for i, v in enumerate(row))
+        body.append(f"<tr{cls}>{cells}</tr>")
+    return f"<table><tr>{head}</tr>{''.join(body)}</table>"
+
+
+def _utc(timestamp_ms):
+    return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _elapsed(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}" if seconds >= 3600 \
+        else f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def render_report(summary, title=None):
+    """Return the report for ``summary`` (a parsed ``summary.json``) as an HTML string."""
+    app = summary.get("app_name", "")
+    title = title or " / ".join(filter(None, ["JMeter Results", app, summary.get("environment"),
+                                              summary.get("test_plan")]))
+    body = [f"<h1>{_e(title)}</h1>"]
+    meta = []
+    if "start_timestamp" in summary:
+        meta.append(f"Started {_utc(summary['start_timestamp'])} UTC")
+    if "duration_seconds" in summary:
+        meta.append(f"duration {_elapsed(summary['duration_seconds'])}")
+    body.append(f'<div class="meta">{_e(", ".join(meta))}</div>')
+
+    total = summary.get("total_requests", 0)
+    thresholds = summary.get("thresholds") or {}
+    status = "aborted" if summary.get("aborted") else thresholds.get("status", "")
+    tiles = [("Status", status.upper() or "-", status)] if status else []
+    if total:
+        tiles += [
+            ("Requests", f"{total:,}", ""),
+            ("Error Rate", f"{summary['error_rate']}%", "failed" if summary["failed"] else ""),
+            ("Throughput", f"{summary.get('throughput_rps', '-')} req/s", ""),
+            ("Avg", f"{summary['avg_response_time_ms']}ms", ""),
+            ("P90", f"{summary['p90_response_time_ms']}ms", ""),
+            ("P95", f"{summary['p95_response_time_ms']}ms", ""),
+            ("P99", f"{summary['p99_response_time_ms']}ms", ""),
+        ]
+    body.append('<div class="tiles">' + "".join(
+        f'<div class="tile">{_e(name)}<b class="{cls}">{_e(value)}</b></div>'
+        for name, value, cls in tiles) + "</div>")
+    if summary.get("aborted"):
+        body.append("<p class=\"aborted\">Aborted early: "
+                    f"{_e('; '.join(summary['aborted'].get('reasons', [])))}</p>")
+    for failure in thresholds.get("failures", []):
+        body.append(f'<p class="failed">Threshold failed: {_e(failure)}</p>')
+    if not total:
+        body.append("<p>No samples were recorded.</p>")
+        return _page(title, body)
+
+    endpoints = summary.get("endpoints", {})
+    body.append("<h2>Statistics</h2>")
+    rows = [("Total", total, summary["failed"], f"{summary['error_rate']}%",
+             summary["avg_response_time_ms"], summary["min_response_time_ms"],
+             summary["max_response_time_ms"], summary["p50_response_time_ms"],
+             summary["p90_response_time_ms"], summary["p95_response_time_ms"],
+             summary["p99_response_time_ms"])]
+    for label, data in sorted(endpoints.items()):
+        rows.append((label, data["total"], data["errors"],
+                     f"{round(data['errors'] / data['total'] * 100, 2) if data['total'] else 0}%",
+                     data["avg_ms"], data["min_ms"], data["max_ms"], data["p50_ms"],
+                     data["p90_ms"], data["p95_ms"], data["p99_ms"]))
+    body.append(_table(("Label", "Samples", "Errors", "Error %", "Avg ms", "Min ms", "Max ms",
+                        "P50 ms", "P90 ms", "P95 ms", "P99 ms"), rows,
+                       row_class=lambda row: "errors" if row[2] else ""))
+
+    busiest = sorted(endpoints, key=lambda label: -endpoints[label]["total"])[:MAX_CHART_LABELS]
+    timeseries = summary.get("timeseries") or {}
+    windows = timeseries.get("windows", [])
+    if windows:
+        start = windows[0]["start"]
+        xs = [(w["start"] - start) / 1000 for w in windows]
+        body.append("<h2>Over Time</h2>")
+        body.append(line_chart("Throughput", xs, [
+            ("requests/s", [w["throughput_rps"] for w in windows]),
+            ("errors/s", [round(w["errors"] / timeseries["window_seconds"], 2) for w in windows]),
+        ], _elapsed, ""))
+        body.append(line_chart("Response time percentiles", xs, [
+            (name.upper(), [w[f"{name}_ms"] for w in windows])
+            for name in ("p50", "p90", "p95", "p99")
+        ], _elapsed, "ms"))
+        body.append(line_chart("P95 by label", xs, [
+            (label, [w["endpoints"][label]["p95_ms"] if label in w["endpoints"] else None
+                     for w in windows])
+            for label in busiest
+        ], _elapsed, "ms"))
+        body.append(line_chart("Error rate by label", xs, [
+            (label, [w["endpoints"][label]["error_rate"] if label in w["endpoints"] else None
+                     for w in windows])
+            for label in busiest
+        ], _elapsed, "%"))
+
+    body.append("<h2>Response Time Distribution</h2>")
+    body.append(bar_chart("Samples per latency band (ms)", latency_bands(summary["histogram"])))
+    fractions = [f * 100 for f in DISTRIBUTION_POINTS]
+    distributions = [("All", _distribution(summary["histogram"]))]
+    distributions += [(label, _distribution(endpoints[label]["histogram"]))
+                      for label in busiest if "histogram" in endpoints[label]]
+    body.append(line_chart("Response time percentiles", fractions,
+                           [(name, values) for name, values in distributions if values],
+                           lambda x: f"{x:g}%", "ms"))
+
+    codes = summary.get("response_codes")
+    if codes:
+        body.append("<h2>Response Codes</h2>")
+        body.append(_table(("Code", "Samples", "Share"),
+                           [(code or "(none)", count, f"{round(count / total * 100, 2)}%")
+                            for code, count in codes.items()]))
+        failing = [(label, data) for label, data in sorted(endpoints.items()) if data["errors"]]
+        if failing:
+            body.append(_table(("Label", "Errors", "Response Codes"), [
+                (label, data["errors"], ", ".join(f"{code or '(none)'}: {count}"
+                                                  for code, count in data["response_codes"].items()))
+                for label, data in failing
+            ], text_columns=(0, 2)))
+
+    samples = summary.get("error_samples")
+    if samples:
+        body.append(f"<h2>Sample Errors</h2><p>{len(samples)} of {summary['failed']} "
+                    "failed requests, sampled evenly across the run.</p>")
+        body.append(_table(("Time (UTC)", "Label", "Code", "Elapsed ms", "Message"), [
+            (_utc(row["timestamp"]), row["label"], row["response_code"], row["elapsed_ms"],
+             row["failure_message"] or row["response_message"])
+            for row in samples
+        ], text_columns=(0, 1, 2, 4)))
+    return _page(title, body)
+
+
+def _page(title, body):
+    return ("<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+            f"<title>{_e(title)}</title><style>{STYLE}</style></head><body>\n"
+            + "\n".join(body) + "\n</body></html>\n")
+
+
+def write_report(summary, output_dir, title=None):
+    """Render ``summary`` into ``output_dir/index.html`` and return the path."""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_report(summary, title))
+    return path
@@ -0,0 +1,192 @@
+"""Compile JMeter test plans from an app's ``jmeter.json``.
+
+A plan is described by a small dict (see ``plan_from_config``): base URL,
+threads, duration, ramp-up and the endpoints with their method, expected
+status, timeout and weight. ``compile_plan`` renders it to JMX; endpoints
+without weights are all requested on every iteration, weighted endpoints are
+picked one per iteration in proportion to their weight.
+
+``compile_cached`` stores the JMX under the SHA-256 of the plan dict, so an
+unchanged config is not rendered twice into the same cache directory.
+"""
+
+import hashlib
+import json
+import os
+import urllib.parse
+from xml.sax.saxutils import escape, quoteattr
+
+from config_resolver import plan_settings
+
+COMPILER_VERSION = 2
+
+
+def normalise_endpoints(endpoints):
+    """Endpoint strings or objects -> list of complete endpoint dicts."""
+    normalised = []
+    for endpoint in endpoints or []:
+        if not isinstance(endpoint, dict):
+            endpoint = {"path": endpoint}
+        path = str(endpoint["path"]).strip()
+        normalised.append({
+            "path": path if path.startswith("/") else "/" + path,
+            "method": str(endpoint.get("method", "GET")).upper(),
+            "expected_status": endpoint.get("expected_status"),
+            "timeout_ms": endpoint.get("timeout_ms"),
+            "weight": endpoint.get("weight"),
+        })
+    return normalised
+
+
+def plan_from_config(jmeter, env, test_plan, defaults=None, threads=None, duration=None,
+                     ramp_up=None, base_url=None):
+    """Resolve everything a compiled plan depends on.
+
+    Endpoints come from the environment's ``health_endpoints``, else the
+    plan's ``endpoints``, else the app's ``health_endpoints``.
+    """
+    environment = (jmeter.get("environments") or {}).get(env) or {}
+    plan = (jmeter.get("test_plans") or {}).get(test_plan)
+    plan = plan if isinstance(plan, dict) else {}
+    settings = plan_settings(jmeter, env, test_plan, defaults, threads, duration)
+    if ramp_up is not None:
+        settings["ramp_up_seconds"] = int(ramp_up)
+    endpoints = (environment.get("health_endpoints") or plan.get("endpoints")
+                 or jmeter.get("health_endpoints") or [])
+    return {
+        "name": test_plan,
+        "base_url": base_url or environment.get("base_url", ""),
+        "threads": settings["threads"],
+        "duration_seconds": settings["duration_seconds"],
+        "ramp_up_seconds": settings["ramp_up_seconds"],
+        "endpoints": normalise_endpoints(endpoints),
+    }
+
+
+def plan_digest(plan):
+    payload = json.dumps({"compiler": COMPILER_VERSION, "plan": plan}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _prop(kind, name, value):
+    return f"<{kind} name={quoteattr(name)}>{escape(str(value))}</{kind}>"
+
+
+def _sampler(endpoint, target, indent):
+    pad = " " * indent
+    # Same labels as the shell generator and health-check.py, so history lines up
+    name = f"Health: {endpoint['path']}"
+    if endpoint["method"] != "GET":
+        name = f"Health: {endpoint['method']} {endpoint['path']}"
+    path = target.path.rstrip("/") + endpoint["path"]
+    lines = [
+        f'{pad}<HTTPSamplerProxy guiclass="HttpTestSampleGui" testclass="HTTPSamplerProxy" '
+        f'testname={quoteattr(name)}>',
+        f"{pad}  " + _prop("stringProp", "HTTPSampler.domain", target.hostname or ""),
+        f"{pad}  " + _prop("stringProp", "HTTPSampler.port", target.port or ""),
+        f"{pad}  " + _prop("stringProp", "HTTPSampler.protocol", target.scheme or "https"),
+        f"{pad}  " + _prop("stringProp", "HTTPSampler.path", path),
+        f"{pad}  " + _prop("stringProp", "HTTPSampler.method", endpoint["method"]),
+        f"{pad}  " + _prop("boolProp", "HTTPSampler.follow_redirects", "true"),
+        f"{pad}  " + _prop("boolProp", "HTTPSampler.use_keepalive", "true"),
+    ]
+    if endpoint["timeout_ms"]:
+        lines.append(f"{pad}  " + _prop("stringProp", "HTTPSampler.connect_timeout",
+                                        endpoint["timeout_ms"]))
+        lines.append(f"{pad}  " + _prop("stringProp", "HTTPSampler.response_timeout",
+                                        endpoint["timeout_ms"]))
+    lines.append(f"{pad}</HTTPSamplerProxy>")
+    if endpoint["expected_status"]:
+        lines += [
+            f"{pad}<hashTree>",
+            f'{pad}  <ResponseAssertion guiclass="AssertionGui" testclass="ResponseAssertion" '
+            f'testname="Status {endpoint["expected_status"]}">',
+            f'{pad}    <collectionProp name="Asserion.test_strings">',
+            f"{pad}      " + _prop("stringProp", "status", endpoint["expected_status"]),
+            f"{pad}    </collectionProp>",
+            f"{pad}    " + _prop("stringProp", "Assertion.test_field",
+                                 "Assertion.response_code"),
+            f"{pad}    " + _prop("intProp", "Assertion.test_type", 8),
+            # Otherwise JMeter still fails an expected 4xx/5xx before asserting
+            f"{pad}    " + _prop("boolProp", "Assertion.assume_success", "true"),
+            f"{pad}  </ResponseAssertion>",
+            f"{pad}  <hashTree/>",
+            f"{pad}</hashTree>",
+        ]
+    else:
+        lines.append(f"{pad}<hashTree/>")
+    return lines
+
+
+def _weighted_switch(weights):
+    """Switch value picking child ``i`` with probability ``weights[i] / sum``."""
+    table = r"\,".join(str(w) for w in weights)
+    script = (f"def w = [{table}]; def r = new Random().nextInt({sum(weights)}); "
+              "int i = 0; while (r >= w[i]) { r -= w[i]; i++ }; i")
+    return "${__groovy(" + script + ",)}"
+
+
+def compile_plan(plan):
+    """Render a plan dict to JMX text."""
+    target = urllib.parse.urlsplit(plan["base_url"])
+    endpoints = plan["endpoints"]
+    weighted = any(e["weight"] is not None for e in endpoints)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<jmeterTestPlan version="1.2" properties="5.0" jmeter="5.6.3">',
+        "  <hashTree>",
+        f'    <TestPlan guiclass="TestPlanGui" testclass="TestPlan" '
+        f'testname={quoteattr(plan["name"] + " plan")}>',
+        "      " + _prop("boolProp", "TestPlan.functional_mode", "false"),
+        "    </TestPlan>",
+        "    <hashTree>",
+        '      <ThreadGroup guiclass="ThreadGroupGui" testclass="ThreadGroup" '
+        f'testname={quoteattr(plan["name"] + " threads")}>',
+        '        <elementProp name="ThreadGroup.main_controller" elementType="LoopController" '
+        'guiclass="LoopControlPanel" testclass="LoopController">',
+        "          " + _prop("boolProp", "LoopController.continue_forever", "false"),
+        "          " + _prop("intProp", "LoopController.loops", -1),
+        "        </elementProp>",
+        "        " + _prop("intProp", "ThreadGroup.num_threads", plan["threads"]),
+        "        " + _prop("intProp", "ThreadGroup.ramp_time", plan["ramp_up_seconds"]),
+        "        " + _prop("boolProp", "ThreadGroup.scheduler", "true"),
+        "        " + _prop("stringProp", "ThreadGroup.duration", plan["duration_seconds"]),
+        "      </ThreadGroup>",
+        "      <hashTree>",
+    ]
+    if weighted:
+        weights = [max(int(e["weight"] if e["weight"] is not None else 1), 1) for e in endpoints]
+        lines += [
+            '        <SwitchController guiclass="SwitchControllerGui" testclass="SwitchController" '
+            'testname="Weighted endpoints">',
+            "          " + _prop("stringProp", "SwitchController.value", _weighted_switch(weights)),
+            "        </SwitchController>",
+            "        <hashTree>",
+        ]
+        for endpoint in endpoints:
+            lines += _sampler(endpoint, target, 10)
+        lines.append("        </hashTree>")
+    else:
+        for endpoint in endpoints:
+            lines += _sampler(endpoint, target, 8)
+    lines += [
+        "      </hashTree>",
+        "    </hashTree>",
+        "  </hashTree>",
+        "</jmeterTestPlan>",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def compile_cached(plan, cache_dir):
+    """Return ``(path, cached)`` of the plan's JMX under ``cache_dir``."""
+    path = os.path.join(cache_dir, f"{plan_digest(plan)}.jmx")
+    if os.path.exists(path):
+        return path, True
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(compile_plan(plan))
+    os.replace(tmp, path)
+    return path, False
@@ -0,0 +1,111 @@
+"""Build the scheduled-regression job matrices from ``configs/apps/*/``.
+
+Every app whose tool is enabled and configures the target environment (and
+the requested suite or plan) becomes one matrix entry. Entries are ordered by
+predicted runner time, lightest first, and numbered into waves of
+``max_parallel_suites``: with ``strategy.max-parallel`` set to the same cap,
+GitHub starts them in that order, so the heavy plans run together at the end
+instead of tying up every runner from the start.
+
+Predictions are offline and deterministic: a JMeter entry costs its resolved
+``duration_seconds``; a TestComplete entry the sum of its items' durations
+from the results store when one is given, else ``DEFAULT_ITEM_SECONDS`` per
+item.
+"""
+
+from config_resolver import ConfigError, plan_settings
+from shard_planner import DEFAULT_ITEM_SECONDS, estimate_durations
+
+# GitHub Actions rejects a matrix with more entries than this
+MAX_MATRIX_JOBS = 256
+TEST_TYPES = ("testcomplete", "jmeter")
+
+
+def select_apps(resolver, apps=None, tags=None):
+    """Return ``{app: config}`` for the requested apps carrying any of ``tags``.
+
+    ``apps`` and ``tags`` are lists; empty means no filter. Apps whose config
+    does not load are returned as ``{app: ConfigError}``.
+    """
+    wanted = set(apps or [])
+    selected = {}
+    for app in resolver.app_names():
+        if wanted and app not in wanted:
+            continue
+        try:
+            config = resolver.load_app(app)
+        except ConfigError as e:
+            selected[app] = e
+            continue
+        if tags:
+            app_tags = set(config.get("tags") or [])
+            for kind in TEST_TYPES:
+                app_tags.update((config.get(kind) or {}).get("tags") or [])
+            if not app_tags.intersection(tags):
+                continue
+        selected[app] = config
+    return selected
+
+
+def testcomplete_entries(configs, env, suite, history_db=None, default=DEFAULT_ITEM_SECONDS):
+    """Matrix entries (unordered) for a TestComplete suite, and skip reasons."""
+    entries, skipped = [], {}
+    for app, config in configs.items():
+        testcomplete = config.get("testcomplete") or {}
+        if not testcomplete.get("enabled", True):
+            continue
+        if env not in (testcomplete.get("environments") or {}):
+            skipped[app] = f"no TestComplete environment '{env}'"
+            continue
+        items = (testcomplete.get("test_items") or {}).get(suite)
+        if not items:
+            skipped[app] = f"no TestComplete suite '{suite}'"
+            continue
+        estimates, _ = estimate_durations(history_db, app, env, items, default=default)
+        entries.append({"app": app, "suite": suite,
+                        "predicted_seconds": round(sum(estimates.values()), 1)})
+    return entries, skipped
+
+
+def jmeter_entries(configs, env, test_plan, defaults=None):
+    """Matrix entries (unordered) for a JMeter plan, and skip reasons.
+
+    The health check needs no plan entry; other plans must be configured.
+    """
+    entries, skipped = [], {}
+    for app, config in configs.items():
+        jmeter = config.get("jmeter") or {}
+        if not jmeter.get("enabled", True):
+            continue
+        if env not in (jmeter.get("environments") or {}):
+            skipped[app] = f"no JMeter environment '{env}'"
+            continue
+        if test_plan != "health-check" and test_plan not in (jmeter.get("test_plans") or {}):
+            skipped[app] = f"no JMeter plan '{test_plan}'"
+            continue
+        settings = plan_settings(jmeter, env, test_plan, defaults)
+        # The workflow runs each entry with these threads and duration, so
+        # the waves are ordered by the load that actually runs
+        entries.append({"app": app, "plan": test_plan,
+                        "predicted_seconds": float(settings["duration_seconds"]),
+                        "duration_seconds": int(settings["duration_seconds"]),
+                        "threads": int(settings["threads"])})
+    return entries, skipped
+
+
+def schedule_waves(entries, max_parallel):
+    """Order entries lightest first and number them into waves of ``max_parallel``."""
+    max_parallel = max(int(max_parallel), 1)
+    ordered = sorted(entries, key=lambda e: (e["predicted_seconds"], e.get("threads", 0), e["app"]))
+    for index, entry in enumerate(ordered):
+        entry["wave"] = index // max_parallel + 1
+    return ordered
+
+
+def predicted_makespan(ordered, max_parallel):
+    """Seconds until the last entry finishes when started in order on ``max_parallel`` runners."""
+    runners = [0.0] * max(int(max_parallel), 1)
+    for entry in ordered:
+        start = min(runners)
+        runners[runners.index(start)] = start + entry["predicted_seconds"]
+    return max(runners) if ordered else 0.0
@@ -0,0 +1,366 @@
+"""Compact binary sidecar for JTL files.
+
+The first analysis of ``results.jtl`` writes ``results.jtl.cache/`` next to
+it: one fixed-width, native-endian column file per field plus ``meta.json``
+holding the interned label and response-code tables, the size/mtime of the
+source CSV and the error rows that can reach a summary's error samples.
+Later analyses memory-map the columns and read them without copying or CSV
+parsing. A sidecar whose recorded source no longer matches the JTL is
+treated as stale and ignored.
+
+Messages are not stored per row: every run would need one table entry per
+distinct error text. Instead each label keeps the bottom-k sample of its
+ramp-up and of its steady-state error rows, split where the writing run's
+ramp-up ended, which together hold the sample any later run with the same
+ramp-up (excluded or not) would draw.
+"""
+
+import csv
+import json
+import mmap
+import os
+import shutil
+import sys
+from array import array
+
+from jtl_numpy import StringTable
+from jtl_stats import (ErrorSamples, JtlAggregator, aggregate_jtl, first_timestamp,
+                       resolve_backend)
+
+SIDECAR_SUFFIX = ".cache"
+SIDECAR_VERSION = 3
+FLUSH_ROWS = 65536
+
+# column name -> array typecode
+COLUMNS = {
+    "timestamp": "q",
+    "elapsed": "i",
+    "success": "B",
+    "label": "H",
+    "response_code": "H",
+}
+MAX_TABLE_SIZE = 1 << 16
+
+
+def sidecar_path(jtl_path):
+    return jtl_path + SIDECAR_SUFFIX
+
+
+def _source_fingerprint(jtl_path):
+    stat = os.stat(jtl_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_meta(jtl_path):
+    """Return the sidecar metadata if it is present and fresh, else None."""
+    meta_file = os.path.join(sidecar_path(jtl_path), "meta.json")
+    if not os.path.exists(jtl_path) or not os.path.exists(meta_file):
+        return None
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (meta.get("version") != SIDECAR_VERSION
+            or meta.get("byteorder") != sys.byteorder
+            or meta.get("source") != _source_fingerprint(jtl_path)):
+        return None
+    return meta
+
+
+class _BoundedTable(StringTable):
+    def code(self, value):
+        if value not in self.codes and len(self.values) >= MAX_TABLE_SIZE:
+            raise OverflowError("too many distinct values for the sidecar format")
+        return super().code(value)
+
+
+class SidecarWriter:
+    """Appends rows to column files in a temporary directory.
+
+    ``close()`` publishes the sidecar atomically; ``abort()`` discards it.
+    Error rows go to ``add_error``; ``ramp_up_end`` is the timestamp where
+    the writing run's ramp-up ended, or None without a ramp-up. Rows come
+    one at a time through ``append`` or as NumPy batches through
+    ``append_columns``, whose label and response-code tables must be the
+    ``labels`` and ``response_codes`` given here.
+    """
+
+    def __init__(self, jtl_path, ramp_up_end=None, labels=None, response_codes=None):
+        self.jtl_path = jtl_path
+        self.ramp_up_end = ramp_up_end
+        self.source = _source_fingerprint(jtl_path)
+        self.final_dir = sidecar_path(jtl_path)
+        self.tmp_dir = f"{self.final_dir}.tmp{os.getpid()}"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+        self.files = {
+            name: open(os.path.join(self.tmp_dir, f"{name}.bin"), "wb") for name in COLUMNS
+        }
+        self.buffers = {name: array(code) for name, code in COLUMNS.items()}
+        self.labels = labels if labels is not None else _BoundedTable()
+        self.response_codes = response_codes if response_codes is not None else _BoundedTable()
+        # (label, in ramp-up) -> ErrorSamples
+        self.error_samples = {}
+        self.rows = 0
+
+    def append(self, timestamp, elapsed, success, label, response_code):
+        buffers = self.buffers
+        buffers["timestamp"].append(timestamp)
+        buffers["elapsed"].append(elapsed)
+        buffers["success"].append(1 if success else 0)
+        buffers["label"].append(self.labels.code(label))
+        buffers["response_code"].append(self.response_codes.code(response_code))
+        self.rows += 1
+        if self.rows % FLUSH_ROWS == 0:
+            self._flush()
+
+    def append_columns(self, cols):
+        if len(self.labels) > MAX_TABLE_SIZE or len(self.response_codes) > MAX_TABLE_SIZE:
+            raise OverflowError("too many distinct values for the sidecar format")
+        if len(cols) and not (-(1 << 31) <= int(cols.elapsed.min())
+                              and int(cols.elapsed.max()) < 1 << 31):
+            raise OverflowError("elapsed time out of range for the sidecar format")
+        # Rows buffered by append() come first in the files
+        self._flush()
+        for name, values in (("timestamp", cols.timestamp), ("elapsed", cols.elapsed),
+                             ("success", cols.success), ("label", cols.label),
+                             ("response_code", cols.response_code)):
+            self.files[name].write(values.astype(COLUMNS[name]).tobytes())
+        self.rows += len(cols)
+
+    def add_error(self, label, timestamp, elapsed, response_code, response_message,
+                  failure_message):
+        key = (label, self.ramp_up_end is not None and timestamp < self.ramp_up_end)
+        samples = self.error_samples.get(key)
+        if samples is None:
+            samples = self.error_samples[key] = ErrorSamples()
+        samples.offer(timestamp, elapsed, response_code, response_message, failure_message)
+
+    def _flush(self):
+        for name, buf in self.buffers.items():
+            buf.tofile(self.files[name])
+            del buf[:]
+
+    def close(self):
+        self._flush()
+        for f in self.files.values():
+            f.close()
+        error_samples = {}
+        for (label, _), samples in self.error_samples.items():
+            error_samples.setdefault(label, []).extend(samples.to_list())
+        meta = {
+            "version": SIDECAR_VERSION,
+            "byteorder": sys.byteorder,
+            "source": self.source,
+            "rows": self.rows,
+            "columns": COLUMNS,
+            "labels": self.labels.values,
+            "response_codes": self.response_codes.values,
+            "ramp_up_end": self.ramp_up_end,
+            "error_samples": error_samples,
+        }
+        with open(os.path.join(self.tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        shutil.rmtree(self.final_dir, ignore_errors=True)
+        os.replace(self.tmp_dir, self.final_dir)
+        return meta
+
+    def abort(self):
+        for f in self.files.values():
+            f.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class Sidecar:
+    """Read-only, memory-mapped view of a sidecar's columns."""
+
+    def __init__(self, jtl_path, meta):
+        self.meta = meta
+        self.rows = meta["rows"]
+        self.labels = meta["labels"]
+        self.response_codes = meta["response_codes"]
+        self.ramp_up_end = meta["ramp_up_end"]
+        self.error_samples = meta["error_samples"]
+        self._maps = []
+        self.columns = {}
+        base = sidecar_path(jtl_path)
+        for name, code in meta["columns"].items():
+            if not self.rows:
+                self.columns[name] = memoryview(array(code))
+                continue
+            with open(os.path.join(base, f"{name}.bin"), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            self.columns[name] = memoryview(mapped).cast(code)
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sidecar(jtl_path):
+    """Return a ``Sidecar`` for a fresh sidecar, or None if missing or stale."""
+    meta = read_meta(jtl_path)
+    return Sidecar(jtl_path, meta) if meta is not None else None
+
+
+def samples_match(sidecar, aggregator):
+    """Whether the sidecar holds the error samples ``aggregator`` would draw.
+
+    Only a run that excludes a ramp-up ending somewhere else than where the
+    writing run's did needs rows the sidecar has not kept.
+    """
+    if not (aggregator.exclude_ramp_up and aggregator.ramp_up_ms) or not sidecar.rows:
+        return True
+    start = aggregator.start_timestamp
+    if start is None:
+        start = sidecar.columns["timestamp"][0]
+    return sidecar.ramp_up_end == start + aggregator.ramp_up_ms
+
+
+def aggregate_sidecar(sidecar, aggregator, backend="python"):
+    """Fold every row of a sidecar, and its kept error rows, into an aggregator."""
+    if backend == "numpy":
+        import jtl_numpy
+
+        jtl_numpy.aggregate_sidecar(sidecar, aggregator)
+    else:
+        cols = sidecar.columns
+        labels = sidecar.labels
+        codes = sidecar.response_codes
+        add = aggregator.add
+        for timestamp, elapsed, success, label, code in zip(
+            cols["timestamp"], cols["elapsed"], cols["success"], cols["label"],
+            cols["response_code"]
+        ):
+            add(labels[label], elapsed, bool(success), timestamp, codes[code], sample=False)
+    add_error = aggregator.add_error
+    for label, rows in sidecar.error_samples.items():
+        for row in rows:
+            add_error(label, row["timestamp"], row["elapsed_ms"], row["response_code"],
+                      row["response_message"], row["failure_message"])
+    return aggregator
+
+
+def build_sidecar(jtl_path, aggregator=None, backend="python"):
+    """Parse the JTL once with ``backend``, writing the sidecar and aggregating.
+
+    Returns the sidecar metadata, or None if the file cannot be represented
+    (more distinct labels or response codes than the format allows).
+    """
+    aggregator = aggregator if aggregator is not None else JtlAggregator()
+    if aggregator.start_timestamp is None:
+        aggregator.start_timestamp = first_timestamp(jtl_path)
+    ramp_up_end = None
+    if aggregator.ramp_up_ms and aggregator.start_timestamp is not None:
+        ramp_up_end = aggregator.start_timestamp + aggregator.ramp_up_ms
+    if backend == "numpy":
+        writer = SidecarWriter(jtl_path, ramp_up_end, StringTable(), StringTable())
+        fill = _fill_columns
+    else:
+        writer = SidecarWriter(jtl_path, ramp_up_end)
+        fill = _fill_rows
+    try:
+        with open(jtl_path, "r", newline="") as f:
+            reader = csv.reader(f)
+            writing = fill(next(reader, None) or [], reader, aggregator, writer)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close() if writing else None
+
+
+def _fill_rows(header, rows, aggregator, writer):
+    """Pure-Python pass for ``build_sidecar``; returns False if the writer gave up."""
+    columns = {name: i for i, name in enumerate(header)}
+    i_ts = columns.get("timeStamp")
+    i_elapsed = columns.get("elapsed")
+    i_label = columns.get("label")
+    i_code = columns.get("responseCode")
+    i_success = columns.get("success")
+    i_response_message = columns.get("responseMessage")
+    i_failure_message = columns.get("failureMessage")
+    add = aggregator.add
+    append = writer.append
+    add_error = writer.add_error
+    writing = True
+    for row in rows:
+        if not row:
+            continue
+        timestamp = int(row[i_ts]) if i_ts is not None else 0
+        elapsed = int(row[i_elapsed]) if i_elapsed is not None else 0
+        success = i_success is not None and row[i_success].lower() == "true"
+        label = row[i_label] if i_label is not None else ""
+        code = row[i_code] if i_code is not None else ""
+        response_message = failure_message = ""
+        if not success:
+            if i_response_message is not None:
+                response_message = row[i_response_message]
+            if i_failure_message is not None:
+                failure_message = row[i_failure_message]
+        add(label, elapsed, success, timestamp, code, response_message, failure_message)
+        if writing:
+            try:
+                append(timestamp, elapsed, success, label, code)
+                if not success:
+                    add_error(label, timestamp, elapsed, code, response_message,
+                              failure_message)
+            except OverflowError:
+                writer.abort()
+                writing = False
+    return writing
+
+
+def _fill_columns(header, rows, aggregator, writer):
+    """NumPy pass for ``build_sidecar``; returns False if the writer gave up."""
+    import jtl_numpy
+
+    def on_error(*row):
+        aggregator.add_error(*row)
+        writer.add_error(*row)
+
+    writing = True
+    for cols in jtl_numpy.iter_column_batches(header, rows, writer.labels,
+                                              writer.response_codes, on_error=on_error):
+        jtl_numpy.aggregate_columns(cols, aggregator)
+        if writing:
+            try:
+                writer.append_columns(cols)
+            except OverflowError:
+                writer.abort()
+                writing = False
+    return writing
+
+
+def aggregate_cached(jtl_path, workers=1, backend="python", **options):
+    """Aggregate a JTL, preferring its sidecar and writing one when possible.
+
+    A fresh sidecar is read instead of the CSV unless its error samples were
+    drawn for another ramp-up (see ``samples_match``). Otherwise a serial run
+    parses the CSV once with ``backend`` and writes the sidecar in the same
+    pass; a parallel run (``workers > 1``) parses the CSV in ranges and
+    leaves the sidecar for a later serial run. Returns ``(aggregator, source)`` where ``source`` is
+    ``"sidecar"`` or ``"csv"``.
+    """
+    backend = resolve_backend(backend)
+    sidecar = open_sidecar(jtl_path)
+    if sidecar is not None:
+        with sidecar:
+            aggregator = JtlAggregator(**options)
+            if samples_match(sidecar, aggregator):
+                return aggregate_sidecar(sidecar, aggregator, backend), "sidecar"
+    if workers > 1 or not os.path.exists(jtl_path):
+        return aggregate_jtl(jtl_path, workers, backend, **options), "csv"
+    aggregator = JtlAggregator(**options)
+    build_sidecar(jtl_path, aggregator, backend)
+    return aggregator, "csv"
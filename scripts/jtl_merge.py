@@ -0,0 +1,129 @@
+"""Streaming merge of JTL files written by several JMeter injectors.
+
+Each injector writes its own ``results.jtl``. ``aggregate_jtl_files`` opens
+them all at once and ``heapq.merge``s their rows by ``timeStamp``, so the
+files are never concatenated and only one pending row per file is held in
+memory. Every sample is folded into a cluster-wide aggregator and into its
+injector's aggregator; both measure ramp-up from the cluster's first sample.
+"""
+
+import csv
+import glob
+import heapq
+import os
+from contextlib import ExitStack
+
+from jtl_stats import JtlAggregator
+
+
+def resolve_jtl_inputs(patterns):
+    """Expand files, directories and glob patterns into a sorted list of JTL paths.
+
+    A directory contributes every ``*.jtl`` file beneath it.
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*.jtl"), recursive=True)
+        elif glob.has_magic(pattern):
+            matches = glob.glob(pattern, recursive=True)
+        else:
+            matches = [pattern] if os.path.exists(pattern) else []
+        paths.update(os.path.normpath(p) for p in matches if os.path.isfile(p))
+    return sorted(paths)
+
+
+def injector_names(jtl_paths):
+    """Name each injector after its file, or its directory for ``results.jtl``.
+
+    Names that would collide fall back to the path relative to the files'
+    common directory.
+    """
+    def short(path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if stem == "results":
+            return os.path.basename(os.path.dirname(os.path.abspath(path))) or stem
+        return stem
+
+    names = [short(p) for p in jtl_paths]
+    if len(set(names)) == len(names):
+        return names
+    root = os.path.commonpath([os.path.abspath(p) for p in jtl_paths])
+    if len(jtl_paths) == 1:
+        root = os.path.dirname(root)
+    return [os.path.splitext(os.path.relpath(os.path.abspath(p), root))[0] for p in jtl_paths]
+
+
+def iter_samples(f, shard):
+    """Yield ``(timestamp, shard, label, elapsed, success, code, messages)`` for each row of ``f``.
+
+    ``messages`` is ``(response message, failure message)`` for error rows, else empty.
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if not header:
+        return
+    columns = {name: i for i, name in enumerate(header)}
+    i_ts = columns.get("timeStamp")
+    i_label = columns.get("label")
+    i_elapsed = columns.get("elapsed")
+    i_success = columns.get("success")
+    i_code = columns.get("responseCode")
+    i_response_message = columns.get("responseMessage")
+    i_failure_message = columns.get("failureMessage")
+    for row in reader:
+        if not row:
+            continue
+        success = i_success is not None and row[i_success].lower() == "true"
+        messages = () if success else (
+            row[i_response_message] if i_response_message is not None else "",
+            row[i_failure_message] if i_failure_message is not None else "",
+        )
+        yield (
+            int(row[i_ts]) if i_ts is not None else 0,
+            shard,
+            row[i_label] if i_label is not None else "",
+            int(row[i_elapsed]) if i_elapsed is not None else 0,
+            success,
+            row[i_code] if i_code is not None else "",
+            messages,
+        )
+
+
+def aggregate_jtl_files(jtl_paths, **options):
+    """Aggregate several JTL files as one run merged in timestamp order.
+
+    Returns ``(cluster, injectors)``: the cluster-wide ``JtlAggregator`` and a
+    dict of per-injector aggregators keyed by injector name, in input order.
+    Each file is expected to be in (approximately) timestamp order, as JMeter
+    writes it; the merge never buffers more than one row per file.
+    """
+    names = injector_names(jtl_paths)
+    cluster = JtlAggregator(**options)
+    per_shard = [None] * len(jtl_paths)
+    with ExitStack() as stack:
+        streams = [
+            iter_samples(stack.enter_context(open(path, "r", newline="")), shard)
+            for shard, path in enumerate(jtl_paths)
+        ]
+        add = cluster.add
+        for timestamp, shard, label, elapsed, success, code, messages in heapq.merge(*streams):
+            add(label, elapsed, success, timestamp, code, *messages)
+            injector = per_shard[shard]
+            if injector is None:
+                injector = per_shard[shard] = JtlAggregator(
+                    **dict(cluster.options(), window_seconds=0)
+                )
+            injector.add(label, elapsed, success, timestamp, code, *messages)
+    injectors = {
+        name: aggregator if aggregator is not None else JtlAggregator()
+        for name, aggregator in zip(names, per_shard)
+    }
+    return cluster, injectors
+
+
+def injector_summary(aggregator):
+    """Per-injector totals for ``summary.json``, without endpoints, histograms or error samples."""
+    summary = aggregator.summary()
+    return {k: v for k, v in summary.items()
+            if k not in ("histogram", "endpoints", "error_samples")}
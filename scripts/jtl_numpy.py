@@ -0,0 +1,307 @@
+"""Optional NumPy columnar backend for JTL aggregation.
+
+Rows are loaded in batches into typed columns (int64 timestamps and elapsed
+times, a bool success column, and label/response-code columns stored as
+integer codes into interned string tables) and reduced with array operations.
+Batches feed the same histograms as the pure-Python path, so both backends
+produce identical summaries. Error rows' messages never enter a column: each
+failed row is offered to the aggregator's error sample as it is read, so
+memory stays bounded however many distinct messages a run produces. Import
+never fails without NumPy; callers should check ``available()`` first.
+"""
+
+import csv
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; jtl_stats falls back to pure Python
+    np = None
+
+from jtl_stats import (JtlAggregator, LatencyHistogram, SampleStats, first_timestamp,
+                       iter_lines_until)
+
+BATCH_ROWS = 1_000_000
+
+
+def available():
+    """Return True when NumPy is importable."""
+    return np is not None
+
+
+class StringTable:
+    """Interns strings to dense integer codes in first-seen order."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class JtlColumns:
+    """A batch of JTL rows held as typed NumPy columns."""
+
+    __slots__ = ("timestamp", "elapsed", "success", "label", "response_code",
+                 "labels", "response_codes")
+
+    def __init__(self, timestamp, elapsed, success, label, response_code,
+                 labels, response_codes):
+        self.timestamp = timestamp
+        self.elapsed = elapsed
+        self.success = success
+        self.label = label
+        self.response_code = response_code
+        self.labels = labels
+        self.response_codes = response_codes
+
+    def __len__(self):
+        return len(self.elapsed)
+
+
+def iter_column_batches(header, rows, labels=None, response_codes=None,
+                        batch_rows=BATCH_ROWS, on_error=None):
+    """Convert raw CSV rows into ``JtlColumns`` batches of at most ``batch_rows``.
+
+    The string tables are shared across batches, so a label keeps the same
+    code for the whole file and codes follow first-seen order. Each failed
+    row is passed to ``on_error(label, timestamp, elapsed, response_code,
+    response_message, failure_message)`` as it is read.
+    """
+    labels = labels if labels is not None else StringTable()
+    response_codes = response_codes if response_codes is not None else StringTable()
+    columns = {name: i for i, name in enumerate(header)}
+    i_ts = columns.get("timeStamp")
+    i_elapsed = columns.get("elapsed")
+    i_label = columns.get("label")
+    i_code = columns.get("responseCode")
+    i_success = columns.get("success")
+    i_response_message = columns.get("responseMessage")
+    i_failure_message = columns.get("failureMessage")
+
+    def empty():
+        return array("q"), array("q"), bytearray(), array("l"), array("l")
+
+    ts, elapsed, success, label, code = empty()
+    label_code = labels.code
+    response_code = response_codes.code
+    for row in rows:
+        if not row:
+            continue
+        ok = i_success is not None and row[i_success].lower() == "true"
+        row_ts = int(row[i_ts]) if i_ts is not None else 0
+        row_elapsed = int(row[i_elapsed]) if i_elapsed is not None else 0
+        row_label = row[i_label] if i_label is not None else ""
+        row_code = row[i_code] if i_code is not None else ""
+        ts.append(row_ts)
+        elapsed.append(row_elapsed)
+        success.append(ok)
+        label.append(label_code(row_label))
+        code.append(response_code(row_code))
+        if not ok and on_error is not None:
+            on_error(row_label, row_ts, row_elapsed, row_code,
+                     row[i_response_message] if i_response_message is not None else "",
+                     row[i_failure_message] if i_failure_message is not None else "")
+        if len(elapsed) >= batch_rows:
+            yield _to_columns(ts, elapsed, success, label, code, labels, response_codes)
+            ts, elapsed, success, label, code = empty()
+    if len(elapsed):
+        yield _to_columns(ts, elapsed, success, label, code, labels, response_codes)
+
+
+def _to_columns(ts, elapsed, success, label, code, labels, response_codes):
+    return JtlColumns(
+        np.frombuffer(ts, dtype=np.int64),
+        np.frombuffer(elapsed, dtype=np.int64),
+        np.frombuffer(bytes(success), dtype=np.bool_),
+        np.frombuffer(label, dtype=np.dtype("l")).astype(np.int64),
+        np.frombuffer(code, dtype=np.dtype("l")).astype(np.int64),
+        labels,
+        response_codes,
+    )
+
+
+def bucket_indices(values):
+    """Vectorised ``LatencyHistogram.bucket_index`` for non-negative int64 values."""
+    indices = values.copy()
+    large = values >= LatencyHistogram.SUB_BUCKET_COUNT
+    if large.any():
+        v = values[large]
+        # frexp's exponent equals int.bit_length() for integers below 2**53.
+        _, exponent = np.frexp(v.astype(np.float64))
+        shift = exponent.astype(np.int64) - LatencyHistogram.SUB_BUCKET_BITS
+        indices[large] = (shift << LatencyHistogram.SUB_BUCKET_HALF_BITS) + (v >> shift)
+    return indices
+
+
+def group_stats(groups, elapsed, success, n_groups):
+    """Reduce rows into one ``SampleStats`` per group id.
+
+    Returns ``(group, stats)`` pairs for non-empty groups, ordered by each
+    group's first row so label order matches the row-by-row path.
+    """
+    if not len(groups):
+        return []
+    totals = np.bincount(groups, minlength=n_groups)
+    errors = np.bincount(groups[~success], minlength=n_groups)
+    sums = np.zeros(n_groups, dtype=np.int64)
+    np.add.at(sums, groups, elapsed)
+    mins = np.full(n_groups, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(mins, groups, elapsed)
+    maxs = np.full(n_groups, -1, dtype=np.int64)
+    np.maximum.at(maxs, groups, elapsed)
+    first = np.full(n_groups, len(groups), dtype=np.int64)
+    np.minimum.at(first, groups, np.arange(len(groups), dtype=np.int64))
+
+    buckets = bucket_indices(elapsed)
+    width = int(buckets.max()) + 1
+    keys, counts = np.unique(groups * width + buckets, return_counts=True)
+    key_groups = keys // width
+    key_buckets = keys % width
+    bounds = np.searchsorted(key_groups, np.arange(n_groups + 1))
+
+    present = np.flatnonzero(totals)
+    result = []
+    for group in present[np.argsort(first[present], kind="stable")]:
+        lo, hi = bounds[group], bounds[group + 1]
+        stats = SampleStats()
+        stats.total = int(totals[group])
+        stats.errors = int(errors[group])
+        hist = stats.histogram
+        hist.counts = dict(zip(key_buckets[lo:hi].tolist(), counts[lo:hi].tolist()))
+        hist.count = stats.total
+        hist.value_sum = int(sums[group])
+        hist.min = int(mins[group])
+        hist.max = int(maxs[group])
+        result.append((int(group), stats))
+    return result
+
+
+def aggregate_columns(cols, aggregator=None):
+    """Fold a ``JtlColumns`` batch into an aggregator using array operations.
+
+    Error samples are not drawn here; see ``iter_column_batches``.
+    """
+    aggregator = aggregator if aggregator is not None else JtlAggregator()
+    if not len(cols):
+        return aggregator
+
+    ts = cols.timestamp
+    if aggregator.start_timestamp is None:
+        aggregator.start_timestamp = int(ts[0])
+    partial = JtlAggregator(**aggregator.options())
+    partial.first_timestamp = int(ts.min())
+    partial.last_timestamp = int(ts.max())
+
+    n_labels = len(cols.labels)
+    labels = cols.labels.values
+    codes = cols.label
+    success = cols.success
+    elapsed = np.maximum(cols.elapsed, 0)
+
+    if partial.window_ms:
+        window_starts, window_ids = np.unique(ts - ts % partial.window_ms, return_inverse=True)
+        groups = window_ids.reshape(-1) * n_labels + codes
+        for group, stats in group_stats(groups, elapsed, success,
+                                        len(window_starts) * n_labels):
+            window_start = int(window_starts[group // n_labels])
+            partial.windows.setdefault(window_start, {})[labels[group % n_labels]] = stats
+
+    steady = None
+    if partial.ramp_up_ms:
+        ramp = ts < partial.start_timestamp + partial.ramp_up_ms
+        for _, stats in group_stats(np.zeros(int(ramp.sum()), dtype=np.int64),
+                                    elapsed[ramp], success[ramp], 1):
+            partial.ramp_up = stats
+        if partial.exclude_ramp_up:
+            steady = ~ramp
+
+    response_code = cols.response_code
+    if steady is not None:
+        codes, elapsed, success = codes[steady], elapsed[steady], success[steady]
+        response_code = response_code[steady]
+    for code, stats in group_stats(codes, elapsed, success, n_labels):
+        partial.overall.merge(stats)
+        partial.endpoints[labels[code]] = stats
+        partial.response_codes[labels[code]] = {}
+
+    n_codes = len(cols.response_codes)
+    if len(codes):
+        keys, counts = np.unique(codes * n_codes + response_code, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            partial.response_codes[labels[key // n_codes]][
+                cols.response_codes.values[key % n_codes]] = count
+    return aggregator.merge(partial)
+
+
+def aggregate_sidecar(sidecar, aggregator=None, batch_rows=BATCH_ROWS):
+    """Aggregate a memory-mapped ``jtl_cache.Sidecar`` without copying it whole.
+
+    The sidecar's kept error rows are left to the caller.
+    """
+    aggregator = aggregator if aggregator is not None else JtlAggregator()
+    labels = StringTable()
+    for value in sidecar.labels:
+        labels.code(value)
+    response_codes = StringTable()
+    for value in sidecar.response_codes:
+        response_codes.code(value)
+    cols = sidecar.columns
+    ts = np.frombuffer(cols["timestamp"], dtype=np.int64)
+    elapsed = np.frombuffer(cols["elapsed"], dtype=np.int32)
+    success = np.frombuffer(cols["success"], dtype=np.uint8).view(np.bool_)
+    label = np.frombuffer(cols["label"], dtype=np.uint16)
+    code = np.frombuffer(cols["response_code"], dtype=np.uint16)
+    for start in range(0, sidecar.rows, batch_rows):
+        batch = slice(start, start + batch_rows)
+        aggregate_columns(JtlColumns(
+            ts[batch],
+            elapsed[batch].astype(np.int64),
+            success[batch],
+            label[batch].astype(np.int64),
+            code[batch].astype(np.int64),
+            labels,
+            response_codes,
+        ), aggregator)
+    return aggregator
+
+
+def aggregate_csv_rows(header, rows, aggregator=None, batch_rows=BATCH_ROWS):
+    """Fold raw CSV rows into an aggregator batch by batch.
+
+    The aggregator's ``start_timestamp`` must be set when it excludes a ramp-up.
+    """
+    aggregator = aggregator if aggregator is not None else JtlAggregator()
+    for cols in iter_column_batches(header, rows, batch_rows=batch_rows,
+                                    on_error=aggregator.add_error):
+        aggregate_columns(cols, aggregator)
+    return aggregator
+
+
+def aggregate_jtl(jtl_path, aggregator=None):
+    """Aggregate a whole JTL file with the columnar backend."""
+    aggregator = aggregator if aggregator is not None else JtlAggregator()
+    if aggregator.start_timestamp is None:
+        aggregator.start_timestamp = first_timestamp(jtl_path)
+    with open(jtl_path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header:
+            aggregate_csv_rows(header, reader, aggregator)
+    return aggregator
+
+
+def aggregate_jtl_range(jtl_path, header, start, end, aggregator=None):
+    """Aggregate the rows between two line-aligned byte offsets."""
+    with open(jtl_path, "rb") as f:
+        f.seek(start)
+        return aggregate_csv_rows(header, csv.reader(iter_lines_until(f, start, end)),
+                                  aggregator)
@@ -0,0 +1,733 @@
+"""Streaming aggregation of JMeter JTL results.
+
+Rows are folded into running accumulators as they are read, so memory is
+bounded by the number of distinct labels rather than the number of samples.
+Besides latency, each label keeps a response-code histogram and a fixed-size
+sample of its error rows with their messages.
+"""
+
+import csv
+import heapq
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this size a process pool costs more than it saves.
+MIN_PARALLEL_CHUNK_BYTES = 4 * 1024 * 1024
+# Error rows kept per label, and the message length kept per row
+ERROR_SAMPLES = 10
+MAX_MESSAGE_CHARS = 500
+_MASK64 = (1 << 64) - 1
+
+
+def iter_jtl(jtl_path):
+    """Yield parsed JTL rows one at a time without buffering the file."""
+    if not os.path.exists(jtl_path):
+        return
+    with open(jtl_path, "r", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield {
+                "timestamp": int(row.get("timeStamp", 0)),
+                "elapsed": int(row.get("elapsed", 0)),
+                "label": row.get("label", ""),
+                "response_code": row.get("responseCode", ""),
+                "response_message": row.get("responseMessage", ""),
+                "failure_message": row.get("failureMessage", ""),
+                "success": row.get("success", "").lower() == "true",
+                "bytes": int(row.get("bytes", 0)),
+                "thread_name": row.get("threadName", ""),
+            }
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of integer millisecond latencies.
+
+    Values below ``2 ** SUB_BUCKET_BITS`` are counted exactly; above that each
+    power-of-two range is split into ``2 ** (SUB_BUCKET_BITS - 1)`` equal
+    buckets, so any reported percentile is within ``1 / 2 ** (SUB_BUCKET_BITS
+    - 1)`` of the true value. Buckets are stored sparsely, keeping memory
+    bounded by the latency range rather than the sample count, and two
+    histograms merge by adding bucket counts.
+    """
+
+    SUB_BUCKET_BITS = 8
+    SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+    SUB_BUCKET_HALF_BITS = SUB_BUCKET_BITS - 1
+
+    __slots__ = ("counts", "count", "value_sum", "min", "max")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.value_sum = 0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def bucket_index(cls, value):
+        if value < cls.SUB_BUCKET_COUNT:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        return (shift << cls.SUB_BUCKET_HALF_BITS) + (value >> shift)
+
+    @classmethod
+    def bucket_bounds(cls, index):
+        """Return the inclusive ``(low, high)`` value range of a bucket."""
+        if index < cls.SUB_BUCKET_COUNT:
+            return index, index
+        shift = (index >> cls.SUB_BUCKET_HALF_BITS) - 1
+        mantissa = index - (shift << cls.SUB_BUCKET_HALF_BITS)
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value, count=1):
+        if value < 0:
+            value = 0
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.value_sum += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Fold another histogram into this one."""
+        counts = self.counts
+        for index, count in other.counts.items():
+            counts[index] = counts.get(index, 0) + count
+        self.count += other.count
+        self.value_sum += other.value_sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    @property
+    def mean(self):
+        return round(self.value_sum / self.count) if self.count else 0
+
+    def percentile(self, fraction):
+        """Return the value at index ``int(count * fraction)`` of the sorted samples."""
+        return self.percentiles([fraction])[0]
+
+    def percentiles(self, fractions):
+        """Return several percentiles with a single walk over the buckets."""
+        if not self.count:
+            return [0 for _ in fractions]
+        ranks = sorted(
+            (min(int(self.count * fraction), self.count - 1), i)
+            for i, fraction in enumerate(fractions)
+        )
+        values = [0] * len(fractions)
+        pending = iter(ranks)
+        rank, slot = next(pending)
+        seen = 0
+        done = False
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while seen > rank:
+                high = self.bucket_bounds(index)[1]
+                values[slot] = max(self.min, min(high, self.max))
+                nxt = next(pending, None)
+                if nxt is None:
+                    done = True
+                    break
+                rank, slot = nxt
+            if done:
+                break
+        return values
+
+    def to_dict(self):
+        """Serialise to a JSON-friendly dictionary."""
+        return {
+            "sub_bucket_bits": self.SUB_BUCKET_BITS,
+            "count": self.count,
+            "sum": self.value_sum,
+            "min": self.min if self.min is not None else 0,
+            "max": self.max if self.max is not None else 0,
+            "buckets": [[index, self.counts[index]] for index in sorted(self.counts)],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("sub_bucket_bits", cls.SUB_BUCKET_BITS) != cls.SUB_BUCKET_BITS:
+            raise ValueError(
+                f"Unsupported histogram resolution: {data.get('sub_bucket_bits')}"
+            )
+        hist = cls()
+        hist.counts = {int(index): int(count) for index, count in data.get("buckets", [])}
+        hist.count = int(data.get("count", sum(hist.counts.values())))
+        hist.value_sum = int(data.get("sum", 0))
+        if hist.count:
+            hist.min = int(data.get("min", 0))
+            hist.max = int(data.get("max", 0))
+        return hist
+
+
+PERCENTILES = (
+    ("p50", 0.5),
+    ("p90", 0.9),
+    ("p95", 0.95),
+    ("p99", 0.99),
+)
+
+
+class SampleStats:
+    """Running totals for a stream of samples."""
+
+    __slots__ = ("total", "errors", "histogram")
+
+    def __init__(self):
+        self.total = 0
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+
+    def add(self, elapsed, success):
+        self.total += 1
+        if not success:
+            self.errors += 1
+        self.histogram.record(elapsed)
+
+    def merge(self, other):
+        """Fold another accumulator into this one."""
+        self.total += other.total
+        self.errors += other.errors
+        self.histogram.merge(other.histogram)
+        return self
+
+    @property
+    def min(self):
+        return self.histogram.min or 0
+
+    @property
+    def max(self):
+        return self.histogram.max or 0
+
+    @property
+    def avg(self):
+        return self.histogram.mean
+
+    def percentile(self, fraction):
+        return self.histogram.percentile(fraction)
+
+    def percentile_fields(self, suffix):
+        """Return ``{"p50<suffix>": ..., ...}`` for the standard percentiles."""
+        values = self.histogram.percentiles([fraction for _, fraction in PERCENTILES])
+        return {f"{name}{suffix}": value for (name, _), value in zip(PERCENTILES, values)}
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "errors": self.errors,
+            "histogram": self.histogram.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.total = int(data.get("total", 0))
+        stats.errors = int(data.get("errors", 0))
+        stats.histogram = LatencyHistogram.from_dict(data.get("histogram", {}))
+        return stats
+
+
+def sample_key(timestamp, elapsed, response_code, response_message, failure_message):
+    """Pseudo-random 64-bit key of an error row, derived only from the row."""
+    x = (timestamp * 0x9E3779B97F4A7C15 + elapsed * 0xBF58476D1CE4E5B9 + zlib.crc32(
+        f"{response_code}\0{response_message}\0{failure_message}".encode())) & _MASK64
+    x = ((x ^ (x >> 31)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 29)
+
+
+class ErrorSamples:
+    """Fixed-size uniform sample of error rows (bottom-k sampling).
+
+    Every row is keyed by ``sample_key`` and the ``size`` smallest keys are
+    kept. Keys do not depend on arrival order, so samples of file ranges,
+    injectors or earlier summaries merge into exactly the sample one pass
+    over all rows would have kept.
+    """
+
+    __slots__ = ("size", "heap")
+
+    def __init__(self, size=ERROR_SAMPLES):
+        self.size = size
+        # Max-heap on key: (-key, timestamp, elapsed, code, response message, failure message)
+        self.heap = []
+
+    def offer(self, timestamp, elapsed, response_code, response_message, failure_message):
+        response_message = response_message[:MAX_MESSAGE_CHARS]
+        failure_message = failure_message[:MAX_MESSAGE_CHARS]
+        entry = (-sample_key(timestamp, elapsed, response_code, response_message,
+                             failure_message),
+                 timestamp, elapsed, response_code, response_message, failure_message)
+        if len(self.heap) < self.size:
+            heapq.heappush(self.heap, entry)
+        elif entry[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def merge(self, other):
+        self.heap = heapq.nlargest(self.size, self.heap + other.heap)
+        heapq.heapify(self.heap)
+        return self
+
+    def to_list(self):
+        return [_error_row(entry) for entry in sorted(self.heap, key=_by_time)]
+
+    @classmethod
+    def from_list(cls, rows, size=ERROR_SAMPLES):
+        samples = cls(size)
+        for row in rows:
+            samples.offer(int(row["timestamp"]), int(row["elapsed_ms"]), row["response_code"],
+                          row["response_message"], row["failure_message"])
+        return samples
+
+
+def _by_time(entry):
+    return entry[1], entry[0]
+
+
+def _error_row(entry):
+    return {"timestamp": entry[1], "elapsed_ms": entry[2], "response_code": entry[3],
+            "response_message": entry[4], "failure_message": entry[5]}
+
+
+def _add_counts(target, source):
+    for key, count in source.items():
+        target[key] = target.get(key, 0) + count
+    return target
+
+
+def _sorted_counts(counts):
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+class JtlAggregator:
+    """Single-pass aggregator producing the ``summary.json`` structure.
+
+    ``window_seconds`` enables a bucketed time series. Samples that start
+    within ``ramp_up_seconds`` of ``start_timestamp`` (the first sample seen
+    when not given) are tallied separately and, with ``exclude_ramp_up``,
+    left out of the overall and per-endpoint stats that drive the verdict.
+    Aggregators that are merged must share the same options and start.
+    """
+
+    def __init__(self, window_seconds=0, ramp_up_seconds=0, exclude_ramp_up=False,
+                 start_timestamp=None):
+        self.window_seconds = window_seconds
+        self.ramp_up_seconds = ramp_up_seconds
+        self.exclude_ramp_up = exclude_ramp_up
+        self.window_ms = int(window_seconds * 1000)
+        self.ramp_up_ms = int(ramp_up_seconds * 1000)
+        self.start_timestamp = start_timestamp
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.overall = SampleStats()
+        self.endpoints = {}
+        # label -> {response code: count} and label -> ErrorSamples
+        self.response_codes = {}
+        self.error_samples = {}
+        self.ramp_up = SampleStats()
+        self.windows = {}
+
+    def options(self):
+        """Return the keyword arguments needed to build a compatible aggregator."""
+        return {
+            "window_seconds": self.window_seconds,
+            "ramp_up_seconds": self.ramp_up_seconds,
+            "exclude_ramp_up": self.exclude_ramp_up,
+            "start_timestamp": self.start_timestamp,
+        }
+
+    def add(self, label, elapsed, success, timestamp=0, response_code="",
+            response_message="", failure_message="", sample=True):
+        """Count one row; an error row is also offered to its label's sample.
+
+        Readers that get error rows' messages elsewhere pass ``sample=False``
+        and hand the rows to ``add_error`` instead.
+        """
+        if self.start_timestamp is None:
+            self.start_timestamp = timestamp
+        if self.first_timestamp is None or timestamp < self.first_timestamp:
+            self.first_timestamp = timestamp
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+        if self.window_ms:
+            window_start = timestamp - timestamp % self.window_ms
+            window = self.windows.get(window_start)
+            if window is None:
+                window = self.windows[window_start] = {}
+            stats = window.get(label)
+            if stats is None:
+                stats = window[label] = SampleStats()
+            stats.add(elapsed, success)
+
+        if self.ramp_up_ms and timestamp < self.start_timestamp + self.ramp_up_ms:
+            self.ramp_up.add(elapsed, success)
+            if self.exclude_ramp_up:
+                return
+
+        self.overall.add(elapsed, success)
+        stats = self.endpoints.get(label)
+        if stats is None:
+            stats = self.endpoints[label] = SampleStats()
+            self.response_codes[label] = {}
+        stats.add(elapsed, success)
+        codes = self.response_codes[label]
+        codes[response_code] = codes.get(response_code, 0) + 1
+        if not success and sample:
+            samples = self.error_samples.get(label)
+            if samples is None:
+                samples = self.error_samples[label] = ErrorSamples()
+            samples.offer(timestamp, elapsed, response_code, response_message, failure_message)
+
+    def add_error(self, label, timestamp, elapsed, response_code="", response_message="",
+                  failure_message=""):
+        """Offer an error row to its label's sample without counting it.
+
+        For readers that count rows separately; ``start_timestamp`` must
+        already be set so excluded ramp-up rows can be skipped.
+        """
+        if (self.exclude_ramp_up and self.ramp_up_ms
+                and timestamp < self.start_timestamp + self.ramp_up_ms):
+            return
+        samples = self.error_samples.get(label)
+        if samples is None:
+            samples = self.error_samples[label] = ErrorSamples()
+        samples.offer(timestamp, elapsed, response_code, response_message, failure_message)
+
+    def add_row(self, row):
+        self.add(row["label"], row["elapsed"], row["success"], row.get("timestamp", 0),
+                 row.get("response_code", ""), row.get("response_message", ""),
+                 row.get("failure_message", ""))
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add_row(row)
+        return self
+
+    def add_jtl(self, jtl_path):
+        """Fold a JTL file into the aggregator, reading only the needed columns."""
+        if not os.path.exists(jtl_path):
+            return self
+        with open(jtl_path, "r", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header:
+                self.add_csv_rows(header, reader)
+        return self
+
+    def add_jtl_range(self, jtl_path, header, start, end):
+        """Fold the rows between byte offsets ``start`` and ``end`` of a JTL file.
+
+        ``start`` must sit on a line boundary; the row that straddles ``end``
+        belongs to this range.
+        """
+        with open(jtl_path, "rb") as f:
+            f.seek(start)
+            self.add_csv_rows(header, csv.reader(iter_lines_until(f, start, end)))
+        return self
+
+    def add_csv_rows(self, header, rows):
+        """Fold raw CSV rows whose columns are described by ``header``."""
+        columns = {name: i for i, name in enumerate(header)}
+        i_ts = columns.get("timeStamp")
+        i_label = columns.get("label")
+        i_elapsed = columns.get("elapsed")
+        i_success = columns.get("success")
+        i_code = columns.get("responseCode")
+        i_response_message = columns.get("responseMessage")
+        i_failure_message = columns.get("failureMessage")
+        add = self.add
+        for row in rows:
+            if not row:
+                continue
+            label = row[i_label] if i_label is not None else ""
+            elapsed = int(row[i_elapsed]) if i_elapsed is not None else 0
+            timestamp = int(row[i_ts]) if i_ts is not None else 0
+            code = row[i_code] if i_code is not None else ""
+            if i_success is not None and row[i_success].lower() == "true":
+                add(label, elapsed, True, timestamp, code)
+                continue
+            # Messages are only kept for error rows
+            add(label, elapsed, False, timestamp, code,
+                row[i_response_message] if i_response_message is not None else "",
+                row[i_failure_message] if i_failure_message is not None else "")
+        return self
+
+    def merge(self, other):
+        """Fold another aggregator into this one, preserving label order."""
+        _merge_stats_map(self.endpoints, other.endpoints)
+        for label, codes in other.response_codes.items():
+            _add_counts(self.response_codes.setdefault(label, {}), codes)
+        for label, samples in other.error_samples.items():
+            self.error_samples.setdefault(label, ErrorSamples(samples.size)).merge(samples)
+        self.overall.merge(other.overall)
+        self.ramp_up.merge(other.ramp_up)
+        for window_start, labels in other.windows.items():
+            _merge_stats_map(self.windows.setdefault(window_start, {}), labels)
+        for name, pick in (("start_timestamp", min), ("first_timestamp", min),
+                           ("last_timestamp", max)):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if theirs is not None:
+                setattr(self, name, theirs if mine is None else pick(mine, theirs))
+        return self
+
+    def summary(self):
+        """Build the summary dictionary written to ``summary.json``."""
+        overall = self.overall
+        total = overall.total
+        if not total:
+            return {"total": 0, "error_rate": 100.0, "avg_response_time": 0}
+
+        summary = {
+            "total_requests": total,
+            "successful": total - overall.errors,
+            "failed": overall.errors,
+            "error_rate": round((overall.errors / total) * 100, 2),
+            "avg_response_time_ms": overall.avg,
+            "min_response_time_ms": overall.min,
+            "max_response_time_ms": overall.max,
+        }
+        summary.update(overall.percentile_fields("_response_time_ms"))
+
+        if self.first_timestamp is not None and self.last_timestamp > self.first_timestamp:
+            duration = (self.last_timestamp - self.first_timestamp) / 1000
+            steady = duration
+            if self.exclude_ramp_up:
+                steady = max(duration - self.ramp_up_seconds, 0)
+            summary["start_timestamp"] = self.first_timestamp
+            summary["duration_seconds"] = round(duration, 3)
+            summary["throughput_rps"] = round(total / max(steady, 1.0), 2)
+
+        if self.ramp_up_ms:
+            summary["ramp_up"] = {
+                "seconds": self.ramp_up_seconds,
+                "excluded": self.exclude_ramp_up,
+                "requests": self.ramp_up.total,
+                "errors": self.ramp_up.errors,
+            }
+
+        summary["histogram"] = overall.histogram.to_dict()
+
+        response_codes = {}
+        for codes in self.response_codes.values():
+            _add_counts(response_codes, codes)
+        summary["response_codes"] = _sorted_counts(response_codes)
+        # The overall sample is the bottom-k of the union of the label samples
+        kept = heapq.nlargest(ERROR_SAMPLES, (
+            entry + (label,)
+            for label, samples in self.error_samples.items() for entry in samples.heap
+        ))
+        summary["error_samples"] = [dict(label=entry[6], **_error_row(entry))
+                                    for entry in sorted(kept, key=_by_time)]
+
+        summary["endpoints"] = {}
+        for label, stats in self.endpoints.items():
+            endpoint = {
+                "total": stats.total,
+                "errors": stats.errors,
+                "avg_ms": stats.avg,
+                "min_ms": stats.min,
+                "max_ms": stats.max,
+            }
+            endpoint.update(stats.percentile_fields("_ms"))
+            endpoint["histogram"] = stats.histogram.to_dict()
+            endpoint["response_codes"] = _sorted_counts(self.response_codes.get(label, {}))
+            if label in self.error_samples:
+                endpoint["error_samples"] = self.error_samples[label].to_list()
+            summary["endpoints"][label] = endpoint
+
+        if self.window_ms:
+            summary["timeseries"] = {
+                "window_seconds": self.window_seconds,
+                "windows": [
+                    self._window_summary(window_start, self.windows[window_start])
+                    for window_start in sorted(self.windows)
+                ],
+            }
+
+        return summary
+
+    def _window_summary(self, window_start, labels):
+        combined = SampleStats()
+        endpoints = {}
+        for label, stats in labels.items():
+            combined.merge(stats)
+            endpoints[label] = _window_fields(stats, self.window_seconds)
+        window = {"start": window_start}
+        if self.ramp_up_ms:
+            window["ramp_up"] = window_start < self.start_timestamp + self.ramp_up_ms
+        window.update(_window_fields(combined, self.window_seconds))
+        window["endpoints"] = endpoints
+        return window
+
+    @classmethod
+    def from_summary(cls, summary):
+        """Rebuild an aggregator from a previously written ``summary.json``.
+
+        Time-series windows only carry percentiles, not histograms, so they
+        are not restored.
+        """
+        aggregator = cls()
+        if "histogram" not in summary:
+            if summary.get("total_requests"):
+                raise ValueError("Summary has no latency histogram and cannot be merged")
+            return aggregator
+        aggregator.overall = SampleStats.from_dict({
+            "total": summary["total_requests"],
+            "errors": summary.get("failed", 0),
+            "histogram": summary["histogram"],
+        })
+        for label, data in summary.get("endpoints", {}).items():
+            aggregator.endpoints[label] = SampleStats.from_dict(data)
+            aggregator.response_codes[label] = dict(data.get("response_codes", {}))
+            if data.get("error_samples"):
+                aggregator.error_samples[label] = ErrorSamples.from_list(data["error_samples"])
+        if "start_timestamp" in summary:
+            aggregator.first_timestamp = summary["start_timestamp"]
+            aggregator.last_timestamp = summary["start_timestamp"] + int(
+                summary.get("duration_seconds", 0) * 1000
+            )
+        return aggregator
+
+
+def _merge_stats_map(target, source):
+    for label, stats in source.items():
+        if label in target:
+            target[label].merge(stats)
+        else:
+            target[label] = SampleStats().merge(stats)
+
+
+def _window_fields(stats, window_seconds):
+    fields = {
+        "requests": stats.total,
+        "errors": stats.errors,
+        "error_rate": round((stats.errors / stats.total) * 100, 2) if stats.total else 0,
+        "throughput_rps": round(stats.total / window_seconds, 2),
+    }
+    fields.update(stats.percentile_fields("_ms"))
+    return fields
+
+
+def first_timestamp(jtl_path):
+    """Return the ``timeStamp`` of the first data row, or None."""
+    with open(jtl_path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or "timeStamp" not in header:
+            return None
+        i_ts = header.index("timeStamp")
+        for row in reader:
+            if row:
+                return int(row[i_ts])
+    return None
+
+
+def iter_lines_until(f, start, end):
+    """Yield decoded lines of a binary file from ``start`` up to ``end``."""
+    position = start
+    for line in f:
+        if position >= end:
+            break
+        position += len(line)
+        yield line.decode("utf-8")
+
+
+def split_jtl(jtl_path, parts):
+    """Split a JTL file into byte ranges that start and end on line boundaries.
+
+    Returns ``(header, ranges)`` where ``header`` is the parsed CSV header and
+    ``ranges`` is a list of ``(start, end)`` offsets covering the data rows.
+    Quoted fields spanning several lines are not supported, which matches the
+    CSV JMeter writes.
+    """
+    with open(jtl_path, "rb") as f:
+        header_line = f.readline()
+        data_start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        header = next(csv.reader([header_line.decode("utf-8")]), [])
+
+        step = max((size - data_start) // max(parts, 1), 1)
+        boundaries = [data_start]
+        while boundaries[-1] < size:
+            target = boundaries[-1] + step
+            if target >= size:
+                boundaries.append(size)
+                break
+            f.seek(target)
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+    return header, list(zip(boundaries, boundaries[1:]))
+
+
+def resolve_backend(backend="auto"):
+    """Map ``auto``/``python``/``numpy`` to the backend that will actually run."""
+    if backend == "python":
+        return backend
+    import jtl_numpy
+
+    if jtl_numpy.available():
+        return "numpy"
+    if backend == "numpy":
+        raise RuntimeError("NumPy backend requested but numpy is not installed")
+    return "python"
+
+
+def _aggregate_range(task):
+    jtl_path, header, start, end, backend, options = task
+    if backend == "numpy":
+        import jtl_numpy
+
+        return jtl_numpy.aggregate_jtl_range(jtl_path, header, start, end,
+                                             JtlAggregator(**options))
+    return JtlAggregator(**options).add_jtl_range(jtl_path, header, start, end)
+
+
+def _aggregate_whole(jtl_path, backend, options):
+    if backend == "numpy" and os.path.exists(jtl_path):
+        import jtl_numpy
+
+        return jtl_numpy.aggregate_jtl(jtl_path, JtlAggregator(**options))
+    return JtlAggregator(**options).add_jtl(jtl_path)
+
+
+def aggregate_jtl(jtl_path, workers=1, backend="python", **options):
+    """Aggregate a JTL file, optionally across a pool of worker processes.
+
+    ``backend`` is ``python``, ``numpy`` or ``auto`` (NumPy when installed);
+    ``options`` are passed to ``JtlAggregator``. Partial aggregates are merged
+    in file order, so the result is identical to the serial path, including
+    the first-seen order of labels.
+    """
+    backend = resolve_backend(backend)
+    if workers <= 1 or not os.path.exists(jtl_path):
+        return _aggregate_whole(jtl_path, backend, options)
+    size = os.path.getsize(jtl_path)
+    parts = min(workers * 4, max(size // MIN_PARALLEL_CHUNK_BYTES, 1))
+    if parts <= 1:
+        return _aggregate_whole(jtl_path, backend, options)
+
+    if options.get("start_timestamp") is None:
+        # Every range must measure ramp-up from the same run start.
+        options = dict(options, start_timestamp=first_timestamp(jtl_path))
+    header, ranges = split_jtl(jtl_path, parts)
+    tasks = [(jtl_path, header, start, end, backend, options) for start, end in ranges]
+    aggregator = JtlAggregator(**options)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_aggregate_range, tasks):
+            aggregator.merge(partial)
+    return aggregator
+
+
+def merge_summaries(summaries):
+    """Merge ``summary.json`` dictionaries from several runs or shards."""
+    merged = JtlAggregator()
+    for summary in summaries:
+        merged.merge(JtlAggregator.from_summary(summary))
+    return merged.summary()
@@ -0,0 +1,197 @@
+"""Live tailing of a growing JTL file with early abort on sustained breaches.
+
+``follow_jtl`` polls ``results.jtl`` while JMeter is still writing it, folds
+each complete row into a ``JtlAggregator`` and a ``BreachMonitor``, and stops
+JMeter once the rolling error rate or latency has exceeded its threshold for
+the configured number of seconds.
+"""
+
+import csv
+import os
+import shlex
+import signal
+import subprocess
+import time
+
+from jtl_stats import SampleStats
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+class JtlTailer:
+    """Reads complete CSV rows appended to a file since the previous call."""
+
+    def __init__(self, jtl_path):
+        self.jtl_path = jtl_path
+        self.offset = 0
+        self.pending = b""
+        self.header = None
+        self.columns = {}
+
+    def read_rows(self):
+        """Yield new complete rows; a trailing partial line is kept for later."""
+        if not os.path.exists(self.jtl_path):
+            return
+        with open(self.jtl_path, "rb") as f:
+            f.seek(self.offset)
+            while True:
+                chunk = f.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                self.offset += len(chunk)
+                lines = (self.pending + chunk).split(b"\n")
+                self.pending = lines.pop()
+                decoded = [line.decode("utf-8") for line in lines]
+                for row in csv.reader(decoded):
+                    if not row:
+                        continue
+                    if self.header is None:
+                        self.header = row
+                        self.columns = {name: i for i, name in enumerate(row)}
+                        continue
+                    yield row
+
+
+class BreachMonitor:
+    """Rolling per-second stats over the last ``sustain_seconds`` of samples.
+
+    Samples inside the ramp-up period are ignored. A breach is reported only
+    once at least ``sustain_seconds`` of steady-state samples have been seen
+    and the aggregate over that trailing window exceeds a threshold.
+    """
+
+    def __init__(self, sustain_seconds, max_error_rate=None, max_response_time=None,
+                 p90_threshold=None, p95_threshold=None, ramp_up_seconds=0):
+        self.sustain_seconds = sustain_seconds
+        self.max_error_rate = max_error_rate
+        self.max_response_time = max_response_time
+        self.p90_threshold = p90_threshold
+        self.p95_threshold = p95_threshold
+        self.ramp_up_ms = int(ramp_up_seconds * 1000)
+        self.start_timestamp = None
+        self.first_second = None
+        self.seconds = {}
+
+    def add(self, elapsed, success, timestamp):
+        if self.start_timestamp is None:
+            self.start_timestamp = timestamp
+        if timestamp < self.start_timestamp + self.ramp_up_ms:
+            return
+        second = timestamp // 1000
+        if self.first_second is None or second < self.first_second:
+            self.first_second = second
+        stats = self.seconds.get(second)
+        if stats is None:
+            stats = self.seconds[second] = SampleStats()
+        stats.add(elapsed, success)
+
+    def check(self):
+        """Return a list of breach descriptions for the trailing window."""
+        if not self.seconds:
+            return []
+        newest = max(self.seconds)
+        cutoff = newest - self.sustain_seconds + 1
+        for second in [s for s in self.seconds if s < cutoff]:
+            del self.seconds[second]
+        if newest - self.first_second + 1 < self.sustain_seconds:
+            return []
+
+        window = SampleStats()
+        for stats in self.seconds.values():
+            window.merge(stats)
+        span = f"over the last {self.sustain_seconds}s"
+        breaches = []
+        error_rate = round((window.errors / window.total) * 100, 2) if window.total else 0
+        if self.max_error_rate is not None and error_rate > self.max_error_rate:
+            breaches.append(f"error rate {error_rate}% {span} exceeds {self.max_error_rate}%")
+        if self.max_response_time is not None and window.avg > self.max_response_time:
+            breaches.append(
+                f"avg response time {window.avg}ms {span} exceeds {self.max_response_time}ms"
+            )
+        for name, fraction, threshold in (("P90", 0.9, self.p90_threshold),
+                                          ("P95", 0.95, self.p95_threshold)):
+            if threshold is None:
+                continue
+            value = window.percentile(fraction)
+            if value > threshold:
+                breaches.append(f"{name} response time {value}ms {span} exceeds {threshold}ms")
+        return breaches
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def stop_jmeter(pid, stop_command=None):
+    """Ask JMeter to stop, via its stop command when given, else SIGTERM.
+
+    Signals go to JMeter's whole process group when ``pid`` leads one (as
+    when run-jmeter.sh starts it under ``setsid``), so the JVM is reached
+    even if the ``jmeter`` launcher script did not ``exec`` it.
+    """
+    if stop_command:
+        result = subprocess.run(shlex.split(stop_command), capture_output=True, text=True)
+        if result.returncode == 0:
+            return
+        print(f"WARNING: '{stop_command}' failed ({result.returncode}), sending SIGTERM")
+    _signal(pid, signal.SIGTERM)
+
+
+def _signal(pid, signum):
+    try:
+        if os.getpgid(pid) == pid:
+            os.killpg(pid, signum)
+        else:
+            os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def _outcome(row, columns, success):
+    """The row's response code, plus its messages when it is an error."""
+    names = ("responseCode",) if success else ("responseCode", "responseMessage", "failureMessage")
+    return [row[columns[name]] if name in columns else "" for name in names]
+
+
+def follow_jtl(jtl_path, aggregator, monitor, jmeter_pid, stop_command=None,
+               poll_interval=2.0, stop_grace_seconds=60):
+    """Tail ``jtl_path`` until JMeter exits, aborting it on a sustained breach.
+
+    Returns the list of breaches that triggered an abort, or an empty list if
+    the run completed normally.
+    """
+    tailer = JtlTailer(jtl_path)
+    aborted = []
+    stop_requested_at = None
+    while True:
+        alive = pid_alive(jmeter_pid)
+        for row in tailer.read_rows():
+            columns = tailer.columns
+            timestamp = int(row[columns["timeStamp"]])
+            elapsed = int(row[columns["elapsed"]])
+            success = row[columns["success"]].lower() == "true"
+            aggregator.add(row[columns["label"]], elapsed, success, timestamp,
+                           *_outcome(row, columns, success))
+            monitor.add(elapsed, success, timestamp)
+        if not alive:
+            break
+        if not aborted:
+            aborted = monitor.check()
+            if aborted:
+                for breach in aborted:
+                    print(f"ABORT: {breach}")
+                stop_jmeter(jmeter_pid, stop_command)
+                stop_requested_at = time.monotonic()
+        elif time.monotonic() - stop_requested_at > stop_grace_seconds:
+            print("WARNING: JMeter did not stop in time, sending SIGKILL")
+            _signal(jmeter_pid, signal.SIGKILL)
+            stop_requested_at = time.monotonic()
+        time.sleep(poll_interval)
+    return aborted
+
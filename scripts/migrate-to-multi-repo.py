@@ -11,19 +11,101 @@ This script:
 
 import os
 import json
+import shutil
 import subprocess
 import sys
 import argparse
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
+from config_resolver import ConfigResolver
+from profiling import Profiler, add_profile_arguments
+
+# Resumable steps of a migration, in order. Each is recorded in the journal
+# once it has taken effect on the remote, so a rerun starts after it.
+PHASES = ["create", "populate", "topics"]
+
+
+class MigrationJournal:
+    """Append-only JSON-lines log of completed (target, app, phase) steps.
+
+    ``target`` names where repos are created (a GitHub org or a
+    ``--remote-base`` directory); steps recorded for another target, such as
+    a local rehearsal, are not treated as done. A record torn by a killed
+    run is dropped on load.
+    """
+
+    def __init__(self, path, target, enabled=True):
+        self.path = Path(path) if path else None
+        self.target = target
+        self.enabled = enabled and self.path is not None
+        self.completed = set()
+        self.lock = threading.Lock()
+        if self.enabled and self.path.exists():
+            self._load()
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if data and not data.endswith(b"\n"):
+            # A run killed mid-write leaves a partial last line; appending
+            # after it would corrupt the next record as well.
+            keep = data.rfind(b"\n") + 1
+            print(f"WARNING: {self.path}: dropping incomplete last record")
+            with open(self.path, "r+b") as f:
+                f.truncate(keep)
+            data = data[:keep]
+        for number, line in enumerate(data.decode().splitlines(), 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"WARNING: {self.path}:{number}: ignoring unreadable record")
+                continue
+            if entry.get("target") == self.target:
+                self.completed.add((entry["app"], entry["phase"]))
+
+    def done(self, app_name, phase):
+        return (app_name, phase) in self.completed
+
+    def record(self, app_name, phase, seconds):
+        if not self.enabled:
+            return
+        entry = {"target": self.target, "app": app_name, "phase": phase,
+                 "seconds": round(seconds, 3),
+                 "finished_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        with self.lock:
+            self.completed.add((app_name, phase))
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
 class RepoMigrator:
-    def __init__(self, org_name, template_repo, dry_run=False):
+    def __init__(self, org_name, template_repo, dry_run=False, workers=1, journal_path=None,
+                 remote_base=None, profiler=None):
         self.org_name = org_name
         self.template_repo = template_repo
         self.dry_run = dry_run
+        self.workers = max(workers, 1)
+        # Directory of bare git repos standing in for GitHub (local testing)
+        self.remote_base = Path(remote_base).resolve() if remote_base else None
+        target = str(self.remote_base) if self.remote_base else f"github.com/{org_name}"
+        # Checkpoints are only trusted for real runs; a dry run changes nothing
+        self.journal = MigrationJournal(journal_path, target, enabled=not dry_run)
         self.base_dir = Path(__file__).parent.parent
         self.apps_dir = self.base_dir / "configs" / "apps"
         self.test_suites_dir = self.base_dir / "test-suites"
+        self.config_resolver = ConfigResolver(apps_dir=str(self.apps_dir))
+        self.timings = defaultdict(list)
+        self.timings_lock = threading.Lock()
+        self.profiler = profiler or Profiler("migrate-to-multi-repo")
+        self.log_lock = threading.Lock()
         
     def log(self, message, level="INFO"):
         """Print colored log messages"""
@@ -34,7 +116,19 @@ class RepoMigrator:
             "ERROR": "\033[91m",   # Red
             "RESET": "\033[0m"
         }
-        print(f"{colors.get(level, '')}{level}: {message}{colors['RESET']}")
+        with self.log_lock:
+            print(f"{colors.get(level, '')}{level}: {message}{colors['RESET']}", flush=True)
+
+    @contextmanager
+    def timed(self, phase):
+        """Record how long the enclosed step took under ``phase``."""
+        started = time.monotonic()
+        try:
+            with self.profiler.phase(phase):
+                yield
+        finally:
+            with self.timings_lock:
+                self.timings[phase].append(time.monotonic() - started)
     
     def run_command(self, cmd, cwd=None, check=True):
         """Run shell command with error handling"""
@@ -72,6 +166,15 @@ class RepoMigrator:
         
         self.log(f"Creating repository: {repo_name}", "INFO")
         
+        if self.remote_base:
+            remote = self.remote_base / f"{repo_name}.git"
+            if remote.exists():
+                self.log(f"Repository {repo_name} already exists, skipping creation", "WARNING")
+            else:
+                self.run_command(["git", "init", "--bare", str(remote)])
+                self.log(f"Created repository: {remote}", "SUCCESS")
+            return repo_name
+        
         # Check if repo already exists
         check_result = self.run_command(
             ["gh", "repo", "view", f"{self.org_name}/{repo_name}"],
@@ -99,29 +202,8 @@ class RepoMigrator:
         return repo_name
     
     def merge_configs(self, app_name):
-        """Merge testcomplete.json and jmeter.json into single config.json"""
-        app_config_dir = self.apps_dir / app_name
-        
-        config = {
-            "app_name": app_name,
-            "version": "1.0",
-            "testcomplete": {},
-            "jmeter": {}
-        }
-        
-        # Load TestComplete config
-        tc_config_file = app_config_dir / "testcomplete.json"
-        if tc_config_file.exists():
-            with open(tc_config_file) as f:
-                config["testcomplete"] = json.load(f)
-        
-        # Load JMeter config
-        jm_config_file = app_config_dir / "jmeter.json"
-        if jm_config_file.exists():
-            with open(jm_config_file) as f:
-                config["jmeter"] = json.load(f)
-        
-        return config
+        """Merge testcomplete.json and jmeter.json into single config.json, validated against the schema"""
+        return self.config_resolver.load_app(app_name)
     
     def populate_repo(self, app_name, repo_name, temp_dir):
         """Clone repo, populate with configs and test suites, commit and push"""
@@ -129,11 +211,23 @@ class RepoMigrator:
         app_config_dir = self.apps_dir / app_name
         app_test_suite_dir = self.test_suites_dir / app_name
         
-        # Clone the repo
+        # Clone the repo (a leftover clone from an interrupted run is replaced)
         self.log(f"Cloning {repo_name}...", "INFO")
-        self.run_command(
-            ["gh", "repo", "clone", f"{self.org_name}/{repo_name}", str(repo_path)]
-        )
+        if repo_path.exists() and not self.dry_run:
+            shutil.rmtree(repo_path)
+        if self.remote_base:
+            clone = ["git", "clone", str(self.remote_base / f"{repo_name}.git"), str(repo_path)]
+        else:
+            clone = ["gh", "repo", "clone", f"{self.org_name}/{repo_name}", str(repo_path)]
+        with self.timed("clone"):
+            self.run_command(clone)
+        
+        if self.dry_run:
+            self.merge_configs(app_name)  # still surfaces invalid configs
+            self.log(f"DRY RUN: write config.json, README.md and test suites to {repo_path}", "WARNING")
+            self.run_command(["git", "commit", "-m", f"Initial migration of {app_name} configuration"])
+            self.run_command(["git", "push"])
+            return
         
         # Create merged config.json
         config = self.merge_configs(app_name)
@@ -195,12 +289,14 @@ This configuration is automatically loaded by the central QA orchestration syste
         
         # Git add, commit, push
         self.log(f"Committing changes to {repo_name}...", "INFO")
-        self.run_command(["git", "add", "."], cwd=repo_path)
-        self.run_command(
-            ["git", "commit", "-m", f"Initial migration of {app_name} configuration"],
-            cwd=repo_path
-        )
-        self.run_command(["git", "push"], cwd=repo_path)
+        with self.timed("commit"):
+            self.run_command(["git", "add", "."], cwd=repo_path)
+            self.run_command(
+                ["git", "commit", "-m", f"Initial migration of {app_name} configuration"],
+                cwd=repo_path
+            )
+        with self.timed("push"):
+            self.run_command(["git", "push"], cwd=repo_path)
         
         self.log(f"Successfully populated {repo_name}", "SUCCESS")
     
@@ -208,6 +304,10 @@ This configuration is automatically loaded by the central QA orchestration syste
         """Add GitHub topics for organization"""
         topics = ["qa-automation", "qa-config", "test-configuration"]
         
+        if self.remote_base:
+            self.log(f"Skipping topics for local repository {repo_name}", "WARNING")
+            return
+        
         self.log(f"Adding topics to {repo_name}...", "INFO")
         self.run_command([
             "gh", "repo", "edit",
@@ -216,20 +316,24 @@ This configuration is automatically loaded by the central QA orchestration syste
         ])
     
     def migrate_app(self, app_name, temp_dir):
-        """Migrate a single application to its own repo"""
-        self.log(f"\n{'='*60}", "INFO")
+        """Migrate a single application to its own repo, resuming after completed phases"""
         self.log(f"Migrating application: {app_name}", "INFO")
-        self.log(f"{'='*60}", "INFO")
+        repo_name = f"qa-config-{app_name}"
+        steps = {
+            "create": lambda: self.create_config_repo(app_name),
+            "populate": lambda: self.populate_repo(app_name, repo_name, temp_dir),
+            "topics": lambda: self.add_repo_topics(repo_name),
+        }
         
         try:
-            # Create repo
-            repo_name = self.create_config_repo(app_name)
-            
-            # Populate with content
-            self.populate_repo(app_name, repo_name, temp_dir)
-            
-            # Add topics
-            self.add_repo_topics(repo_name)
+            for phase in PHASES:
+                if self.journal.done(app_name, phase):
+                    self.log(f"{app_name}: {phase} already completed, skipping", "INFO")
+                    continue
+                started = time.monotonic()
+                with self.timed(phase):
+                    steps[phase]()
+                self.journal.record(app_name, phase, time.monotonic() - started)
             
             self.log(f"✓ Migration completed for {app_name}", "SUCCESS")
             return True
@@ -238,30 +342,47 @@ This configuration is automatically loaded by the central QA orchestration syste
             self.log(f"✗ Migration failed for {app_name}: {str(e)}", "ERROR")
             return False
     
+    def timing_report(self, wall_seconds):
+        """Log count, total, mean and max duration of every timed phase"""
+        self.log(f"\n{'='*60}", "INFO")
+        self.log(f"Timing Report ({self.workers} workers, {wall_seconds:.1f}s wall clock)", "INFO")
+        self.log(f"{'='*60}", "INFO")
+        self.log(f"{'Phase':<10} {'Runs':>5} {'Total':>9} {'Mean':>8} {'Max':>8}", "INFO")
+        for phase in PHASES + ["clone", "commit", "push"]:
+            durations = self.timings.get(phase)
+            if not durations:
+                continue
+            self.log(
+                f"{phase:<10} {len(durations):>5} {sum(durations):>8.1f}s "
+                f"{sum(durations) / len(durations):>7.2f}s {max(durations):>7.2f}s",
+                "INFO"
+            )
+    
     def migrate_all(self, apps=None, temp_dir=None):
-        """Migrate all or selected applications"""
+        """Migrate all or selected applications, ``workers`` at a time
+
+        Returns the list of apps that failed.
+        """
         if temp_dir is None:
             temp_dir = Path("/tmp/qa-migration")
         
-        temp_dir.mkdir(exist_ok=True)
+        temp_dir.mkdir(parents=True, exist_ok=True)
         
         if apps is None:
             apps = self.get_app_list()
         
         if not apps:
             self.log("No applications found to migrate", "WARNING")
-            return
+            return []
         
-        self.log(f"Starting migration of {len(apps)} applications", "INFO")
+        self.log(f"Starting migration of {len(apps)} applications with {self.workers} workers", "INFO")
         
-        success_count = 0
-        failed_apps = []
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda app: self.migrate_app(app, temp_dir), apps))
         
-        for app_name in apps:
-            if self.migrate_app(app_name, temp_dir):
-                success_count += 1
-            else:
-                failed_apps.append(app_name)
+        success_count = sum(results)
+        failed_apps = [app for app, ok in zip(apps, results) if not ok]
         
         # Summary
         self.log(f"\n{'='*60}", "INFO")
@@ -273,11 +394,17 @@ This configuration is automatically loaded by the central QA orchestration syste
         
         if failed_apps:
             self.log(f"Failed apps: {', '.join(failed_apps)}", "ERROR")
+            if self.journal.enabled:
+                self.log(f"Rerun to resume; completed steps are in {self.journal.path}", "INFO")
+        
+        self.timing_report(time.monotonic() - started)
         
         # Cleanup
         if not self.dry_run:
             self.log(f"\nCleaning up temporary directory: {temp_dir}", "INFO")
             self.run_command(["rm", "-rf", str(temp_dir)])
+        
+        return failed_apps
 
 def main():
     parser = argparse.ArgumentParser(description="Migrate QA configs to multi-repo architecture")
@@ -300,31 +427,68 @@ def main():
         action="store_true",
         help="Show what would be done without making changes"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of apps to migrate concurrently (default: 4)"
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        default=Path("migration-journal.jsonl"),
+        help="Checkpoint file of completed steps; reruns skip them"
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ignore and replace an existing journal"
+    )
+    parser.add_argument(
+        "--remote-base",
+        type=Path,
+        help="Use bare git repos in this directory instead of GitHub (for testing)"
+    )
     parser.add_argument(
         "--temp-dir",
         type=Path,
         default=Path("/tmp/qa-migration"),
         help="Temporary directory for cloning repos"
     )
+    add_profile_arguments(parser, "migration-profile.json")
     
     args = parser.parse_args()
     
     # Verify gh CLI is installed
-    try:
-        subprocess.run(["gh", "--version"], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("ERROR: GitHub CLI (gh) is not installed or not in PATH")
-        print("Install from: https://cli.github.com/")
+    if not args.remote_base:
+        try:
+            subprocess.run(["gh", "--version"], capture_output=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            print("ERROR: GitHub CLI (gh) is not installed or not in PATH")
+            print("Install from: https://cli.github.com/")
+            sys.exit(1)
+    elif not args.remote_base.is_dir():
+        print(f"ERROR: Remote base directory not found: {args.remote_base}")
         sys.exit(1)
     
+    if args.fresh and args.journal.exists() and not args.dry_run:
+        args.journal.unlink()
+    
     # Run migration
     migrator = RepoMigrator(
         org_name=args.org,
         template_repo=args.template,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        workers=args.workers,
+        journal_path=args.journal,
+        remote_base=args.remote_base,
+        profiler=Profiler("migrate-to-multi-repo", args.profile)
     )
     
-    migrator.migrate_all(apps=args.apps, temp_dir=args.temp_dir)
+    failed_apps = migrator.migrate_all(apps=args.apps, temp_dir=args.temp_dir)
+    migrator.profiler.write(args.profile_output)
+    if failed_apps:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
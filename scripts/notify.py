@@ -1,63 +1,197 @@
 #!/usr/bin/env python3
-"""Send notifications for test results via webhook."""
+"""Send notifications for test results via webhook.
+
+    # One alert for one app/env
+    notify.py --webhook URL --app A --env staging --status failed --run-url URL
+
+    # One batched digest for a whole scheduled run
+    notify.py --webhook URL --digest --result A:staging:failed:jmeter --result B:staging:passed
+
+    # Queue results in a file from several steps, then send them as one digest
+    notify.py --spool results.jsonl --app A --env staging --status failed
+    notify.py --webhook URL --digest --from-spool results.jsonl
+"""
 
 import argparse
 import json
+import os
 import sys
-import urllib.request
+
+from profiling import Profiler, add_profile_arguments
+from webhook_dispatcher import DeliveryError, WebhookDispatcher
+
+STATUS_EMOJI = {"passed": "OK", "failed": "FAIL", "error": "WARN"}
+STATUSES = list(STATUS_EMOJI)
+
+
+def parse_result(value):
+    """Parse ``APP:ENV:STATUS[:TEST_TYPE]`` from --result."""
+    parts = value.split(":", 3)
+    if len(parts) < 3 or parts[2] not in STATUSES:
+        raise argparse.ArgumentTypeError(
+            f"expected APP:ENV:STATUS[:TEST_TYPE] with STATUS one of {', '.join(STATUSES)}: {value}")
+    return {"app": parts[0], "env": parts[1], "status": parts[2],
+            "test_type": parts[3] if len(parts) == 4 else ""}
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Send test result notifications")
-    parser.add_argument("--webhook", required=True, help="Webhook URL")
-    parser.add_argument("--app", required=True, help="Application name")
-    parser.add_argument("--env", required=True, help="Environment")
-    parser.add_argument("--status", required=True, choices=["passed", "failed", "error"])
+    parser.add_argument("--webhook", action="append", default=[],
+                        help="Webhook URL; repeat for several (default: $NOTIFICATION_WEBHOOK)")
+    parser.add_argument("--app", help="Application name")
+    parser.add_argument("--env", "--environment", dest="env", help="Environment")
+    parser.add_argument("--status", choices=STATUSES)
+    parser.add_argument("--test-type", default="", help="e.g. jmeter-health-check")
+    parser.add_argument("--suite", default="", help="TestComplete suite")
     parser.add_argument("--run-url", default="", help="GitHub Actions run URL")
-    return parser.parse_args()
-
-
-def send_notification(webhook_url, payload):
-    """Send notification to webhook endpoint."""
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        webhook_url,
-        data=data,
-        headers={"Content-Type": "application/json"}
-    )
-    try:
-        with urllib.request.urlopen(req) as response:
-            print(f"Notification sent: {response.status}")
-    except Exception as e:
-        print(f"Failed to send notification: {e}", file=sys.stderr)
-        sys.exit(1)
-
+    parser.add_argument("--spool", default=None,
+                        help="Append this result to a JSON-lines file instead of sending it")
+    parser.add_argument("--digest", action="store_true",
+                        help="Send every --result/--from-spool entry as one batched message")
+    parser.add_argument("--result", action="append", type=parse_result, default=[],
+                        metavar="APP:ENV:STATUS[:TEST_TYPE]")
+    parser.add_argument("--from-spool", nargs="+", default=[], help="Spool files to include")
+    parser.add_argument("--batch-size", type=int, default=40,
+                        help="Results per digest message (Slack allows 50 blocks)")
+    parser.add_argument("--rate", type=float, default=1.0,
+                        help="Maximum messages per second per run (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--stats-file", default=None,
+                        help="Write delivery latency and failure counters here as JSON")
+    add_profile_arguments(parser, "notify-profile.json")
+    args = parser.parse_args()
 
-def main():
-    args = parse_args()
+    if not args.webhook and os.environ.get("NOTIFICATION_WEBHOOK"):
+        args.webhook = [os.environ["NOTIFICATION_WEBHOOK"]]
+    if args.digest:
+        if args.spool:
+            parser.error("--spool and --digest are mutually exclusive")
+    elif not (args.app and args.env and args.status):
+        parser.error("--app, --env and --status are required unless --digest is given")
+    if not args.spool and not args.webhook:
+        parser.error("--webhook (or $NOTIFICATION_WEBHOOK) is required")
+    return args
 
-    status_emoji = {"passed": "OK", "failed": "FAIL", "error": "WARN"}
 
-    payload = {
-        "text": f"{status_emoji.get(args.status, '?')} QA Tests {args.status.upper()}: {args.app} ({args.env})",
+def single_payload(result):
+    """Payload for one app/env result."""
+    app, env, status = result["app"], result["env"], result["status"]
+    fields = [
+        {"type": "mrkdwn", "text": f"*Application:*\n{app}"},
+        {"type": "mrkdwn", "text": f"*Environment:*\n{env}"},
+        {"type": "mrkdwn", "text": f"*Status:*\n{status.upper()}"},
+        {"type": "mrkdwn", "text": f"*Run URL:*\n<{result.get('run_url', '')}|View Run>"},
+    ]
+    if result.get("test_type"):
+        fields.insert(2, {"type": "mrkdwn", "text": f"*Test Type:*\n{result['test_type']}"})
+    return {
+        "text": f"{STATUS_EMOJI.get(status, '?')} QA Tests {status.upper()}: {app} ({env})",
         "blocks": [
             {
                 "type": "header",
-                "text": {"type": "plain_text", "text": f"QA Test Results: {args.app}"}
+                "text": {"type": "plain_text", "text": f"QA Test Results: {app}"}
             },
             {
                 "type": "section",
-                "fields": [
-                    {"type": "mrkdwn", "text": f"*Application:*\n{args.app}"},
-                    {"type": "mrkdwn", "text": f"*Environment:*\n{args.env}"},
-                    {"type": "mrkdwn", "text": f"*Status:*\n{args.status.upper()}"},
-                    {"type": "mrkdwn", "text": f"*Run URL:*\n<{args.run_url}|View Run>"}
-                ]
+                "fields": fields
             }
         ]
     }
 
-    send_notification(args.webhook, payload)
+
+def digest_payloads(results, batch_size, run_url=""):
+    """Batch many results into as few messages as the block limit allows."""
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in STATUSES}
+    headline = ", ".join(f"{counts[s]} {s}" for s in STATUSES if counts[s])
+    # Failures first so they survive truncation in chat clients
+    ordered = sorted(results, key=lambda r: (r["status"] == "passed", r["app"], r["env"]))
+    batches = [ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size)] or [[]]
+
+    payloads = []
+    for number, batch in enumerate(batches, 1):
+        part = f" (part {number}/{len(batches)})" if len(batches) > 1 else ""
+        blocks = [{
+            "type": "header",
+            "text": {"type": "plain_text", "text": f"QA Test Digest: {headline or 'no results'}{part}"}
+        }]
+        for r in batch:
+            test_type = f" [{r['test_type']}]" if r.get("test_type") else ""
+            link = f" <{r['run_url']}|View Run>" if r.get("run_url") else ""
+            blocks.append({
+                "type": "section",
+                "text": {"type": "mrkdwn",
+                         "text": f"{STATUS_EMOJI[r['status']]} *{r['app']}* ({r['env']}){test_type}: "
+                                 f"{r['status'].upper()}{link}"}
+            })
+        if run_url:
+            blocks.append({"type": "context",
+                           "elements": [{"type": "mrkdwn", "text": f"<{run_url}|View Run>"}]})
+        payloads.append({"text": f"QA Test Digest: {headline or 'no results'}{part}",
+                         "blocks": blocks})
+    return payloads
+
+
+def read_spool(paths):
+    results = []
+    for path in paths:
+        with open(path) as f:
+            results.extend(json.loads(line) for line in f if line.strip())
+    return results
+
+
+def deliver(webhooks, payloads, args):
+    """Send every payload to every webhook; returns the number of failures."""
+    failures = 0
+    with WebhookDispatcher(retries=args.retries, rate=args.rate) as dispatcher:
+        for webhook in webhooks:
+            for payload in payloads:
+                try:
+                    status = dispatcher.post(webhook, payload)
+                    print(f"Notification sent: {status}")
+                except DeliveryError as e:
+                    print(f"Failed to send notification: {e}", file=sys.stderr)
+                    failures += 1
+        stats = dispatcher.summary()
+
+    latency = stats.get("latency_ms")
+    print(f"Delivered {stats['sent']}, failed {stats['failed']}, retries {stats['retries']} "
+          f"(rate limited {stats['rate_limited']}), connections {stats['connections']}"
+          + (f", latency p50 {latency['p50']}ms max {latency['max']}ms" if latency else ""))
+    if args.stats_file:
+        with open(args.stats_file, "w") as f:
+            json.dump(stats, f, indent=2)
+    return failures
+
+
+def main():
+    args = parse_args()
+    profiler = Profiler("notify", args.profile)
+
+    if args.digest:
+        with profiler.phase("read-spool") as phase:
+            results = args.result + read_spool(args.from_spool)
+            phase.add(len(results))
+        with profiler.phase("build-payloads") as phase:
+            payloads = digest_payloads(results, max(args.batch_size, 1), args.run_url)
+            phase.add(len(payloads))
+    else:
+        result = {"app": args.app, "env": args.env, "status": args.status,
+                  "test_type": args.test_type or args.suite, "run_url": args.run_url}
+        if args.spool:
+            with open(args.spool, "a") as f:
+                f.write(json.dumps(result) + "\n")
+            print(f"Queued {args.status} result for {args.app} ({args.env}) in {args.spool}")
+            return
+        payloads = [single_payload(result)]
+
+    with profiler.phase("deliver") as phase:
+        failures = deliver(args.webhook, payloads, args)
+        if profiler.enabled:
+            phase.add(len(payloads) * len(args.webhook),
+                      sum(len(json.dumps(p)) for p in payloads) * len(args.webhook))
+    profiler.write(args.profile_output)
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
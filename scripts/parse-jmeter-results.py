@@ -2,12 +2,20 @@
 """Parse JMeter test results and validate against thresholds."""
 
 import argparse
-import csv
 import json
 import os
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+from html_report import write_report
+from jtl_cache import aggregate_cached
+from jtl_merge import aggregate_jtl_files, injector_summary, resolve_jtl_inputs
+from jtl_stats import JtlAggregator, aggregate_jtl, iter_jtl, resolve_backend
+from jtl_tail import BreachMonitor, follow_jtl
+from profiling import Profiler, add_profile_arguments
+from results_store import DEFAULT_BASELINE_DAYS, format_regression, record_run
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Parse JMeter results")
@@ -15,79 +23,255 @@ def parse_args():
     parser.add_argument("--env", required=True, help="Environment name")
     parser.add_argument("--test-plan", default="health-check", help="JMeter test plan name")
     parser.add_argument("--results-dir", default="test-results/jmeter")
+    parser.add_argument("--jtl", nargs="+", default=None,
+                        help="JTL files, directories or globs to merge, one per injector "
+                             "(default: <results-dir>/results.jtl)")
     parser.add_argument("--max-response-time", type=int, default=5000, help="Max response time in ms")
     parser.add_argument("--max-error-rate", type=float, default=1.0, help="Max error rate percent")
-    return parser.parse_args()
+    parser.add_argument("--p90-response-time", type=int, default=None,
+                        help="Max P90 response time in ms, checked overall and per endpoint")
+    parser.add_argument("--p95-response-time", type=int, default=None,
+                        help="Max P95 response time in ms, checked overall and per endpoint")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse the JTL in N processes (0 = one per CPU core)")
+    parser.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto",
+                        help="Aggregation backend (auto uses NumPy when installed)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Neither read nor write the binary results.jtl.cache sidecar")
+    parser.add_argument("--window-seconds", type=int, default=10,
+                        help="Time-series window size in seconds (0 disables the series)")
+    parser.add_argument("--ramp-up-seconds", type=int, default=0,
+                        help="Ramp-up period of the test plan in seconds")
+    parser.add_argument("--exclude-ramp-up", action="store_true",
+                        help="Leave ramp-up samples out of the pass/fail thresholds")
+    parser.add_argument("--follow", action="store_true",
+                        help="Tail results.jtl while JMeter runs and abort it on sustained breaches")
+    parser.add_argument("--jmeter-pid", type=int, default=None,
+                        help="PID of the running JMeter process (required with --follow)")
+    parser.add_argument("--stop-command", default=None,
+                        help="Command that stops JMeter, e.g. stoptest.sh (default: SIGTERM)")
+    parser.add_argument("--abort-after-seconds", type=int, default=60,
+                        help="Abort once thresholds are breached for this many seconds")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds between reads of the growing JTL in --follow mode")
+    parser.add_argument("--history-db", default=os.environ.get("QA_RESULTS_DB"),
+                        help="SQLite results store to check against and ingest into "
+                             "(default: $QA_RESULTS_DB; disabled when unset)")
+    parser.add_argument("--baseline-days", type=int, default=DEFAULT_BASELINE_DAYS,
+                        help="Days of earlier runs whose median forms the baseline")
+    parser.add_argument("--regression-tolerance", type=float, default=20.0,
+                        help="Flag metrics this many percent worse than the baseline")
+    parser.add_argument("--html-report", default=None, metavar="DIR",
+                        help="Also render the static HTML report into DIR/index.html")
+    add_profile_arguments(parser, default_label="<results-dir>/profile.json")
+    args = parser.parse_args()
+    if args.follow and args.jmeter_pid is None:
+        parser.error("--follow requires --jmeter-pid")
+    if args.follow and args.jtl:
+        parser.error("--follow reads <results-dir>/results.jtl and cannot be combined with --jtl")
+    return args
 
 
 def parse_jtl(jtl_path):
-    """Parse JMeter JTL results file."""
-    results = []
-    if not os.path.exists(jtl_path):
-        return results
-    with open(jtl_path, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            results.append({
-                "timestamp": int(row.get("timeStamp", 0)),
-                "elapsed": int(row.get("elapsed", 0)),
-                "label": row.get("label", ""),
-                "response_code": row.get("responseCode", ""),
-                "success": row.get("success", "").lower() == "true",
-                "bytes": int(row.get("bytes", 0)),
-                "thread_name": row.get("threadName", ""),
-            })
-    return results
+    """Stream rows from a JMeter JTL results file."""
+    return iter_jtl(jtl_path)
 
 
 def analyze_results(results):
-    """Compute summary statistics from JTL results."""
-    if not results:
-        return {"total": 0, "error_rate": 100.0, "avg_response_time": 0}
-
-    total = len(results)
-    errors = sum(1 for r in results if not r["success"])
-    response_times = [r["elapsed"] for r in results]
-
-    summary = {
-        "total_requests": total,
-        "successful": total - errors,
-        "failed": errors,
-        "error_rate": round((errors / total) * 100, 2) if total > 0 else 0,
-        "avg_response_time_ms": round(sum(response_times) / total) if total else 0,
-        "min_response_time_ms": min(response_times) if response_times else 0,
-        "max_response_time_ms": max(response_times) if response_times else 0,
-        "p90_response_time_ms": sorted(response_times)[int(total * 0.9)] if total else 0,
-        "p95_response_time_ms": sorted(response_times)[int(total * 0.95)] if total else 0,
+    """Compute summary statistics from an iterable of JTL rows in one pass."""
+    return JtlAggregator().add_rows(results).summary()
+
+
+def analyze_jtl(jtl_path, workers=1, backend="python", use_cache=False, **options):
+    """Compute summary statistics from a JTL file, or its sidecar, in one pass."""
+    if use_cache:
+        aggregator, source = aggregate_cached(jtl_path, workers, backend, **options)
+        print(f"Results read from {source}: {jtl_path}")
+        return aggregator.summary()
+    return aggregate_jtl(jtl_path, workers, backend, **options).summary()
+
+
+def analyze_jtl_files(jtl_paths, **options):
+    """Merge several injectors' JTL files into one summary with a per-injector breakdown."""
+    cluster, injectors = aggregate_jtl_files(jtl_paths, **options)
+    print(f"Merged {len(jtl_paths)} JTL files: {', '.join(injectors)}")
+    summary = cluster.summary()
+    summary["injectors"] = {
+        name: injector_summary(aggregator) for name, aggregator in injectors.items()
     }
+    return summary
 
-    # Per-endpoint breakdown
-    endpoints = {}
-    for r in results:
-        label = r["label"]
-        if label not in endpoints:
-            endpoints[label] = {"total": 0, "errors": 0, "times": []}
-        endpoints[label]["total"] += 1
-        if not r["success"]:
-            endpoints[label]["errors"] += 1
-        endpoints[label]["times"].append(r["elapsed"])
-
-    summary["endpoints"] = {}
-    for label, data in endpoints.items():
-        summary["endpoints"][label] = {
-            "total": data["total"],
-            "errors": data["errors"],
-            "avg_ms": round(sum(data["times"]) / len(data["times"])) if data["times"] else 0,
-        }
 
+def follow_results(jtl_path, args, options):
+    """Tail the JTL of a running JMeter and return the (possibly partial) summary."""
+    aggregator = JtlAggregator(**options)
+    monitor = BreachMonitor(
+        args.abort_after_seconds,
+        max_error_rate=args.max_error_rate,
+        max_response_time=args.max_response_time,
+        p90_threshold=args.p90_response_time,
+        p95_threshold=args.p95_response_time,
+        ramp_up_seconds=args.ramp_up_seconds if args.exclude_ramp_up else 0,
+    )
+    print(f"Following {jtl_path} (JMeter PID {args.jmeter_pid})")
+    aborted = follow_jtl(
+        jtl_path,
+        aggregator,
+        monitor,
+        args.jmeter_pid,
+        stop_command=args.stop_command,
+        poll_interval=args.poll_interval,
+    )
+    summary = aggregator.summary()
+    if aborted:
+        summary["aborted"] = {
+            "reasons": aborted,
+            "sustained_seconds": args.abort_after_seconds,
+        }
     return summary
 
 
-def generate_markdown_summary(summary, app_name, env, test_plan, max_rt, max_err):
+def jtl_fingerprint(jtl_path):
+    """Size and mtime of a JTL, tying an abort verdict to the run that wrote it."""
+    try:
+        stat = os.stat(jtl_path)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_abort_verdict(abort_path, jtl_path):
+    """The abort verdict recorded for ``jtl_path``, or None.
+
+    A verdict written for a different JTL (e.g. left in a reused results
+    directory) is ignored.
+    """
+    if not os.path.exists(abort_path):
+        return None
+    with open(abort_path) as f:
+        verdict = json.load(f)
+    if verdict.pop("jtl", None) != jtl_fingerprint(jtl_path):
+        print(f"WARNING: Ignoring {abort_path}: it was written for a different {jtl_path}")
+        return None
+    return verdict
+
+
+def check_percentile_thresholds(summary, p90_threshold=None, p95_threshold=None):
+    """Return ``(scope, metric, value, threshold)`` for every breached percentile."""
+    limits = [
+        ("p90", p90_threshold),
+        ("p95", p95_threshold),
+    ]
+    breaches = []
+    for name, threshold in limits:
+        if threshold is None:
+            continue
+        value = summary.get(f"{name}_response_time_ms", 0)
+        if value > threshold:
+            breaches.append(("overall", name, value, threshold))
+        for label, data in summary.get("endpoints", {}).items():
+            value = data.get(f"{name}_ms", 0)
+            if value > threshold:
+                breaches.append((label, name, value, threshold))
+    return breaches
+
+
+def threshold_verdict(summary, max_rt, max_err, p90_threshold=None, p95_threshold=None):
+    """The limits a run was checked against and whether it passed them."""
+    failures = []
+    if summary.get("aborted"):
+        failures.append("aborted early")
+    if summary.get("error_rate", 0) > max_err:
+        failures.append(f"error rate {summary['error_rate']}% > {max_err}%")
+    if summary.get("avg_response_time_ms", 0) > max_rt:
+        failures.append(f"avg response time {summary['avg_response_time_ms']}ms > {max_rt}ms")
+    for scope, name, value, threshold in check_percentile_thresholds(
+            summary, p90_threshold, p95_threshold):
+        failures.append(f"{name.upper()} {value}ms > {threshold}ms for {scope}")
+    return {
+        "max_response_time_ms": max_rt,
+        "max_error_rate_percent": max_err,
+        "p90_response_time_ms": p90_threshold,
+        "p95_response_time_ms": p95_threshold,
+        "status": "failed" if failures else "passed",
+        "failures": failures,
+    }
+
+
+def without_histograms(summary):
+    """Return a copy of the summary without the serialised histograms and series.
+
+    Only the run-wide error sample is kept; per-endpoint samples stay in summary.json.
+    """
+    trimmed = {k: v for k, v in summary.items() if k not in ("histogram", "timeseries")}
+    if "endpoints" in summary:
+        trimmed["endpoints"] = {
+            label: {k: v for k, v in data.items() if k not in ("histogram", "error_samples")}
+            for label, data in summary["endpoints"].items()
+        }
+    return trimmed
+
+
+def _cell(text, limit=120):
+    """Text made safe for a markdown table cell."""
+    text = " ".join(str(text).split()).replace("|", "\\|")
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def error_lines(summary, top_codes=5):
+    """Markdown for response codes of failing endpoints and the sampled error rows."""
+    failing = {label: data for label, data in summary.get("endpoints", {}).items()
+               if data.get("errors")}
+    if not failing:
+        return []
+    lines = [
+        "",
+        "#### Errors",
+        "| Endpoint | Errors | Response Codes |",
+        "|----------|--------|----------------|",
+    ]
+    for label, data in failing.items():
+        codes = list(data.get("response_codes", {}).items())
+        shown = ", ".join(f"{code or '(none)'}: {count}" for code, count in codes[:top_codes])
+        if len(codes) > top_codes:
+            shown += f", +{len(codes) - top_codes} more"
+        lines.append(f"| {label} | {data['errors']} | {_cell(shown)} |")
+    samples = summary.get("error_samples")
+    if samples:
+        lines += [
+            "",
+            f"Sample of {len(samples)} of {summary.get('failed', len(samples))} failed requests:",
+            "",
+            "| Time (UTC) | Endpoint | Code | Elapsed | Message |",
+            "|------------|----------|------|---------|---------|",
+        ]
+        for row in samples:
+            when = datetime.fromtimestamp(row["timestamp"] / 1000, timezone.utc)
+            message = row["failure_message"] or row["response_message"]
+            lines.append(f"| {when:%Y-%m-%d %H:%M:%S} | {row['label']} | {row['response_code']} "
+                         f"| {row['elapsed_ms']}ms | {_cell(message)} |")
+    return lines
+
+
+def generate_markdown_summary(summary, app_name, env, test_plan, max_rt, max_err,
+                              p90_threshold=None, p95_threshold=None):
     """Generate a markdown summary for GitHub Actions."""
     passed_rt = summary["avg_response_time_ms"] <= max_rt
     passed_err = summary["error_rate"] <= max_err
-    overall = "PASSED" if (passed_rt and passed_err) else "FAILED"
+    breaches = check_percentile_thresholds(summary, p90_threshold, p95_threshold)
+    breached = {(scope, name) for scope, name, _, _ in breaches}
+    aborted = summary.get("aborted")
+    overall = "PASSED" if (passed_rt and passed_err and not breaches and not aborted) else "FAILED"
+
+    def threshold_cells(scope, name, threshold):
+        if threshold is None:
+            return "- | -"
+        return f"<{threshold}ms | {'FAIL' if (scope, name) in breached else 'PASS'}"
+
+    def endpoint_status(label):
+        if p90_threshold is None and p95_threshold is None:
+            return "-"
+        return "FAIL" if any(scope == label for scope, _ in breached) else "PASS"
 
     lines = [
         f"### JMeter Results ({test_plan}): {overall}",
@@ -96,52 +280,166 @@ def generate_markdown_summary(summary, app_name, env, test_plan, max_rt, max_err
         f"| Avg Response Time | {summary['avg_response_time_ms']}ms | <{max_rt}ms | {'PASS' if passed_rt else 'FAIL'} |",
         f"| Error Rate | {summary['error_rate']}% | <{max_err}% | {'PASS' if passed_err else 'FAIL'} |",
         f"| Total Requests | {summary['total_requests']} | - | - |",
-        f"| P90 Response Time | {summary['p90_response_time_ms']}ms | - | - |",
-        f"| P95 Response Time | {summary['p95_response_time_ms']}ms | - | - |",
+        f"| P50 Response Time | {summary['p50_response_time_ms']}ms | - | - |",
+        f"| P90 Response Time | {summary['p90_response_time_ms']}ms | {threshold_cells('overall', 'p90', p90_threshold)} |",
+        f"| P95 Response Time | {summary['p95_response_time_ms']}ms | {threshold_cells('overall', 'p95', p95_threshold)} |",
+        f"| P99 Response Time | {summary['p99_response_time_ms']}ms | - | - |",
+    ]
+    if "throughput_rps" in summary:
+        lines.append(f"| Throughput | {summary['throughput_rps']} req/s | - | - |")
+    ramp_up = summary.get("ramp_up")
+    if ramp_up and ramp_up["excluded"]:
+        lines += [
+            "",
+            f"_Ramp-up (first {ramp_up['seconds']}s, {ramp_up['requests']} requests, "
+            f"{ramp_up['errors']} errors) excluded from thresholds._",
+        ]
+    if aborted:
+        lines += ["", "**Run aborted early:** " + "; ".join(aborted["reasons"])]
+    lines += [
         "",
         "#### Endpoint Breakdown",
-        "| Endpoint | Requests | Errors | Avg Response |",
-        "|----------|----------|--------|-------------|",
+        "| Endpoint | Requests | Errors | Avg Response | P50 | P90 | P95 | P99 | Status |",
+        "|----------|----------|--------|-------------|-----|-----|-----|-----|--------|",
     ]
     for label, data in summary.get("endpoints", {}).items():
-        lines.append(f"| {label} | {data['total']} | {data['errors']} | {data['avg_ms']}ms |")
+        lines.append(
+            f"| {label} | {data['total']} | {data['errors']} | {data['avg_ms']}ms "
+            f"| {data['p50_ms']}ms | {data['p90_ms']}ms | {data['p95_ms']}ms | {data['p99_ms']}ms "
+            f"| {endpoint_status(label)} |"
+        )
+    lines += error_lines(summary)
+    regressions = summary.get("regressions")
+    if regressions and regressions["items"]:
+        lines += ["", f"#### Regressions vs {regressions['baseline_days']}-day median"]
+        lines += [f"- {format_regression(r)}" for r in regressions["items"]]
+    injectors = summary.get("injectors")
+    if injectors:
+        lines += [
+            "",
+            "#### Injector Breakdown",
+            "| Injector | Requests | Error Rate | Avg Response | P90 | P95 | Throughput |",
+            "|----------|----------|------------|-------------|-----|-----|------------|",
+        ]
+        for name, data in injectors.items():
+            if not data.get("total_requests"):
+                lines.append(f"| {name} | 0 | - | - | - | - | - |")
+                continue
+            lines.append(
+                f"| {name} | {data['total_requests']} | {data['error_rate']}% "
+                f"| {data['avg_response_time_ms']}ms | {data['p90_response_time_ms']}ms "
+                f"| {data['p95_response_time_ms']}ms | {data.get('throughput_rps', '-')} req/s |"
+            )
 
     return "\n".join(lines)
 
 
 def main():
     args = parse_args()
-    jtl_path = os.path.join(args.results_dir, "results.jtl")
+    jtl_paths = [os.path.join(args.results_dir, "results.jtl")]
+    if args.jtl:
+        jtl_paths = resolve_jtl_inputs(args.jtl)
+        if not jtl_paths:
+            print(f"ERROR: No JTL files match {' '.join(args.jtl)}")
+            sys.exit(1)
+    jtl_path = jtl_paths[0]
+    profiler = Profiler("parse-jmeter-results", args.profile)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    try:
+        backend = resolve_backend(args.backend)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    options = {
+        "window_seconds": args.window_seconds,
+        "ramp_up_seconds": args.ramp_up_seconds,
+        "exclude_ramp_up": args.exclude_ramp_up,
+    }
+    abort_path = os.path.join(args.results_dir, "aborted.json")
+    # Reading, parsing and aggregating are one streaming pass, so one phase
+    with profiler.phase("aggregate") as phase:
+        if args.follow:
+            summary = follow_results(jtl_path, args, options)
+        elif len(jtl_paths) > 1:
+            summary = analyze_jtl_files(jtl_paths, **options)
+        else:
+            summary = analyze_jtl(jtl_path, workers, backend, use_cache=not args.no_cache,
+                                  **options)
+            # Keep the verdict of a live run that stopped JMeter early
+            aborted = load_abort_verdict(abort_path, jtl_path)
+            if aborted:
+                summary["aborted"] = aborted
+        if profiler.enabled:
+            phase.add(summary.get("total_requests", 0),
+                      sum(os.path.getsize(p) for p in jtl_paths if os.path.exists(p)))
 
-    results = parse_jtl(jtl_path)
-    summary = analyze_results(results)
+    if args.history_db and not args.follow and summary.get("total_requests"):
+        with profiler.phase("history"):
+            regressions = record_run(args.history_db, "jmeter", args.app, args.env,
+                                     args.test_plan, summary, source=jtl_path,
+                                     days=args.baseline_days,
+                                     tolerance=args.regression_tolerance)
+        summary["regressions"] = {"baseline_days": args.baseline_days, "items": regressions}
+        for regression in regressions:
+            print(f"REGRESSION: {format_regression(regression)}")
+
+    summary.update({"app_name": args.app, "environment": args.env, "test_plan": args.test_plan})
+    summary["thresholds"] = threshold_verdict(summary, args.max_response_time, args.max_error_rate,
+                                              args.p90_response_time, args.p95_response_time)
 
     # Write JSON summary
     os.makedirs(args.results_dir, exist_ok=True)
-    with open(os.path.join(args.results_dir, "summary.json"), "w") as f:
-        json.dump(summary, f, indent=2)
+    if args.follow and summary.get("aborted"):
+        with open(abort_path, "w") as f:
+            json.dump(dict(summary["aborted"], jtl=jtl_fingerprint(jtl_path)), f, indent=2)
+    summary_path = os.path.join(args.results_dir, "summary.json")
+    with profiler.phase("write-json") as phase:
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        if profiler.enabled:
+            phase.add(nbytes=os.path.getsize(summary_path))
 
     # Write markdown summary
-    md = generate_markdown_summary(
-        summary,
-        args.app,
-        args.env,
-        args.test_plan,
-        args.max_response_time,
-        args.max_error_rate,
-    )
-    with open(os.path.join(args.results_dir, "summary.md"), "w") as f:
-        f.write(md)
+    with profiler.phase("write-markdown") as phase:
+        md = generate_markdown_summary(
+            summary,
+            args.app,
+            args.env,
+            args.test_plan,
+            args.max_response_time,
+            args.max_error_rate,
+            args.p90_response_time,
+            args.p95_response_time,
+        )
+        with open(os.path.join(args.results_dir, "summary.md"), "w") as f:
+            f.write(md)
+        phase.add(nbytes=len(md))
+
+    if args.html_report:
+        with profiler.phase("write-html") as phase:
+            report_path = write_report(summary, args.html_report)
+            phase.add(nbytes=os.path.getsize(report_path))
+        print(f"HTML report written to {report_path}")
 
-    print(json.dumps(summary, indent=2))
+    print(json.dumps(without_histograms(summary), indent=2))
+    profiler.write(args.profile_output or os.path.join(args.results_dir, "profile.json"))
 
     # Exit with error if thresholds exceeded
+    if summary.get("aborted"):
+        print("ERROR: Run aborted early: " + "; ".join(summary["aborted"]["reasons"]))
+        sys.exit(1)
     if summary["error_rate"] > args.max_error_rate:
         print(f"ERROR: Error rate {summary['error_rate']}% exceeds threshold {args.max_error_rate}%")
         sys.exit(1)
     if summary["avg_response_time_ms"] > args.max_response_time:
         print(f"ERROR: Avg response time {summary['avg_response_time_ms']}ms exceeds {args.max_response_time}ms")
         sys.exit(1)
+    breaches = check_percentile_thresholds(summary, args.p90_response_time, args.p95_response_time)
+    for scope, name, value, threshold in breaches:
+        print(f"ERROR: {name.upper()} response time {value}ms for {scope} exceeds {threshold}ms")
+    if breaches:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,10 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from profiling import Profiler, add_profile_arguments
+from results_store import DEFAULT_BASELINE_DAYS, format_regression, record_run
+from testcomplete_log import parse_logs
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Parse TestComplete results")
@@ -16,6 +20,12 @@ def parse_args():
     parser.add_argument("--results-dir", default="test-results", help="Results directory")
     parser.add_argument("--suite-name", default="", help="Test suite name")
     parser.add_argument("--output-format", default="", help="Output format (unused)")
+    parser.add_argument("--history-db", default=os.environ.get("QA_RESULTS_DB"),
+                        help="SQLite results store to check against and ingest into "
+                             "(default: $QA_RESULTS_DB; disabled when unset)")
+    parser.add_argument("--baseline-days", type=int, default=DEFAULT_BASELINE_DAYS,
+                        help="Days of earlier runs whose median forms the baseline")
+    add_profile_arguments(parser, default_label="<results-dir>/profile.json")
     return parser.parse_args()
 
 
@@ -24,13 +34,27 @@ def find_latest_results(results_dir):
     results_path = Path(results_dir)
     if not results_path.exists():
         return None
-    subdirs = sorted(results_path.iterdir(), reverse=True)
+    subdirs = sorted((p for p in results_path.iterdir() if p.is_dir()), reverse=True)
     return subdirs[0] if subdirs else None
 
 
-def generate_summary(app_name, environment, results_dir, suite_name):
+def find_logs(latest, results_dir):
+    """MHT logs of the latest run, or any directly under the results dir."""
+    for directory in (latest, Path(results_dir)):
+        if directory and directory.exists():
+            logs = sorted(directory.rglob("*.mht"))
+            if logs:
+                return logs
+    return []
+
+
+def generate_summary(app_name, environment, results_dir, suite_name, history_db=None,
+                     baseline_days=DEFAULT_BASELINE_DAYS, profiler=None):
     """Generate a test summary report."""
-    latest = find_latest_results(results_dir)
+    profiler = profiler or Profiler("parse-results")
+    with profiler.phase("find-logs"):
+        latest = find_latest_results(results_dir)
+        logs = find_logs(latest, results_dir)
 
     summary = {
         "app_name": app_name,
@@ -38,13 +62,40 @@ def generate_summary(app_name, environment, results_dir, suite_name):
         "suite_name": suite_name,
         "timestamp": datetime.utcnow().isoformat(),
         "results_path": str(latest) if latest else "No results found",
-        "status": "completed"
+        "status": "no results",
     }
 
+    if logs:
+        with profiler.phase("parse-logs") as phase:
+            summary.update(parse_logs(logs))
+            if profiler.enabled:
+                phase.add(len(summary["items"]), sum(log.stat().st_size for log in logs))
+        summary["status"] = "failed" if summary["failed"] else "passed"
+        for name, item in summary["items"].items():
+            duration = item["duration_seconds"]
+            duration = f" in {duration:g}s" if duration is not None else ""
+            retried = f" (flaky: passed on attempt {item['attempts']})" if item["flaky"] else (
+                f" (after {item['attempts']} attempts)" if item["attempts"] > 1 else "")
+            print(f"{'PASS' if item['passed'] else 'FAIL'}: {name}{duration}{retried}")
+            for error in item["errors"]:
+                print(f"  {error}")
+
+    if history_db:
+        with profiler.phase("history"):
+            regressions = record_run(history_db, "testcomplete", app_name, environment,
+                                     suite_name or "default", summary,
+                                     source=summary["results_path"], days=baseline_days)
+        summary["regressions"] = {"baseline_days": baseline_days, "items": regressions}
+        for regression in regressions:
+            print(f"REGRESSION: {format_regression(regression)}")
+
     os.makedirs(results_dir, exist_ok=True)
     summary_path = os.path.join(results_dir, f"{app_name}-{environment}-summary.json")
-    with open(summary_path, "w") as f:
-        json.dump(summary, f, indent=2)
+    with profiler.phase("write-json") as phase:
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        if profiler.enabled:
+            phase.add(nbytes=os.path.getsize(summary_path))
 
     print(f"Summary written to {summary_path}")
     return summary
@@ -52,8 +103,11 @@ def generate_summary(app_name, environment, results_dir, suite_name):
 
 def main():
     args = parse_args()
-    summary = generate_summary(args.app, args.env, args.results_dir, args.suite_name)
+    profiler = Profiler("parse-results", args.profile)
+    summary = generate_summary(args.app, args.env, args.results_dir, args.suite_name,
+                               args.history_db, args.baseline_days, profiler)
     print(json.dumps(summary, indent=2))
+    profiler.write(args.profile_output or os.path.join(args.results_dir, "profile.json"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Emit the scheduled-regression job matrices from the app configs.
+
+    plan-regression.py --env staging --suite RegressionTests --plan health-check \\
+        --test-type all --apps all --output "$GITHUB_OUTPUT"
+
+Writes ``testcomplete-matrix``/``jmeter-matrix`` (``strategy.matrix`` values),
+their ``-count`` and ``max-parallel`` as GitHub Actions outputs.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from config_resolver import APPS_DIR, SHARED_SETTINGS_PATH, ConfigError, ConfigResolver
+from job_matrix import (
+    MAX_MATRIX_JOBS,
+    TEST_TYPES,
+    jmeter_entries,
+    predicted_makespan,
+    schedule_waves,
+    select_apps,
+    testcomplete_entries,
+)
+
+
+def csv_list(value):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the regression job matrices")
+    parser.add_argument("--env", required=True)
+    parser.add_argument("--suite", default="RegressionTests", help="TestComplete suite")
+    parser.add_argument("--plan", default="health-check", help="JMeter test plan")
+    parser.add_argument("--test-type", choices=("all",) + TEST_TYPES, default="all")
+    parser.add_argument("--apps", default="all", help="Comma-separated apps, or 'all'")
+    parser.add_argument("--tags", default="",
+                        help="Comma-separated tags; only apps carrying one of them run")
+    parser.add_argument("--apps-dir", default=APPS_DIR)
+    parser.add_argument("--shared-settings", default=SHARED_SETTINGS_PATH)
+    parser.add_argument("--history-db", default=os.environ.get("QA_RESULTS_DB"),
+                        help="Results store for TestComplete item durations (default: $QA_RESULTS_DB)")
+    parser.add_argument("--max-parallel", type=int, default=0,
+                        help="Concurrent jobs per test type (default: max_parallel_suites)")
+    parser.add_argument("--output", default=None,
+                        help="Append the outputs here (e.g. $GITHUB_OUTPUT)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        resolver = ConfigResolver(args.apps_dir, args.shared_settings)
+    except ConfigError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    apps = [] if args.apps == "all" else csv_list(args.apps)
+    configs = select_apps(resolver, apps, csv_list(args.tags))
+    missing = sorted(set(apps) - set(configs) - set(resolver.app_names()))
+    if missing:
+        print(f"ERROR: Unknown apps: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+    for app, error in sorted(configs.items()):
+        if isinstance(error, ConfigError):
+            print(f"WARNING: Skipping {app}: {error}", file=sys.stderr)
+    configs = {app: config for app, config in configs.items()
+               if not isinstance(config, ConfigError)}
+
+    max_parallel = args.max_parallel or int(
+        resolver.shared.get("github_actions", {}).get("max_parallel_suites") or 1)
+    planned = {}
+    if args.test_type in ("all", "testcomplete"):
+        planned["testcomplete"] = testcomplete_entries(configs, args.env, args.suite,
+                                                       args.history_db)
+    if args.test_type in ("all", "jmeter"):
+        planned["jmeter"] = jmeter_entries(configs, args.env, args.plan,
+                                           resolver.shared.get("jmeter"))
+
+    outputs = [f"max-parallel={max_parallel}"]
+    for kind in TEST_TYPES:
+        entries, skipped = planned.get(kind, ([], {}))
+        if len(entries) > MAX_MATRIX_JOBS:
+            print(f"ERROR: {len(entries)} {kind} jobs exceed the {MAX_MATRIX_JOBS}-job matrix "
+                  "limit; narrow the run with --apps or --tags", file=sys.stderr)
+            sys.exit(1)
+        ordered = schedule_waves(entries, max_parallel)
+        for app, reason in sorted(skipped.items()):
+            print(f"  {kind}: skipping {app}: {reason}", file=sys.stderr)
+        if ordered:
+            serial = sum(entry["predicted_seconds"] for entry in ordered)
+            print(f"{kind}: {len(ordered)} jobs in {ordered[-1]['wave']} waves of {max_parallel}, "
+                  f"predicted {predicted_makespan(ordered, max_parallel):g}s vs {serial:g}s serial",
+                  file=sys.stderr)
+        outputs.append(f"{kind}-matrix={json.dumps({'include': ordered}, separators=(',', ':'))}")
+        outputs.append(f"{kind}-count={len(ordered)}")
+
+    text = "\n".join(outputs) + "\n"
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
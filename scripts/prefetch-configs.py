@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Fetch qa-config-<app> repositories concurrently into a shared cache.
+
+    # Warm the cache for a scheduled run
+    prefetch-configs.py --apps app-a app-b app-c --cache-dir "$RUNNER_TEMP/qa-configs"
+
+    # Exercise the cache against local bare repos instead of GitHub
+    prefetch-configs.py --apps app-a --remote-base /tmp/remotes --cache-dir /tmp/cache
+
+Unchanged configs cost one ``git ls-remote``; a config is cloned again only
+when its repository's HEAD commit changes.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from config_fetcher import ConfigFetcher
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prefetch app config repositories")
+    parser.add_argument("--apps", nargs="+", required=True, help="Application names")
+    parser.add_argument("--cache-dir",
+                        default=os.path.join(os.environ.get("RUNNER_TEMP", "/tmp"), "qa-configs"))
+    parser.add_argument("--org", default=os.environ.get("QA_ORG_NAME"),
+                        help="GitHub organisation owning the config repos (default: $QA_ORG_NAME)")
+    parser.add_argument("--remote-base", default=None,
+                        help="Directory of bare qa-config-<app>.git repos to use instead of GitHub")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-entries", type=int, default=None,
+                        help="Evict least recently used apps beyond this many")
+    parser.add_argument("--max-mb", type=float, default=None,
+                        help="Evict least recently used apps beyond this cache size")
+    parser.add_argument("--output", default=None,
+                        help="Append CONFIG_PATH/CONFIG_CACHED here (single app, e.g. $GITHUB_OUTPUT)")
+    parser.add_argument("--json", action="store_true", help="Print results and stats as JSON")
+    args = parser.parse_args()
+    if not args.org and not args.remote_base:
+        parser.error("--org (or $QA_ORG_NAME) or --remote-base is required")
+    return args
+
+
+def main():
+    args = parse_args()
+    fetcher = ConfigFetcher(
+        args.cache_dir,
+        org=args.org,
+        remote_base=args.remote_base,
+        token=os.environ.get("GH_TOKEN"),
+        max_entries=args.max_entries,
+        max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None,
+    )
+    results = fetcher.prefetch(args.apps, workers=args.workers)
+
+    for result in results:
+        if (result["status"] != "error"
+                and not os.path.isfile(os.path.join(result["path"], "config.json"))):
+            result.update(status="error", error=f"config.json not found in qa-config-{result['app']}")
+    failed = [r for r in results if r["status"] == "error"]
+    for result in failed:
+        print(f"ERROR: {result['app']}: {result['error']}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({"results": results, "stats": fetcher.stats,
+                          "totals": fetcher.index["stats"]}, indent=2))
+    else:
+        for result in results:
+            if result["status"] != "error":
+                print(f"  {result['app']}: {result['status']} {result['commit'][:12]} "
+                      f"({result['seconds']:.2f}s)")
+        stats = fetcher.stats
+        print(f"Fetched {len(results) - len(failed)}/{len(results)} configs: "
+              f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evicted")
+
+    if args.output and len(results) == 1 and not failed:
+        with open(args.output, "a") as f:
+            f.write(f"CONFIG_PATH={results[0]['path']}\n")
+            f.write(f"CONFIG_CACHED={str(results[0]['status'] == 'hit').lower()}\n")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Opt-in phase timing for the results and notification scripts.
+
+A script wraps each phase of its work in ``profiler.phase(name)`` and,
+when profiling is on (``--profile`` or ``QA_PROFILE=1``), gets wall time,
+CPU time (including finished child processes such as aggregation workers
+or ``git``), the peak RSS so far and the rows and bytes each phase
+handled, written as JSON plus a markdown table for the job summary.
+
+When profiling is off every phase is the same do-nothing context manager,
+so instrumented code pays one method call per phase and nothing per row.
+CPU time is process-wide: phases that overlap in threads share it.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows runners
+    resource = None
+
+PROFILE_ENV = "QA_PROFILE"
+
+
+def profiling_requested(environ=None):
+    """Whether ``QA_PROFILE`` asks for profiling."""
+    value = (environ if environ is not None else os.environ).get(PROFILE_ENV, "")
+    return value.strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def add_profile_arguments(parser, default_output=None, default_label=None):
+    """Add ``--profile`` and ``--profile-output`` to an argparse parser.
+
+    ``default_label`` describes a default the script fills in itself when
+    ``default_output`` is None.
+    """
+    parser.add_argument("--profile", action="store_true", default=profiling_requested(),
+                        help=f"Record per-phase wall/CPU time and peak RSS (or set {PROFILE_ENV}=1)")
+    parser.add_argument("--profile-output", default=default_output,
+                        help=f"Profile JSON path; the markdown table goes beside it "
+                             f"(default: {default_output or default_label})")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def cpu_seconds():
+    """User and system CPU time of this process and its reaped children."""
+    children = os.times()
+    return time.process_time() + children.children_user + children.children_system
+
+
+class _NullPhase:
+    """The phase handed out while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, rows=0, nbytes=0):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class PhaseRecord:
+    """Counters a phase body can add to while it runs."""
+
+    __slots__ = ("rows", "bytes")
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, rows=0, nbytes=0):
+        self.rows += rows
+        self.bytes += nbytes
+
+
+class Profiler:
+    """Accumulate wall time, CPU time, peak RSS, rows and bytes per named phase.
+
+    A phase entered several times (e.g. once per app) is reported once with
+    its call count and summed times.
+    """
+
+    def __init__(self, script, enabled=False):
+        self.script = script
+        self.enabled = enabled
+        self.phases = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.cpu_started = cpu_seconds() if enabled else 0.0
+
+    def phase(self, name):
+        """Context manager timing ``name``; yields a record with ``add(rows, nbytes)``."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        record = PhaseRecord()
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield record
+        finally:
+            wall, cpu = time.perf_counter() - wall, cpu_seconds() - cpu
+            rss = peak_rss_mb()
+            with self.lock:
+                entry = self.phases.setdefault(name, {
+                    "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                    "peak_rss_mb": None, "rows": 0, "bytes": 0,
+                })
+                entry["calls"] += 1
+                entry["wall_seconds"] += wall
+                entry["cpu_seconds"] += cpu
+                entry["rows"] += record.rows
+                entry["bytes"] += record.bytes
+                if rss is not None:
+                    entry["peak_rss_mb"] = max(entry["peak_rss_mb"] or 0.0, rss)
+
+    def report(self):
+        """The profile as a JSON-serialisable dict."""
+        phases = {}
+        for name, entry in self.phases.items():
+            phase = dict(entry, wall_seconds=round(entry["wall_seconds"], 4),
+                         cpu_seconds=round(entry["cpu_seconds"], 4))
+            if entry["wall_seconds"] > 0 and entry["rows"]:
+                phase["rows_per_second"] = round(entry["rows"] / entry["wall_seconds"])
+            phases[name] = phase
+        return {
+            "script": self.script,
+            "wall_seconds": round(time.perf_counter() - self.started, 4),
+            "cpu_seconds": round(cpu_seconds() - self.cpu_started, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": phases,
+        }
+
+    def markdown(self, report=None):
+        """The profile as a markdown table."""
+        report = report or self.report()
+        rss = report["peak_rss_mb"]
+        lines = [
+            f"#### Profile: {report['script']}",
+            "| Phase | Calls | Wall | CPU | Peak RSS | Rows | Bytes |",
+            "|-------|-------|------|-----|----------|------|-------|",
+        ]
+        for name, phase in report["phases"].items():
+            peak = phase["peak_rss_mb"]
+            lines.append(
+                f"| {name} | {phase['calls']} | {phase['wall_seconds']:.3f}s "
+                f"| {phase['cpu_seconds']:.3f}s | {f'{peak} MB' if peak is not None else '-'} "
+                f"| {phase['rows'] or '-'} | {phase['bytes'] or '-'} |"
+            )
+        lines.append(
+            f"| **total** | | {report['wall_seconds']:.3f}s | {report['cpu_seconds']:.3f}s "
+            f"| {f'{rss} MB' if rss is not None else '-'} | | |"
+        )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write ``path`` (JSON) and its ``.md`` twin; append the table to the job summary.
+
+        Does nothing when profiling is off. Returns the report.
+        """
+        if not self.enabled:
+            return None
+        report = self.report()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        markdown = self.markdown(report)
+        with open(os.path.splitext(path)[0] + ".md", "w") as f:
+            f.write(markdown)
+        step_summary = os.environ.get("GITHUB_STEP_SUMMARY")
+        if step_summary:
+            with open(step_summary, "a") as f:
+                f.write("\n" + markdown)
+        print(f"Profile written to {path}")
+        return report
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Render the static HTML report for a JMeter run from its summary.json.
+
+    # Regenerate the report of a downloaded artifact
+    render-report.py jmeter-results-member-portal-staging-42/summary.json \\
+        --output-dir html-report
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from html_report import write_report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render an HTML report from summary.json")
+    parser.add_argument("summary", nargs="?", default="test-results/jmeter/summary.json",
+                        help="summary.json written by parse-jmeter-results.py")
+    parser.add_argument("--output-dir", default=None,
+                        help="Report directory (default: html-report beside the summary)")
+    parser.add_argument("--title", default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.isfile(args.summary):
+        print(f"ERROR: Summary not found: {args.summary}")
+        sys.exit(1)
+    started = time.perf_counter()
+    try:
+        with open(args.summary) as f:
+            summary = json.load(f)
+    except ValueError as e:
+        print(f"ERROR: Cannot read {args.summary}: {e}")
+        sys.exit(1)
+    output_dir = args.output_dir or os.path.join(os.path.dirname(args.summary), "html-report")
+    path = write_report(summary, output_dir, args.title)
+    print(f"Report written to {path} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Resolve an app's test configuration for a workflow in one call.
+
+    # JMeter values for one environment/plan, as GitHub Actions outputs
+    resolve-config.py --app A --env staging --tool jmeter --test-plan load --output "$GITHUB_OUTPUT"
+
+    # Validate and resolve every app under configs/apps/ in one process
+    resolve-config.py --all
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from config_resolver import (
+    APPS_DIR,
+    SCHEMA_PATH,
+    SHARED_SETTINGS_PATH,
+    ConfigError,
+    ConfigResolver,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Resolve app test configuration")
+    parser.add_argument("--app", help="Application name")
+    parser.add_argument("--env", help="Environment name")
+    parser.add_argument("--tool", choices=["jmeter", "testcomplete"], default="jmeter")
+    parser.add_argument("--test-plan", default="health-check", help="JMeter test plan")
+    parser.add_argument("--test-suite", default="SmokeTests", help="TestComplete suite")
+    parser.add_argument("--jmeter-config", default=None,
+                        help="Use this jmeter.json instead of the app's own")
+    parser.add_argument("--apps-dir", default=APPS_DIR)
+    parser.add_argument("--shared-settings", default=SHARED_SETTINGS_PATH)
+    parser.add_argument("--schema", default=SCHEMA_PATH)
+    parser.add_argument("--cache-dir", default=os.environ.get("QA_CONFIG_CACHE"),
+                        help="Keep validated configs here between runs (default: $QA_CONFIG_CACHE)")
+    parser.add_argument("--format", choices=["github", "json"], default="github",
+                        help="key=value lines for $GITHUB_OUTPUT, or JSON")
+    parser.add_argument("--output", default=None, help="Append to this file instead of stdout")
+    parser.add_argument("--all", action="store_true",
+                        help="Resolve every app, environment and plan (always JSON)")
+    parser.add_argument("--summary", action="store_true",
+                        help="Print which tools are enabled for --app")
+    args = parser.parse_args()
+    if not args.all and not args.app:
+        parser.error("--app is required unless --all is given")
+    if not (args.all or args.summary) and not args.env:
+        parser.error("--env is required")
+    return args
+
+
+def github_outputs(values):
+    """Render values as ``key=value`` lines with hyphenated keys."""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, list):
+            value = ",".join(str(v) for v in value)
+        lines.append(f"{key.replace('_', '-')}={value}")
+    return "\n".join(lines) + "\n"
+
+
+def write(text, output):
+    if output:
+        with open(output, "a") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def main():
+    args = parse_args()
+    try:
+        resolver = ConfigResolver(args.apps_dir, args.shared_settings, args.schema,
+                                  cache_dir=args.cache_dir)
+        if args.all:
+            resolved, errors = resolver.resolve_all()
+            write(json.dumps({"apps": resolved, "errors": errors}, indent=2) + "\n", args.output)
+            print(f"Resolved {len(resolved)} apps, {len(errors)} invalid "
+                  f"(cache hits {resolver.hits}, misses {resolver.misses})", file=sys.stderr)
+            for app_name, error in errors.items():
+                print(f"ERROR: {error}", file=sys.stderr)
+            sys.exit(1 if errors else 0)
+
+        if args.summary:
+            config = resolver.load_app(args.app)
+            print(f"  App: {config['app_name']}")
+            print(f"  TestComplete: {str(config['testcomplete'].get('enabled', False)).lower()}")
+            print(f"  JMeter: {str(config['jmeter'].get('enabled', False)).lower()}")
+            return
+
+        if args.tool == "jmeter":
+            values = resolver.resolve_jmeter(args.app, args.env, args.test_plan,
+                                             jmeter_path=args.jmeter_config)
+            values["config_path"] = args.jmeter_config or os.path.join(
+                args.apps_dir, args.app, "jmeter.json")
+        else:
+            values = resolver.resolve_testcomplete(args.app, args.env, args.test_suite)
+    except ConfigError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == "json":
+        write(json.dumps(values, indent=2) + "\n", args.output)
+    else:
+        write(github_outputs(values), args.output)
+
+
+if __name__ == "__main__":
+    main()
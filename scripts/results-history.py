@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Backfill and query the SQLite results store.
+
+    results-history.py --db history.db ingest --app A --env E --test-plan P summary.json
+    results-history.py --db history.db show --app A --env E --test-plan P --metric p95_ms
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from results_store import (
+    DEFAULT_BASELINE_DAYS,
+    OVERALL,
+    ResultsStore,
+    format_regression,
+    record_run,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query or backfill the results store")
+    parser.add_argument("--db", default=os.environ.get("QA_RESULTS_DB"),
+                        help="SQLite results store (default: $QA_RESULTS_DB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Ingest summary.json files")
+    ingest.add_argument("--kind", choices=["jmeter", "testcomplete"], default="jmeter")
+    ingest.add_argument("--app", required=True)
+    ingest.add_argument("--env", required=True)
+    ingest.add_argument("--test-plan", required=True)
+    ingest.add_argument("summaries", nargs="+", help="summary.json files")
+
+    show = sub.add_parser("show", help="Print one metric's history and baseline")
+    show.add_argument("--kind", choices=["jmeter", "testcomplete"], default="jmeter")
+    show.add_argument("--app", required=True)
+    show.add_argument("--env", required=True)
+    show.add_argument("--test-plan", required=True)
+    show.add_argument("--label", default=OVERALL, help="Endpoint label (default: overall)")
+    show.add_argument("--metric", default="p95_ms")
+    show.add_argument("--days", type=int, default=DEFAULT_BASELINE_DAYS)
+    args = parser.parse_args()
+    if not args.db:
+        parser.error("--db or $QA_RESULTS_DB is required")
+    return args
+
+
+def ingest(args):
+    for path in args.summaries:
+        with open(path) as f:
+            summary = json.load(f)
+        regressions = record_run(args.db, args.kind, args.app, args.env, args.test_plan,
+                                 summary, source=path)
+        print(f"Ingested {path}")
+        for regression in regressions:
+            print(f"  REGRESSION: {format_regression(regression)}")
+
+
+def show(args):
+    now = int(time.time() * 1000)
+    with ResultsStore(args.db) as store:
+        rows = store.history(args.kind, args.app, args.env, args.test_plan, args.label,
+                             args.metric, since=now - args.days * 86400 * 1000)
+        median, runs = store.baseline(args.kind, args.app, args.env, args.test_plan, args.label,
+                                      args.metric, now + 1, args.days)
+    if not rows:
+        print(f"No history for {args.label or 'overall'} {args.metric}")
+        sys.exit(1)
+    for run_at, value in rows:
+        when = datetime.fromtimestamp(run_at / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M")
+        print(f"{when}  {value:g}")
+    print(f"Median over {runs} runs in the last {args.days} days: {median:g}")
+
+
+def main():
+    args = parse_args()
+    if args.command == "ingest":
+        ingest(args)
+    else:
+        show(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""SQLite store of historical run summaries with rolling-baseline regression checks.
+
+Each ingested ``summary.json`` becomes one row in ``runs`` plus one row per
+metric per label in ``metrics``. ``metrics`` repeats the tool (``kind``),
+app, environment, plan and run time so that a baseline lookup is a single
+range scan over the ``(kind, app, env, test_plan, label, metric, run_at)``
+index, and ``recent()`` one over ``(kind, app, env, label, metric, run_at)``,
+without a join, no matter how many runs or apps the store holds. Keying on
+``kind`` keeps a TestComplete item and a JMeter label of the same name apart.
+The overall figures of a run use the label ``""``.
+"""
+
+import os
+import sqlite3
+import statistics
+import time
+
+DEFAULT_BASELINE_DAYS = 30
+DEFAULT_MIN_RUNS = 5
+DEFAULT_TOLERANCE_PERCENT = 20.0
+OVERALL = ""
+
+# metric -> (worse when "higher" or "lower", smallest absolute change worth flagging)
+METRICS = {
+    "avg_ms": ("higher", 5),
+    "p50_ms": ("higher", 5),
+    "p90_ms": ("higher", 5),
+    "p95_ms": ("higher", 5),
+    "p99_ms": ("higher", 5),
+    "error_rate": ("higher", 0.5),
+    "throughput_rps": ("lower", 1),
+    "duration_seconds": ("higher", 5),
+    "failed": ("higher", 1),
+    "flaky": ("higher", 1),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    app TEXT NOT NULL,
+    env TEXT NOT NULL,
+    test_plan TEXT NOT NULL,
+    run_at INTEGER NOT NULL,
+    source TEXT,
+    UNIQUE (kind, app, env, test_plan, run_at)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    app TEXT NOT NULL,
+    env TEXT NOT NULL,
+    test_plan TEXT NOT NULL,
+    label TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    run_at INTEGER NOT NULL,
+    value REAL NOT NULL
+);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS metrics_plan_series
+    ON metrics (kind, app, env, test_plan, label, metric, run_at, value);
+CREATE INDEX IF NOT EXISTS metrics_recent
+    ON metrics (kind, app, env, label, metric, run_at, value);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id);
+"""
+
+
+def jmeter_metrics(summary):
+    """Yield ``(label, metric, value)`` for a parse-jmeter-results summary."""
+    if summary.get("total_requests"):
+        yield OVERALL, "requests", summary["total_requests"]
+        yield OVERALL, "error_rate", summary["error_rate"]
+        yield OVERALL, "avg_ms", summary["avg_response_time_ms"]
+        for name in ("p50", "p90", "p95", "p99"):
+            yield OVERALL, f"{name}_ms", summary[f"{name}_response_time_ms"]
+        if "throughput_rps" in summary:
+            yield OVERALL, "throughput_rps", summary["throughput_rps"]
+    for label, data in summary.get("endpoints", {}).items():
+        if not data.get("total"):
+            continue
+        yield label, "requests", data["total"]
+        yield label, "error_rate", round(data["errors"] / data["total"] * 100, 2)
+        yield label, "avg_ms", data["avg_ms"]
+        for name in ("p50", "p90", "p95", "p99"):
+            yield label, f"{name}_ms", data[f"{name}_ms"]
+
+
+def testcomplete_metrics(summary):
+    """Yield ``(label, metric, value)`` for a parse-results summary.
+
+    Per-item figures are read from ``items`` when the summary has them.
+    """
+    for metric in ("passed", "failed", "flaky", "retried", "duration_seconds"):
+        if isinstance(summary.get(metric), (int, float)):
+            yield OVERALL, metric, summary[metric]
+    for item, data in summary.get("items", {}).items():
+        if isinstance(data.get("duration_seconds"), (int, float)):
+            yield item, "duration_seconds", data["duration_seconds"]
+        if "passed" in data:
+            yield item, "failed", 0 if data["passed"] else 1
+        if "flaky" in data:
+            yield item, "flaky", 1 if data["flaky"] else 0
+
+
+class ResultsStore:
+    """Indexed history of run summaries in a SQLite database file."""
+
+    def __init__(self, db_path):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.executescript(INDEXES)
+
+    def _migrate(self):
+        """Add ``metrics.kind`` to stores written before it existed."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(metrics)")}
+        if "kind" in columns:
+            return
+        with self.conn:
+            self.conn.execute("DROP INDEX IF EXISTS metrics_series")
+            self.conn.execute("ALTER TABLE metrics ADD COLUMN kind TEXT NOT NULL DEFAULT ''")
+            self.conn.execute(
+                "UPDATE metrics SET kind = (SELECT kind FROM runs WHERE runs.id = metrics.run_id)")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ingest(self, kind, app, env, test_plan, run_at, metrics, source=None):
+        """Store one run's metrics; re-ingesting the same run replaces it.
+
+        ``metrics`` is an iterable of ``(label, metric, value)``. Returns the
+        run id.
+        """
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM runs WHERE kind = ? AND app = ? AND env = ? AND test_plan = ? "
+                "AND run_at = ?",
+                (kind, app, env, test_plan, run_at),
+            )
+            run_id = self.conn.execute(
+                "INSERT INTO runs (kind, app, env, test_plan, run_at, source) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, app, env, test_plan, run_at, source),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO metrics "
+                "(run_id, kind, app, env, test_plan, label, metric, run_at, value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, kind, app, env, test_plan, label, metric, run_at, float(value))
+                 for label, metric, value in metrics],
+            )
+        return run_id
+
+    def history(self, kind, app, env, test_plan, label, metric, since=None, until=None):
+        """Return ``[(run_at, value)]`` for one series, oldest first."""
+        return self.conn.execute(
+            "SELECT run_at, value FROM metrics "
+            "WHERE kind = ? AND app = ? AND env = ? AND test_plan = ? AND label = ? "
+            "AND metric = ? AND run_at >= ? AND run_at < ? ORDER BY run_at",
+            (kind, app, env, test_plan, label, metric,
+             since if since is not None else 0,
+             until if until is not None else 2**63 - 1),
+        ).fetchall()
+
+    def recent(self, kind, app, env, label, metric, limit=10):
+        """Return the latest ``limit`` values of a series across every test plan."""
+        return [value for value, in self.conn.execute(
+            "SELECT value FROM metrics "
+            "WHERE kind = ? AND app = ? AND env = ? AND label = ? AND metric = ? "
+            "ORDER BY run_at DESC LIMIT ?",
+            (kind, app, env, label, metric, limit),
+        )]
+
+    def baseline(self, kind, app, env, test_plan, label, metric, before,
+                 days=DEFAULT_BASELINE_DAYS):
+        """Return ``(median, runs)`` over the ``days`` before ``before`` (epoch ms)."""
+        rows = self.history(kind, app, env, test_plan, label, metric,
+                            since=before - days * 86400 * 1000, until=before)
+        if not rows:
+            return None, 0
+        return statistics.median(value for _, value in rows), len(rows)
+
+    def check(self, kind, app, env, test_plan, run_at, metrics, days=DEFAULT_BASELINE_DAYS,
+              min_runs=DEFAULT_MIN_RUNS, tolerance=DEFAULT_TOLERANCE_PERCENT):
+        """Compare a run's metrics with the rolling median of earlier runs.
+
+        Returns a list of regression dicts. Series with fewer than
+        ``min_runs`` earlier runs in the window are not judged.
+        """
+        regressions = []
+        for label, metric, value in metrics:
+            if metric not in METRICS:
+                continue
+            worse_when, min_delta = METRICS[metric]
+            median, runs = self.baseline(kind, app, env, test_plan, label, metric, run_at, days)
+            if runs < min_runs:
+                continue
+            delta = value - median if worse_when == "higher" else median - value
+            if delta < min_delta or delta <= abs(median) * tolerance / 100:
+                continue
+            regressions.append({
+                "label": label,
+                "metric": metric,
+                "value": value,
+                "baseline": round(median, 2),
+                "change_percent": round((value - median) / median * 100, 1) if median else None,
+                "baseline_runs": runs,
+            })
+        return regressions
+
+
+def run_timestamp(summary):
+    """Epoch ms of a summary's run: its first sample, else now."""
+    return int(summary.get("start_timestamp") or time.time() * 1000)
+
+
+def record_run(db_path, kind, app, env, test_plan, summary, run_at=None, source=None,
+               days=DEFAULT_BASELINE_DAYS, tolerance=DEFAULT_TOLERANCE_PERCENT):
+    """Check a summary against its baseline, then ingest it.
+
+    Returns the list of regressions found (the new run is not part of its own
+    baseline).
+    """
+    metrics = list(jmeter_metrics(summary) if kind == "jmeter" else testcomplete_metrics(summary))
+    run_at = run_at if run_at is not None else run_timestamp(summary)
+    with ResultsStore(db_path) as store:
+        regressions = store.check(kind, app, env, test_plan, run_at, metrics, days=days,
+                                  tolerance=tolerance)
+        store.ingest(kind, app, env, test_plan, run_at, metrics, source)
+    return regressions
+
+
+def format_regression(regression):
+    label = regression["label"] or "overall"
+    change = regression["change_percent"]
+    change = f" ({change:+}%)" if change is not None else ""
+    return (f"{label} {regression['metric']}: {regression['value']:g} vs "
+            f"median {regression['baseline']:g} of {regression['baseline_runs']} runs{change}")
@@ -4,6 +4,12 @@
 # Usage: run-jmeter.sh --app <name> --base-url <url> --endpoints <csv>
 #        --test-plan <plan> --threads <n> --duration <s> --output-dir <dir>
 #        --data-root <path>
+#        [--env <name> --abort-after <s> --ramp-up <s>
+#         --max-response-time <ms> --max-error-rate <pct>
+#         --p90-response-time <ms> --p95-response-time <ms>]
+#
+# With --abort-after > 0, results.jtl is tailed while JMeter runs and the
+# test is stopped once thresholds stay breached for that many seconds.
 # ============================================================
 
 set -euo pipefail
@@ -19,6 +25,13 @@ while [[ $# -gt 0 ]]; do
     --threads) THREADS="$2"; shift 2 ;;
     --duration) DURATION="$2"; shift 2 ;;
     --output-dir) OUTPUT_DIR="$2"; shift 2 ;;
+    --env) ENV_NAME="$2"; shift 2 ;;
+    --abort-after) ABORT_AFTER="$2"; shift 2 ;;
+    --ramp-up) RAMP_UP="$2"; shift 2 ;;
+    --max-response-time) MAX_RT="$2"; shift 2 ;;
+    --max-error-rate) MAX_ERR="$2"; shift 2 ;;
+    --p90-response-time) P90_RT="$2"; shift 2 ;;
+    --p95-response-time) P95_RT="$2"; shift 2 ;;
     *) echo "Unknown option: $1"; exit 1 ;;
   esac
 done
@@ -29,6 +42,12 @@ DURATION=${DURATION:-60}
 OUTPUT_DIR=${OUTPUT_DIR:-test-results/jmeter}
 TEST_PLAN=${TEST_PLAN:-health-check}
 DATA_ROOT=${DATA_ROOT:-test-suites/$APP_NAME}
+ENV_NAME=${ENV_NAME:-unknown}
+ABORT_AFTER=${ABORT_AFTER:-0}
+RAMP_UP=${RAMP_UP:-}
+MAX_RT=${MAX_RT:-5000}
+MAX_ERR=${MAX_ERR:-1}
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 echo "============================================================"
 echo "QA Test Automation - JMeter Health Check Runner"
@@ -49,67 +68,80 @@ JMX_FILE="$DATA_ROOT/jmeter/${TEST_PLAN}.jmx"
 
 if [ ! -f "$JMX_FILE" ]; then
   echo "JMX file not found: $JMX_FILE"
-  echo "Generating dynamic health check plan..."
+  echo "Compiling ${TEST_PLAN} plan from jmeter.json..."
   JMX_FILE="$OUTPUT_DIR/dynamic-health-check.jmx"
 
-  # Generate a dynamic JMeter test plan for health checks
-  IFS=',' read -ra ENDPOINT_ARRAY <<< "$ENDPOINTS"
-
-  cat > "$JMX_FILE" << 'JMXEOF'
-<?xml version="1.0" encoding="UTF-8"?>
-<jmeterTestPlan version="1.2" properties="5.0" jmeter="5.6.3">
-  <hashTree>
-    <TestPlan guiclass="TestPlanGui" testclass="TestPlan" testname="Health Check Plan">
-      <boolProp name="TestPlan.functional_mode">false</boolProp>
-    </TestPlan>
-    <hashTree>
-      <ThreadGroup guiclass="ThreadGroupGui" testclass="ThreadGroup" testname="Health Check Threads">
-        <intProp name="ThreadGroup.num_threads">THREADS_PLACEHOLDER</intProp>
-        <intProp name="ThreadGroup.ramp_time">5</intProp>
-        <boolProp name="ThreadGroup.scheduler">true</boolProp>
-        <stringProp name="ThreadGroup.duration">DURATION_PLACEHOLDER</stringProp>
-      </ThreadGroup>
-      <hashTree>
-JMXEOF
-
-  for endpoint in "${ENDPOINT_ARRAY[@]}"; do
-    endpoint=$(echo "$endpoint" | xargs)  # trim whitespace
-    cat >> "$JMX_FILE" << SAMPLEREOF
-        <HTTPSamplerProxy guiclass="HttpTestSampleGui" testclass="HTTPSamplerProxy" testname="Health: $endpoint">
-          <stringProp name="HTTPSampler.domain">$(echo $BASE_URL | sed 's|https\?://||' | sed 's|/.*||')</stringProp>
-          <stringProp name="HTTPSampler.protocol">$(echo $BASE_URL | grep -o '^https\?')</stringProp>
-          <stringProp name="HTTPSampler.path">$endpoint</stringProp>
-          <stringProp name="HTTPSampler.method">GET</stringProp>
-        </HTTPSamplerProxy>
-        <hashTree/>
-SAMPLEREOF
-  done
-
-  cat >> "$JMX_FILE" << 'JMXEOF'
-      </hashTree>
-    </hashTree>
-  </hashTree>
-</jmeterTestPlan>
-JMXEOF
-
-  # Replace placeholders
-  sed -i "s/THREADS_PLACEHOLDER/$THREADS/g" "$JMX_FILE"
-  sed -i "s/DURATION_PLACEHOLDER/$DURATION/g" "$JMX_FILE"
+  COMPILE_ARGS=(
+    --app "$APP_NAME"
+    --env "$ENV_NAME"
+    --test-plan "$TEST_PLAN"
+    --apps-dir "$(dirname "$DATA_ROOT")"
+    --threads "$THREADS"
+    --duration "$DURATION"
+    --base-url "$BASE_URL"
+    --endpoints "$ENDPOINTS"
+    --output "$JMX_FILE"
+  )
+  # Without --ramp-up the plan keeps the config's ramp_up_seconds
+  [ -n "$RAMP_UP" ] && COMPILE_ARGS+=(--ramp-up "$RAMP_UP")
+  python3 "$SCRIPT_DIR/compile-jmx.py" "${COMPILE_ARGS[@]}"
 fi
 
 echo "Running JMeter with plan: $JMX_FILE"
 
-# Execute JMeter
-jmeter -n \
-  -t "$JMX_FILE" \
-  -l "$OUTPUT_DIR/results.jtl" \
-  -j "$OUTPUT_DIR/jmeter.log" \
-  -e -o "$OUTPUT_DIR/html-report" \
-  -JBASE_URL="$BASE_URL" \
-  -JTHREADS="$THREADS" \
+# No -e -o dashboard: rereading the JTL in the JVM takes minutes on large runs.
+# parse-jmeter-results.py --html-report renders html-report/ from its aggregates.
+JMETER_ARGS=(
+  -n
+  -t "$JMX_FILE"
+  -l "$OUTPUT_DIR/results.jtl"
+  -j "$OUTPUT_DIR/jmeter.log"
+  -JBASE_URL="$BASE_URL"
+  -JTHREADS="$THREADS"
   -JDURATION="$DURATION"
-
-EXIT_CODE=$?
+)
+
+# JMeter appends to an existing JTL, and an old abort verdict must not carry over
+rm -f "$OUTPUT_DIR/results.jtl" "$OUTPUT_DIR/aborted.json"
+
+EXIT_CODE=0
+if [ "$ABORT_AFTER" -gt 0 ]; then
+  echo "Live monitoring enabled: abort after ${ABORT_AFTER}s of sustained breach"
+
+  # Execute JMeter in the background and tail its results. Under setsid the
+  # launcher script and the JVM share a process group that an abort can signal.
+  SETSID=()
+  command -v setsid > /dev/null && SETSID=(setsid)
+  "${SETSID[@]}" jmeter "${JMETER_ARGS[@]}" &
+  JMETER_PID=$!
+
+  WATCH_ARGS=(
+    --follow
+    --jmeter-pid "$JMETER_PID"
+    --app "$APP_NAME"
+    --env "$ENV_NAME"
+    --test-plan "$TEST_PLAN"
+    --results-dir "$OUTPUT_DIR"
+    --abort-after-seconds "$ABORT_AFTER"
+    --ramp-up-seconds "${RAMP_UP:-0}"
+    --exclude-ramp-up
+    --max-response-time "$MAX_RT"
+    --max-error-rate "$MAX_ERR"
+  )
+  [ -n "${P90_RT:-}" ] && WATCH_ARGS+=(--p90-response-time "$P90_RT")
+  [ -n "${P95_RT:-}" ] && WATCH_ARGS+=(--p95-response-time "$P95_RT")
+  command -v stoptest.sh > /dev/null && WATCH_ARGS+=(--stop-command stoptest.sh)
+
+  WATCH_EXIT=0
+  python3 "$SCRIPT_DIR/parse-jmeter-results.py" "${WATCH_ARGS[@]}" || WATCH_EXIT=$?
+  wait "$JMETER_PID" || EXIT_CODE=$?
+  if [ -f "$OUTPUT_DIR/aborted.json" ] && [ $EXIT_CODE -eq 0 ]; then
+    EXIT_CODE=$WATCH_EXIT
+  fi
+else
+  # Execute JMeter
+  jmeter "${JMETER_ARGS[@]}" || EXIT_CODE=$?
+fi
 
 echo ""
 echo "============================================================"
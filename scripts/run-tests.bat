@@ -1,7 +1,9 @@
 @echo off
 REM ============================================================
 REM TestComplete/TestExecute CLI Wrapper
-REM Usage: run-tests.bat <project_suite> <test_items_csv> <access_key> <base_url>
+REM Usage: run-tests.bat <project_suite> <test_items_csv> <access_key> <base_url> [max_attempts]
+REM Items that fail (exit code 2+) are re-run, alone, up to max_attempts in total;
+REM retry logs are exported as results_<item>.retry<N>.mht
 REM ============================================================
 
 setlocal enabledelayedexpansion
@@ -10,6 +12,8 @@ set PROJECT_SUITE=%~1
 set TEST_ITEMS=%~2
 set ACCESS_KEY=%~3
 set BASE_URL=%~4
+set MAX_ATTEMPTS=%~5
+if "%MAX_ATTEMPTS%"=="" set MAX_ATTEMPTS=1
 set LOG_DIR=test-results\%date:~-4%%date:~4,2%%date:~7,2%
 
 echo ============================================================
@@ -18,6 +22,7 @@ echo ============================================================
 echo Project Suite: %PROJECT_SUITE%
 echo Test Items:    %TEST_ITEMS%
 echo Base URL:      %BASE_URL%
+echo Max Attempts:  %MAX_ATTEMPTS%
 echo Log Directory: %LOG_DIR%
 echo ============================================================
 
@@ -39,14 +44,28 @@ if exist "C:\Program Files (x86)\SmartBear\TestExecute 15\Bin\TestExecute.exe" (
 echo Running tests...
 
 set EXIT_CODE=0
+set FAIL_CODE=0
+set FAILED=
+set ATTEMPT=1
 set ITEMS_LIST=%TEST_ITEMS:,= %
-for %%T in (%ITEMS_LIST%) do (
-    set ITEM=%%T
-    set ITEM_SAFE=!ITEM: =_!
-    echo Running Test Item: !ITEM!
-    %TC_EXE% "%PROJECT_SUITE%" /run /p:"!ITEM!" /AccessKey:%ACCESS_KEY% /ExportLog:"%LOG_DIR%\results_!ITEM_SAFE!.mht" /exit
-    set ITEM_EXIT=!ERRORLEVEL!
-    if !ITEM_EXIT! GTR !EXIT_CODE! set EXIT_CODE=!ITEM_EXIT!
+for %%T in (%ITEMS_LIST%) do call :run_item "%%T"
+
+REM Re-run only the items that failed on the previous pass
+:retry_loop
+if not defined FAILED goto retries_done
+if %ATTEMPT% GEQ %MAX_ATTEMPTS% goto retries_done
+set /a ATTEMPT+=1
+set RETRY_ITEMS=%FAILED%
+set FAILED=
+set FAIL_CODE=0
+echo Retrying failed items (attempt %ATTEMPT% of %MAX_ATTEMPTS%):%RETRY_ITEMS%
+for %%T in (%RETRY_ITEMS%) do call :run_item "%%T"
+goto retry_loop
+
+:retries_done
+if defined FAILED (
+    echo Still failing after %ATTEMPT% attempts:%FAILED%
+    if !FAIL_CODE! GTR !EXIT_CODE! set EXIT_CODE=!FAIL_CODE!
 )
 
 echo.
@@ -63,3 +82,22 @@ if %EXIT_CODE% EQU 0 (
 echo ============================================================
 
 exit /b %EXIT_CODE%
+
+REM ------------------------------------------------------------
+REM Run one test item; failures are queued in FAILED for a retry
+REM ------------------------------------------------------------
+:run_item
+set ITEM=%~1
+set ITEM_SAFE=%ITEM: =_%
+set LOG_NAME=results_%ITEM_SAFE%
+if %ATTEMPT% GTR 1 set LOG_NAME=%LOG_NAME%.retry%ATTEMPT%
+echo Running Test Item: %ITEM% (attempt %ATTEMPT%)
+%TC_EXE% "%PROJECT_SUITE%" /run /p:"%ITEM%" /AccessKey:%ACCESS_KEY% /ExportLog:"%LOG_DIR%\%LOG_NAME%.mht" /exit
+set ITEM_EXIT=%ERRORLEVEL%
+if %ITEM_EXIT% GEQ 2 (
+    set FAILED=%FAILED% %ITEM%
+    if %ITEM_EXIT% GTR !FAIL_CODE! set FAIL_CODE=%ITEM_EXIT%
+) else (
+    if %ITEM_EXIT% GTR !EXIT_CODE! set EXIT_CODE=%ITEM_EXIT%
+)
+exit /b 0
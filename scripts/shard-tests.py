@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Plan duration-balanced TestComplete shards and merge their results.
+
+    # Matrix of shards for a suite, as GitHub Actions outputs
+    shard-tests.py plan --app A --env staging --test-suite FullRegression \\
+        --history-db .results-history/results.db --output "$GITHUB_OUTPUT"
+
+    # Combine the shards' summaries and record item durations for the next plan
+    shard-tests.py merge --app A --env staging --test-suite FullRegression \\
+        --history-db .results-history/results.db --output summary.json shard-*/*-summary.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from config_resolver import APPS_DIR, SHARED_SETTINGS_PATH, ConfigError, ConfigResolver
+from results_store import format_regression, record_run
+from shard_planner import (
+    DEFAULT_ITEM_SECONDS,
+    DEFAULT_WINDOW,
+    ORDERS,
+    default_shard_count,
+    estimate_durations,
+    lpt_shards,
+    merge_summaries,
+    order_riskiest_first,
+    risk_scores,
+    shard_matrix,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Shard TestComplete test items by duration")
+    parser.add_argument("--history-db", default=os.environ.get("QA_RESULTS_DB"),
+                        help="SQLite results store with item durations (default: $QA_RESULTS_DB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    plan = sub.add_parser("plan", help="Print the shard matrix for a suite")
+    plan.add_argument("--app", required=True)
+    plan.add_argument("--env", required=True)
+    plan.add_argument("--test-suite", required=True)
+    plan.add_argument("--apps-dir", default=APPS_DIR)
+    plan.add_argument("--shared-settings", default=SHARED_SETTINGS_PATH)
+    plan.add_argument("--shards", type=int, default=0,
+                      help="Number of shards (default: max_parallel_suites when "
+                           "parallel_execution_enabled, else 1)")
+    plan.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                      help="Latest runs per item whose median predicts its duration")
+    plan.add_argument("--default-seconds", type=float, default=DEFAULT_ITEM_SECONDS,
+                      help="Prediction for items when no item has history yet")
+    plan.add_argument("--order", choices=ORDERS, default="config",
+                      help="Item order inside a shard: as configured, or recently "
+                           "failing/flaky items first")
+    plan.add_argument("--output", default=None,
+                      help="Append matrix/shard-count outputs here (e.g. $GITHUB_OUTPUT)")
+
+    merge = sub.add_parser("merge", help="Combine shard summaries and ingest the run")
+    merge.add_argument("--app", required=True)
+    merge.add_argument("--env", required=True)
+    merge.add_argument("--test-suite", required=True)
+    merge.add_argument("--output", required=True, help="Merged summary.json")
+    merge.add_argument("summaries", nargs="+", help="Per-shard summary.json files")
+    return parser.parse_args()
+
+
+def plan(args):
+    try:
+        resolver = ConfigResolver(args.apps_dir, args.shared_settings)
+        items = resolver.resolve_testcomplete(args.app, args.env, args.test_suite)["test_items"]
+    except ConfigError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not items:
+        print(f"ERROR: No test items configured for suite '{args.test_suite}'", file=sys.stderr)
+        sys.exit(1)
+
+    estimates, runs = estimate_durations(args.history_db, args.app, args.env, items,
+                                         args.window, args.default_seconds)
+    shards = lpt_shards(items, estimates, args.shards or default_shard_count(resolver.shared))
+    if args.order == "flaky-first":
+        scores = risk_scores(args.history_db, args.app, args.env, items, args.window)
+        shards = order_riskiest_first(shards, items, scores)
+        for item in sorted(items, key=lambda item: -scores[item]):
+            if scores[item]:
+                print(f"  risk {scores[item]:g}: {item}", file=sys.stderr)
+    matrix = shard_matrix(shards)
+
+    serial = sum(estimates.values())
+    makespan = max(shard["predicted_seconds"] for shard in shards)
+    for entry in matrix["include"]:
+        print(f"Shard {entry['shard']}: {entry['predicted_seconds']:g}s  {entry['test_items']}",
+              file=sys.stderr)
+    for item in items:
+        source = f"median of {runs[item]} runs" if runs[item] else "no history"
+        print(f"  {item}: {estimates[item]:g}s ({source})", file=sys.stderr)
+    print(f"Predicted {makespan:g}s on {len(shards)} shards vs {serial:g}s serial", file=sys.stderr)
+
+    outputs = (f"matrix={json.dumps(matrix, separators=(',', ':'))}\n"
+               f"shard-count={len(shards)}\n"
+               f"predicted-seconds={makespan:g}\n")
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(outputs)
+    else:
+        sys.stdout.write(outputs)
+
+
+def merge(args):
+    summaries = []
+    for path in args.summaries:
+        with open(path) as f:
+            summaries.append(json.load(f))
+    summary = merge_summaries(summaries)
+    if not summary:
+        print("ERROR: No shard summaries to merge")
+        sys.exit(1)
+
+    if args.history_db:
+        regressions = record_run(args.history_db, "testcomplete", args.app, args.env,
+                                 args.test_suite, summary, source=args.output)
+        summary["regressions"] = {"items": regressions}
+        for regression in regressions:
+            print(f"REGRESSION: {format_regression(regression)}")
+
+    with open(args.output, "w") as f:
+        json.dump(summary, f, indent=2)
+    duration = summary["duration_seconds"]
+    print(f"Merged {len(summaries)} shards: {summary['passed']} passed, {summary['failed']} failed, "
+          f"{summary['flaky']} flaky" + (f", {duration:g}s wall clock" if duration is not None else ""))
+
+
+def main():
+    args = parse_args()
+    if args.command == "plan":
+        plan(args)
+    else:
+        merge(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Split TestComplete test items into shards balanced by predicted duration.
+
+Each item's duration is predicted as the median of its latest runs in the
+results store (``duration_seconds`` recorded by ``parse-results.py``), across
+every suite that ran it. Items without history get the median of the known
+items, or a fixed default. Shards are then filled longest-processing-time
+first: items in descending predicted duration, each to the currently lightest
+shard. Since every run is ingested back into the store, the predictions, and
+with them the balance, improve run over run.
+
+Inside a shard, items run in configured order, or riskiest first
+(``flaky-first``): a recency-weighted mix of how often each item failed or
+only passed on a retry, so a broken build shows up in the first minutes.
+"""
+
+import heapq
+import statistics
+
+from results_store import ResultsStore
+
+DEFAULT_ITEM_SECONDS = 300.0
+DEFAULT_WINDOW = 10
+RISK_DECAY = 0.5
+ORDERS = ("config", "flaky-first")
+
+
+def estimate_durations(db_path, app, env, items, window=DEFAULT_WINDOW,
+                       default=DEFAULT_ITEM_SECONDS):
+    """Return ``({item: seconds}, {item: runs_seen})`` for ``items``."""
+    history = {}
+    if db_path:
+        with ResultsStore(db_path) as store:
+            for item in items:
+                values = store.recent("testcomplete", app, env, item, "duration_seconds", window)
+                if values:
+                    history[item] = values
+    estimates = {item: statistics.median(values) for item, values in history.items()}
+    fallback = statistics.median(estimates.values()) if estimates else default
+    return ({item: round(estimates.get(item, fallback), 1) for item in items},
+            {item: len(history.get(item, ())) for item in items})
+
+
+def _weighted(values, decay=RISK_DECAY):
+    """Mean of ``values`` (newest first) with weights halving per run back."""
+    if not values:
+        return 0.0
+    weights = [decay ** i for i in range(len(values))]
+    return sum(w * v for w, v in zip(weights, values)) / sum(weights)
+
+
+def risk_scores(db_path, app, env, items, window=DEFAULT_WINDOW):
+    """Return ``{item: score}``: recent failure rate plus recent flaky rate."""
+    if not db_path:
+        return {item: 0.0 for item in items}
+    with ResultsStore(db_path) as store:
+        def rate(item, metric):
+            return _weighted(store.recent("testcomplete", app, env, item, metric, window))
+        return {item: round(rate(item, "failed") + rate(item, "flaky"), 3) for item in items}
+
+
+def order_riskiest_first(shards, items, scores):
+    """Reorder each shard's items by descending risk, ties in configured order."""
+    order = {item: i for i, item in enumerate(items)}
+    for shard in shards:
+        shard["items"].sort(key=lambda item: (-scores[item], order[item]))
+    return shards
+
+
+def lpt_shards(items, estimates, shard_count):
+    """Assign items to at most ``shard_count`` shards, longest first.
+
+    Returns a list of ``{"items": [...], "predicted_seconds": float}``; items
+    keep their configured order inside a shard.
+    """
+    shard_count = max(1, min(shard_count, len(items)))
+    order = {item: i for i, item in enumerate(items)}
+    shards = [{"items": [], "predicted_seconds": 0.0} for _ in range(shard_count)]
+    heap = [(0.0, i) for i in range(shard_count)]
+    for item in sorted(items, key=lambda item: (-estimates[item], order[item])):
+        load, index = heapq.heappop(heap)
+        shards[index]["items"].append(item)
+        load += estimates[item]
+        shards[index]["predicted_seconds"] = round(load, 1)
+        heapq.heappush(heap, (load, index))
+    for shard in shards:
+        shard["items"].sort(key=order.get)
+    return [shard for shard in shards if shard["items"]]
+
+
+def default_shard_count(shared_settings):
+    """``max_parallel_suites`` when parallel execution is enabled, else 1."""
+    if not shared_settings.get("testcomplete", {}).get("parallel_execution_enabled"):
+        return 1
+    return int(shared_settings.get("github_actions", {}).get("max_parallel_suites") or 1)
+
+
+def shard_matrix(shards):
+    """GitHub Actions ``strategy.matrix`` value for the shards."""
+    return {"include": [
+        {"shard": number, "test_items": ",".join(shard["items"]),
+         "predicted_seconds": shard["predicted_seconds"]}
+        for number, shard in enumerate(shards, 1)
+    ]}
+
+
+def merge_summaries(summaries):
+    """Combine per-shard ``parse-results.py`` summaries into one run summary.
+
+    ``duration_seconds`` becomes the wall-clock time of the sharded run (the
+    slowest shard); item results are unioned.
+    """
+    if not summaries:
+        return {}
+    merged = {key: summaries[0][key] for key in
+              ("app_name", "environment", "suite_name", "timestamp") if key in summaries[0]}
+    merged.update({"passed": 0, "failed": 0, "flaky": 0, "retried": 0, "items": {}, "shards": []})
+    durations = []
+    for summary in summaries:
+        for count in ("passed", "failed", "flaky", "retried"):
+            merged[count] += summary.get(count, 0)
+        merged["items"].update(summary.get("items", {}))
+        if summary.get("duration_seconds") is not None:
+            durations.append(summary["duration_seconds"])
+        merged["shards"].append({
+            "items": list(summary.get("items", {})),
+            "duration_seconds": summary.get("duration_seconds"),
+            "status": summary.get("status"),
+        })
+    merged["duration_seconds"] = max(durations) if durations else None
+    merged["status"] = ("failed" if merged["failed"]
+                        else "passed" if merged["items"] else "no results")
+    return merged
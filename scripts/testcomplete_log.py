@@ -0,0 +1,337 @@
+"""Streaming reader for TestComplete ``.mht`` log exports.
+
+``run-tests.bat`` exports one MHT (MIME ``multipart/related``) log per test
+item. Those files embed every screenshot, so they can run to hundreds of MB,
+but the results live in a few small HTML/XML parts. Attachment parts are
+skipped by scanning 1 MB chunks for the next boundary, never decoded; text
+parts are decoded a line at a time and fed to an incremental HTML parser.
+Memory stays bounded by the read chunk, the per-cell text cap and
+``MAX_ERRORS``.
+
+What is extracted from the log text:
+
+* table rows and ``name=/value=`` attribute pairs whose key is a status,
+  start/end time or run time field;
+* rows typed ``Error`` (their message) and ``Warning`` (counted).
+"""
+
+import binascii
+import codecs
+import html.parser
+import os
+import re
+from datetime import datetime
+
+MAX_LINE = 64 * 1024
+MAX_CELL = 1000
+MAX_ERRORS = 20
+TEXT_TYPES = ("text/", "application/xml", "application/xhtml", "application/json",
+              "application/javascript")
+
+STATUS_KEYS = {"status", "result", "test result", "execution result"}
+START_KEYS = {"start time", "started", "start date"}
+END_KEYS = {"end time", "finished", "end date"}
+RUN_TIME_KEYS = {"run time", "duration", "execution time", "total time"}
+FAILED_WORDS = ("fail", "error")
+PASSED_WORDS = ("pass", "success", "ok", "warning")
+TIME_FORMATS = (
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+)
+
+
+def _header_params(value):
+    """Split ``type/subtype; key=value; ...`` into the value and its params."""
+    parts = value.split(";")
+    params = {}
+    for part in parts[1:]:
+        key, _, param = part.partition("=")
+        params[key.strip().lower()] = param.strip().strip('"')
+    return parts[0].strip().lower(), params
+
+
+def parse_duration(text):
+    """Seconds from ``h:mm:ss[.fff]``, ``mm:ss`` or ``N sec``/``N ms``; None if unknown."""
+    text = text.strip().lower()
+    match = re.fullmatch(r"(?:(\d+):)?(\d+):(\d+(?:\.\d+)?)", text)
+    if match:
+        hours, minutes, seconds = match.groups()
+        return int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds)
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(ms|milliseconds?|s|sec|secs|seconds?)", text)
+    if match:
+        value = float(match.group(1))
+        return value / 1000 if match.group(2).startswith("m") else value
+    return None
+
+
+def parse_time(text):
+    text = " ".join(text.split())
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+class ItemLog:
+    """Results gathered from one test item's log."""
+
+    def __init__(self, name):
+        self.name = name
+        self.status = None
+        self.start = None
+        self.end = None
+        self.run_time = None
+        self.errors = []
+        self.error_count = 0
+        self.warning_count = 0
+
+    def field(self, key, value):
+        key = " ".join(key.lower().rstrip(":").split())
+        value = value.strip()
+        if not value:
+            return
+        if key in STATUS_KEYS and self.status is None:
+            self.status = value
+        elif key in START_KEYS and self.start is None:
+            self.start = parse_time(value)
+        elif key in END_KEYS:
+            self.end = parse_time(value) or self.end
+        elif key in RUN_TIME_KEYS and self.run_time is None:
+            self.run_time = parse_duration(value)
+
+    def message(self, kind, text):
+        kind = kind.strip().lower()
+        if kind == "error":
+            self.error_count += 1
+            if len(self.errors) < MAX_ERRORS and text:
+                self.errors.append(text)
+        elif kind == "warning":
+            self.warning_count += 1
+
+    @property
+    def passed(self):
+        if self.status:
+            status = self.status.lower()
+            if any(word in status for word in FAILED_WORDS):
+                return False
+            if any(word in status for word in PASSED_WORDS):
+                return True
+        return self.error_count == 0
+
+    @property
+    def duration_seconds(self):
+        if self.run_time is not None:
+            return round(self.run_time, 3)
+        if self.start and self.end and self.end >= self.start:
+            return round((self.end - self.start).total_seconds(), 3)
+        return None
+
+    def as_dict(self, source=None):
+        result = {
+            "passed": self.passed,
+            "duration_seconds": self.duration_seconds,
+            "error_count": self.error_count,
+            "warning_count": self.warning_count,
+            "errors": self.errors,
+        }
+        if self.status:
+            result["status"] = self.status
+        if source:
+            result["log"] = source
+        return result
+
+
+class _LogTextParser(html.parser.HTMLParser):
+    """Feeds table rows and name/value attributes of log markup into an ItemLog."""
+
+    def __init__(self, item):
+        super().__init__(convert_charrefs=True)
+        self.item = item
+        self.row = None
+        self.cell = None
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self.skip += 1
+        elif tag == "tr":
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+        attrs = dict(attrs)
+        if "name" in attrs and "value" in attrs and attrs["value"] is not None:
+            self.item.field(attrs["name"] or "", attrs["value"])
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self.skip = max(self.skip - 1, 0)
+        elif tag in ("td", "th") and self.cell is not None and self.row is not None:
+            self.row.append(" ".join("".join(self.cell).split()))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            self._row(self.row)
+            self.row = None
+
+    def handle_data(self, data):
+        if self.cell is not None and not self.skip and sum(map(len, self.cell)) < MAX_CELL:
+            self.cell.append(data)
+
+    def _row(self, cells):
+        cells = [c for c in cells if c]
+        if len(cells) < 2:
+            return
+        kind = cells[0].lower()
+        if kind in ("error", "warning"):
+            self.item.message(kind, cells[1][:MAX_CELL])
+        elif len(cells) >= 3 and cells[1].lower() in ("error", "warning"):
+            # Time | Type | Message layout
+            self.item.message(cells[1], cells[2][:MAX_CELL])
+        else:
+            self.item.field(cells[0], cells[1])
+
+
+class _Part:
+    def __init__(self, headers):
+        content_type, params = _header_params(headers.get("content-type", "text/plain"))
+        self.content_type = content_type
+        self.boundary = params.get("boundary")
+        self.encoding = headers.get("content-transfer-encoding", "7bit").strip().lower()
+        self.is_text = content_type.startswith(TEXT_TYPES)
+        try:
+            self.decoder = codecs.getincrementaldecoder(params.get("charset") or "utf-8")("replace")
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.base64_tail = b""
+
+    def decode(self, line):
+        """Decode one raw body line to text."""
+        if self.encoding == "base64":
+            data = self.base64_tail + b"".join(line.split())
+            usable = len(data) - len(data) % 4
+            self.base64_tail = data[usable:]
+            try:
+                raw = binascii.a2b_base64(data[:usable])
+            except binascii.Error:
+                raw = b""
+        elif self.encoding == "quoted-printable":
+            raw = binascii.a2b_qp(line)
+        else:
+            raw = line
+        return self.decoder.decode(raw)
+
+
+def _read_headers(f, first=None):
+    headers = {}
+    last = None
+    line = first if first is not None else f.readline(MAX_LINE)
+    while line and line.strip():
+        text = line.decode("latin-1").rstrip("\r\n")
+        if text[:1] in (" ", "\t") and last:
+            headers[last] += " " + text.strip()
+        elif ":" in text:
+            key, _, value = text.partition(":")
+            last = key.strip().lower()
+            headers[last] = value.strip()
+        line = f.readline(MAX_LINE)
+    return headers
+
+
+def _skip_part(f, boundaries, chunk_size=1 << 20):
+    """Seek to the next boundary line without splitting the skipped part into lines."""
+    markers = [b"\n--" + b.encode("latin-1") for b in boundaries]
+    overlap = max(map(len, markers))
+    chunk_size = max(chunk_size, 2 * overlap)
+    while True:
+        start = f.tell()
+        chunk = f.read(chunk_size)
+        found = [i for i in (chunk.find(m) for m in markers) if i >= 0]
+        if found:
+            f.seek(start + min(found) + 1)
+            return
+        if len(chunk) < chunk_size:
+            return
+        f.seek(start + len(chunk) - overlap)
+
+
+def parse_mht(path, item_name=None):
+    """Stream one MHT log and return its ItemLog."""
+    item = ItemLog(item_name or item_attempt_from_path(path)[0])
+    parser = _LogTextParser(item)
+    with open(path, "rb") as f:
+        root = _Part(_read_headers(f))
+        boundaries = {root.boundary} if root.boundary else set()
+        part = None if boundaries else root
+        for line in iter(lambda: f.readline(MAX_LINE), b""):
+            if line.startswith(b"--") and boundaries:
+                marker = line.rstrip(b"\r\n")[2:].decode("latin-1")
+                closing = marker.endswith("--")
+                if (marker[:-2] if closing else marker) in boundaries:
+                    part = None
+                    if not closing:
+                        part = _Part(_read_headers(f))
+                        if part.boundary:
+                            boundaries.add(part.boundary)
+                        if not part.is_text and not part.boundary:
+                            part = None  # screenshots and other attachments
+                            _skip_part(f, boundaries)
+                    continue
+            if part is not None:
+                parser.feed(part.decode(line))
+    parser.close()
+    return item
+
+
+def item_attempt_from_path(path):
+    """Split a run-tests.bat log name into ``(item, attempt)``.
+
+    ``results_Login_Tests.mht`` is attempt 1 of ``Login_Tests``;
+    ``results_Login_Tests.retry2.mht`` is its second attempt.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name.startswith("results_"):
+        name = name[len("results_"):]
+    match = re.fullmatch(r"(.+)\.retry(\d+)", name)
+    if match:
+        return match.group(1), int(match.group(2))
+    return name, 1
+
+
+def parse_logs(paths):
+    """Parse several MHT logs into ``{item: result}`` plus totals.
+
+    Retried items are reported by their last attempt, with ``attempts`` and
+    ``flaky`` (failed first, passed on a retry) set; the errors of the failed
+    attempts are kept in ``retry_errors``. ``duration_seconds`` counts every
+    attempt, since every attempt took runner time.
+    """
+    attempts = {}
+    for path in paths:
+        item, attempt = item_attempt_from_path(path)
+        attempts.setdefault(item, []).append((attempt, path))
+
+    items = {}
+    total = []
+    for name in sorted(attempts):
+        results = [parse_mht(path, name).as_dict(source=os.path.basename(path))
+                   for _, path in sorted(attempts[name])]
+        final = results[-1]
+        earlier_failures = [r for r in results[:-1] if not r["passed"]]
+        final["attempts"] = len(results)
+        final["flaky"] = final["passed"] and bool(earlier_failures)
+        if earlier_failures:
+            final["retry_errors"] = [e for r in earlier_failures for e in r["errors"]][:MAX_ERRORS]
+        items[name] = final
+        total.extend(r["duration_seconds"] for r in results if r["duration_seconds"] is not None)
+    return {
+        "passed": sum(1 for i in items.values() if i["passed"]),
+        "failed": sum(1 for i in items.values() if not i["passed"]),
+        "flaky": sum(1 for i in items.values() if i["flaky"]),
+        "retried": sum(1 for i in items.values() if i["attempts"] > 1),
+        "duration_seconds": round(sum(total), 3) if total else None,
+        "items": items,
+    }
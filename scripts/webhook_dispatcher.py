@@ -0,0 +1,156 @@
+"""Webhook delivery over persistent connections with retries and rate limiting.
+
+One ``http.client`` connection is kept per host and reused for every payload.
+Failed deliveries (connection errors, 429 and 5xx responses) are retried with
+exponential backoff and full jitter, honouring ``Retry-After`` when the
+receiver sends one. A token bucket keeps the send rate under the receiver's
+limit. Delivery latency and failure counts are kept in ``stats``.
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DeliveryError(Exception):
+    """Raised when a payload could not be delivered after all retries."""
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` sends per second with bursts of ``burst``."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0
+            self.tokens -= 1
+        if wait > 0:
+            self.sleep(wait)
+
+
+class WebhookDispatcher:
+    """Posts JSON payloads to webhook URLs, reusing one connection per host."""
+
+    def __init__(self, retries=4, backoff_base=0.5, backoff_max=30.0, rate=1.0,
+                 burst=1, timeout=10.0, sleep=time.sleep):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.sleep = sleep
+        self.limiter = RateLimiter(rate, burst, sleep=sleep)
+        self.connections = {}
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "rate_limited": 0,
+                      "connections": 0, "latencies_ms": []}
+
+    def close(self):
+        for conn in self.connections.values():
+            conn.close()
+        self.connections.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connection(self, url):
+        key = (url.scheme, url.netloc)
+        conn = self.connections.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            conn = cls(url.netloc, timeout=self.timeout)
+            self.connections[key] = conn
+            self.stats["connections"] += 1
+        return conn
+
+    def _drop(self, url):
+        conn = self.connections.pop((url.scheme, url.netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, webhook_url, payload):
+        """Deliver one payload; returns the HTTP status or raises DeliveryError."""
+        url = urllib.parse.urlsplit(webhook_url)
+        if url.scheme not in ("http", "https") or not url.netloc:
+            raise DeliveryError(f"Unsupported webhook URL scheme: {url.scheme or '(none)'}")
+        path = urllib.parse.urlunsplit(("", "", url.path or "/", url.query, ""))
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            self.limiter.acquire()
+            started = time.monotonic()
+            retry_after = None
+            try:
+                conn = self._connection(url)
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.will_close:
+                    self._drop(url)
+            except (OSError, http.client.HTTPException) as e:
+                # A kept-alive connection the server already closed fails here too
+                self._drop(url)
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status < 300:
+                    self.stats["sent"] += 1
+                    self.stats["latencies_ms"].append(round((time.monotonic() - started) * 1000, 1))
+                    return response.status
+                error = f"HTTP {response.status} {response.reason}"
+                if response.status not in RETRY_STATUSES:
+                    break
+                if response.status == 429:
+                    self.stats["rate_limited"] += 1
+                    retry_after = _retry_after(response.getheader("Retry-After"))
+            if attempt < self.retries:
+                self.sleep(self._delay(attempt, retry_after))
+
+        self.stats["failed"] += 1
+        raise DeliveryError(error)
+
+    def summary(self):
+        """Counters plus latency percentiles, for logs and the stats file."""
+        latencies = sorted(self.stats["latencies_ms"])
+        summary = {k: v for k, v in self.stats.items() if k != "latencies_ms"}
+        if latencies:
+            summary["latency_ms"] = {
+                "p50": latencies[(len(latencies) - 1) // 2],
+                "max": latencies[-1],
+                "mean": round(sum(latencies) / len(latencies), 1),
+            }
+        return summary
+
+
+def _retry_after(value):
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None